@@ -0,0 +1,38 @@
+"""Add farm occupancy table
+
+Revision ID: 3b8e1f2a9c47
+Revises: 0f033d773525
+Create Date: 2026-10-19 09:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b8e1f2a9c47'
+down_revision: Union[str, None] = '0f033d773525'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('farm_occupancy',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('farm_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('booked_guests', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['farm_id'], ['farms.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('farm_id', 'year', name='uix_farm_occupancy_year')
+    )
+    op.create_index(op.f('ix_farm_occupancy_farm_id'), 'farm_occupancy', ['farm_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_farm_occupancy_farm_id'), table_name='farm_occupancy')
+    op.drop_table('farm_occupancy')
@@ -0,0 +1,40 @@
+"""Add post likes table
+
+Revision ID: 5d2c7a91e6b3
+Revises: 3b8e1f2a9c47
+Create Date: 2026-10-19 11:58:07.402915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2c7a91e6b3'
+down_revision: Union[str, None] = '3b8e1f2a9c47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('post_likes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('post_id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['post_id'], ['posts.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('post_id', 'user_id', name='uix_post_like_user')
+    )
+    op.create_index(op.f('ix_post_likes_post_id'), 'post_likes', ['post_id'], unique=False)
+    op.create_index(op.f('ix_post_likes_user_id'), 'post_likes', ['user_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_post_likes_user_id'), table_name='post_likes')
+    op.drop_index(op.f('ix_post_likes_post_id'), table_name='post_likes')
+    op.drop_table('post_likes')
@@ -0,0 +1,33 @@
+"""Add comment count to posts
+
+Revision ID: 8a41f3c0d27e
+Revises: 5d2c7a91e6b3
+Create Date: 2026-10-19 12:31:45.118342
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8a41f3c0d27e'
+down_revision: Union[str, None] = '5d2c7a91e6b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('posts', sa.Column('comment_count', sa.Integer(), nullable=False, server_default='0'))
+    op.execute(
+        "UPDATE posts SET comment_count = "
+        "(SELECT COUNT(*) FROM comments WHERE comments.post_id = posts.id)"
+    )
+    op.create_index('ix_comments_post_id_created_at', 'comments', ['post_id', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_comments_post_id_created_at', table_name='comments')
+    op.drop_column('posts', 'comment_count')
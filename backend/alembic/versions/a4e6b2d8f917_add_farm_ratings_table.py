@@ -0,0 +1,58 @@
+"""Add farm_ratings table
+
+Revision ID: a4e6b2d8f917
+Revises: f3a9c1e7b254
+Create Date: 2026-10-20 01:27:52.148306
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4e6b2d8f917'
+down_revision: Union[str, None] = 'f3a9c1e7b254'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('farm_ratings',
+    sa.Column('farm_id', sa.Integer(), nullable=False),
+    sa.Column('rating_sum', sa.Integer(), nullable=False),
+    sa.Column('review_count', sa.Integer(), nullable=False),
+    sa.Column('rating_1', sa.Integer(), nullable=False),
+    sa.Column('rating_2', sa.Integer(), nullable=False),
+    sa.Column('rating_3', sa.Integer(), nullable=False),
+    sa.Column('rating_4', sa.Integer(), nullable=False),
+    sa.Column('rating_5', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['farm_id'], ['farms.id'], ),
+    sa.PrimaryKeyConstraint('farm_id')
+    )
+    # 既存のレビューから集計を作成
+    op.execute(
+        """
+        INSERT INTO farm_ratings (
+            farm_id, rating_sum, review_count,
+            rating_1, rating_2, rating_3, rating_4, rating_5, updated_at
+        )
+        SELECT
+            farm_id, SUM(rating), COUNT(*),
+            COUNT(*) FILTER (WHERE rating = 1),
+            COUNT(*) FILTER (WHERE rating = 2),
+            COUNT(*) FILTER (WHERE rating = 3),
+            COUNT(*) FILTER (WHERE rating = 4),
+            COUNT(*) FILTER (WHERE rating = 5),
+            NOW()
+        FROM reviews
+        GROUP BY farm_id
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('farm_ratings')
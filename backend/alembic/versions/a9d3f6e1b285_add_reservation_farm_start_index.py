@@ -0,0 +1,27 @@
+"""Add reservations (farm_id, start_date) index
+
+Revision ID: a9d3f6e1b285
+Revises: e4b7a2d9c613
+Create Date: 2026-10-19 21:05:12.377461
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a9d3f6e1b285'
+down_revision: Union[str, None] = 'e4b7a2d9c613'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_reservations_farm_id_start_date', 'reservations', ['farm_id', 'start_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reservations_farm_id_start_date', table_name='reservations')
@@ -0,0 +1,27 @@
+"""Add reservations (farm_id, status, created_at) index
+
+Revision ID: b7c1e5a3d842
+Revises: a9d3f6e1b285
+Create Date: 2026-10-19 21:48:03.915622
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c1e5a3d842'
+down_revision: Union[str, None] = 'a9d3f6e1b285'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_reservations_farm_id_status_created_at', 'reservations', ['farm_id', 'status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reservations_farm_id_status_created_at', table_name='reservations')
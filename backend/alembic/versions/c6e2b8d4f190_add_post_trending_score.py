@@ -0,0 +1,35 @@
+"""Add trending score to posts
+
+Revision ID: c6e2b8d4f190
+Revises: 8a41f3c0d27e
+Create Date: 2026-10-19 13:05:12.640917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6e2b8d4f190'
+down_revision: Union[str, None] = '8a41f3c0d27e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('posts', sa.Column('trending_score', sa.Float(), nullable=False, server_default='0'))
+    # services.post.trending_score と同じ式で既存投稿のスコアを計算
+    op.execute(
+        "UPDATE posts SET trending_score = "
+        "LOG(1 + like_count + 2 * comment_count) "
+        "+ EXTRACT(EPOCH FROM (created_at - TIMESTAMP '2024-01-01')) / 45000"
+    )
+    op.create_index(op.f('ix_posts_trending_score'), 'posts', ['trending_score'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_posts_trending_score'), table_name='posts')
+    op.drop_column('posts', 'trending_score')
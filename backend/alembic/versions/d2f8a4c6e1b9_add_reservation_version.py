@@ -0,0 +1,27 @@
+"""Add reservations.version for optimistic concurrency
+
+Revision ID: d2f8a4c6e1b9
+Revises: b7c1e5a3d842
+Create Date: 2026-10-19 23:12:40.318457
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f8a4c6e1b9'
+down_revision: Union[str, None] = 'b7c1e5a3d842'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('reservations', sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade() -> None:
+    op.drop_column('reservations', 'version')
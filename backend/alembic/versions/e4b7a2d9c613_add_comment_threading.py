@@ -0,0 +1,41 @@
+"""Add comment threading
+
+Revision ID: e4b7a2d9c613
+Revises: c6e2b8d4f190
+Create Date: 2026-10-19 20:12:37.504218
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import sqlmodel
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b7a2d9c613'
+down_revision: Union[str, None] = 'c6e2b8d4f190'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('comments', sa.Column('parent_id', sa.Integer(), nullable=True))
+    op.add_column('comments', sa.Column('path', sqlmodel.sql.sqltypes.AutoString(), nullable=False, server_default=''))
+    op.add_column('comments', sa.Column('depth', sa.Integer(), nullable=False, server_default='0'))
+    op.add_column('comments', sa.Column('reply_count', sa.Integer(), nullable=False, server_default='0'))
+    op.create_foreign_key('comments_parent_id_fkey', 'comments', 'comments', ['parent_id'], ['id'])
+    # 既存のコメントはすべてトップレベル（パス = 10桁にゼロ埋めした自身のID）
+    op.execute("UPDATE comments SET path = LPAD(id::text, 10, '0')")
+    op.create_index(op.f('ix_comments_parent_id'), 'comments', ['parent_id'], unique=False)
+    op.create_index('ix_comments_post_id_path', 'comments', ['post_id', 'path'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_comments_post_id_path', table_name='comments')
+    op.drop_index(op.f('ix_comments_parent_id'), table_name='comments')
+    op.drop_constraint('comments_parent_id_fkey', 'comments', type_='foreignkey')
+    op.drop_column('comments', 'reply_count')
+    op.drop_column('comments', 'depth')
+    op.drop_column('comments', 'path')
+    op.drop_column('comments', 'parent_id')
@@ -0,0 +1,63 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any
+
+from fastapi import Request, Response
+
+
+def make_etag(*parts: Any) -> str:
+    """Build a weak ETag from the values that identify a representation's version."""
+    digest = hashlib.sha1("|".join(str(part) for part in parts).encode()).hexdigest()
+    return f'W/"{digest[:20]}"'
+
+
+def _http_date(value: datetime) -> str:
+    """Format a naive UTC datetime as an HTTP-date."""
+    return format_datetime(value.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag."""
+    if if_none_match.strip() == "*":
+        return True
+    candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag.removeprefix("W/") in candidates
+
+
+def not_modified(
+    request: Request, etag: str, last_modified: datetime | None = None
+) -> Response | None:
+    """
+    Return a 304 response if the client's validators are still current
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted when
+    the request carries no If-None-Match, as required by RFC 9110.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        fresh = _matches(if_none_match, etag)
+    elif last_modified is not None and "if-modified-since" in request.headers:
+        try:
+            since = parsedate_to_datetime(request.headers["if-modified-since"])
+        except (TypeError, ValueError):
+            return None
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        fresh = last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+    else:
+        fresh = False
+
+    if not fresh:
+        return None
+    return with_validators(Response(status_code=304), etag, last_modified)
+
+
+def with_validators(
+    response: Response, etag: str, last_modified: datetime | None = None
+) -> Response:
+    """Attach ETag / Last-Modified headers to a response."""
+    response.headers["ETag"] = etag
+    if last_modified is not None:
+        response.headers["Last-Modified"] = _http_date(last_modified)
+    return response
@@ -30,6 +30,41 @@ class Settings(BaseSettings):
     ALGORITHM: str = Field(default="HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=30)
 
+    # Likes
+    LIKE_WRITE_BEHIND: bool = Field(
+        default=False,
+        description="Buffer like increments in memory and flush them in batches",
+    )
+    LIKE_FLUSH_INTERVAL_SECONDS: float = Field(default=2.0)
+
+    # Live post stream (Server-Sent Events)
+    POST_STREAM_MAX_CONNECTIONS: int = Field(
+        default=500,
+        description="Maximum concurrent SSE connections per process",
+    )
+    POST_STREAM_QUEUE_SIZE: int = Field(
+        default=100,
+        description="Events buffered per connection before it is dropped as too slow",
+    )
+    POST_STREAM_HEARTBEAT_SECONDS: float = Field(default=15.0)
+
+    # Reservation maintenance (auto-complete past stays, expire stale requests)
+    RESERVATION_MAINTENANCE_INTERVAL_SECONDS: float = Field(
+        default=3600.0,
+        description="How often the in-process job runs; 0 disables it (use the CLI script instead)",
+    )
+    RESERVATION_MAINTENANCE_CHUNK_SIZE: int = Field(default=500)
+    RESERVATION_PENDING_EXPIRE_DAYS: int = Field(
+        default=7,
+        description="Pending requests older than this are cancelled",
+    )
+
+    # Idempotency-Key (retried create requests replay the stored response)
+    IDEMPOTENCY_KEY_TTL_SECONDS: int = Field(
+        default=86400,
+        description="How long a stored response is replayed for the same key",
+    )
+
     model_config = SettingsConfigDict(
         env_file=".env",
         case_sensitive=True,
@@ -0,0 +1,28 @@
+from typing import Iterable
+
+
+def parse_fields(
+    fields: str | None,
+    allowed: Iterable[str],
+    always: Iterable[str] = ("id",),
+) -> list[str] | None:
+    """
+    Parse a comma-separated ``?fields=`` value into an ordered list of field names.
+
+    Returns None when no fieldset was requested. Fields listed in ``always``
+    are included even when not requested. Raises ValueError on unknown fields.
+    """
+    if fields is None:
+        return None
+
+    allowed = list(allowed)
+    requested = [name.strip() for name in fields.split(",") if name.strip()]
+    unknown = [name for name in requested if name not in allowed]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    selected = [name for name in always if name in allowed]
+    for name in requested:
+        if name not in selected:
+            selected.append(name)
+    return selected
@@ -0,0 +1,117 @@
+import hashlib
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException, Request, Response
+from pydantic import BaseModel
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, delete, select, update
+
+from core.config import settings
+from models import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+
+
+def _request_hash(request: Request, payload: BaseModel) -> str:
+    """Fingerprint of the method, path and validated body"""
+    digest = hashlib.sha256(f"{request.method} {request.url.path}\n".encode())
+    digest.update(payload.model_dump_json().encode())
+    return digest.hexdigest()
+
+
+def claim_idempotency_key(
+    session: Session, request: Request, payload: BaseModel
+) -> Response | None:
+    """
+    Claim the request's Idempotency-Key, or return the response stored for it
+
+    Requests without the header are not affected. The key row is inserted in
+    the request's own transaction, so it only survives if the request
+    commits; a failed request can be retried with the same key. A retry of
+    a committed request gets the stored response without touching any other
+    table. A concurrent retry waits on the key's unique index until the
+    first request finishes, then replays its response. Reusing a key for a
+    different body answers 422.
+    """
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if key is None:
+        return None
+    if not key or len(key) > 255:
+        raise HTTPException(
+            status_code=400,
+            detail=f"{IDEMPOTENCY_HEADER} must be 1-255 characters",
+        )
+
+    request_hash = _request_hash(request, payload)
+    now = datetime.utcnow()
+    values = {
+        "key": key,
+        "request_hash": request_hash,
+        "status_code": None,
+        "response_body": None,
+        "created_at": now,
+        "expires_at": now + timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL_SECONDS),
+    }
+    # 期限切れのキーは新しいリクエストで上書きする
+    claimed = session.exec(
+        pg_insert(IdempotencyKey)
+        .values(**values)
+        .on_conflict_do_update(
+            index_elements=["key"],
+            set_={name: value for name, value in values.items() if name != "key"},
+            where=IdempotencyKey.expires_at < now,
+        )
+        .returning(IdempotencyKey.key)
+    ).first()
+    if claimed:
+        request.state.idempotency_key = key
+        return None
+
+    stored = session.exec(
+        select(
+            IdempotencyKey.request_hash,
+            IdempotencyKey.status_code,
+            IdempotencyKey.response_body,
+        ).where(IdempotencyKey.key == key)
+    ).one()
+    if stored.request_hash != request_hash:
+        raise HTTPException(
+            status_code=422,
+            detail=f"{IDEMPOTENCY_HEADER} was already used for a different request",
+        )
+    if stored.status_code is None:
+        raise HTTPException(
+            status_code=409,
+            detail=f"A request with this {IDEMPOTENCY_HEADER} is still in progress",
+        )
+    return Response(
+        content=stored.response_body,
+        status_code=stored.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"},
+    )
+
+
+def remember_response(
+    session: Session, request: Request, response: Response
+) -> Response:
+    """Store the response under the key claimed by claim_idempotency_key (if any)"""
+    key = getattr(request.state, "idempotency_key", None)
+    if key is not None:
+        session.exec(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.key == key)
+            .values(status_code=response.status_code, response_body=response.body)
+            .execution_options(synchronize_session=False)
+        )
+    return response
+
+
+def purge_expired_idempotency_keys(session: Session) -> int:
+    """Delete stored responses whose TTL has passed (commitはしない)"""
+    result = session.exec(
+        delete(IdempotencyKey)
+        .where(IdempotencyKey.expires_at < datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
@@ -0,0 +1,56 @@
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Encode types orjson does not handle natively (matches Pydantic's JSON output)"""
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def json_bytes(content: Any) -> bytes:
+    """Encode content as JSON bytes the same way API responses are rendered"""
+    return orjson.dumps(
+        content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS
+    )
+
+
+class ORJSONResponse(Response):
+    """JSON response rendered with orjson; used as the application's default response class"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return json_bytes(content)
+
+
+def rows_response(rows: Any, status_code: int = 200) -> ORJSONResponse:
+    """
+    Serialize plain rows (dicts built from selected columns) straight to JSON bytes
+
+    Use only for data whose shape already matches the response schema; it is
+    not validated again.
+    """
+    return ORJSONResponse(content=rows, status_code=status_code)
+
+
+def model_response(
+    adapter: TypeAdapter, data: Any, status_code: int = 200
+) -> Response:
+    """
+    Validate data once with a precompiled TypeAdapter and return its JSON bytes
+
+    ORM objects are read via attributes, so routers do not need model_dump()
+    or an intermediate response model before returning.
+    """
+    value = adapter.validate_python(data, from_attributes=True)
+    return Response(
+        content=adapter.dump_json(value),
+        status_code=status_code,
+        media_type="application/json",
+    )
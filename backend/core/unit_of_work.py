@@ -0,0 +1,60 @@
+from typing import Callable
+
+from fastapi import Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlmodel import Session
+
+AFTER_COMMIT_KEY = "after_commit"
+
+
+def after_commit(session: Session, callback: Callable[[], None]) -> None:
+    """
+    Run a callback once the session's current transaction commits
+
+    For side effects that must not happen if the write is rolled back:
+    cache invalidation, live events, buffered counters. Callbacks are
+    discarded when the transaction rolls back.
+    """
+    session.info.setdefault(AFTER_COMMIT_KEY, []).append(callback)
+
+
+@event.listens_for(Session, "after_commit")
+def _run_after_commit(session) -> None:
+    for callback in session.info.pop(AFTER_COMMIT_KEY, []):
+        callback()
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_after_commit(session, transaction) -> None:
+    # Fires after after_commit, so anything left belongs to a rollback
+    if transaction.parent is None:
+        session.info.pop(AFTER_COMMIT_KEY, None)
+
+
+class UnitOfWorkRoute(APIRoute):
+    """
+    Route that commits the request's session once, after the endpoint returns
+
+    Services only flush; the whole request is one transaction that commits
+    before the response is sent, or rolls back if the endpoint raises or
+    answers with an error status. (With FastAPI 0.104 the teardown of a
+    ``yield`` dependency runs after the response has been sent, so the
+    commit cannot live in get_session.)
+    """
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def unit_of_work_handler(request: Request) -> Response:
+            response = await handler(request)
+            session: Session | None = getattr(request.state, "db_session", None)
+            if session is not None and session.in_transaction():
+                if response.status_code < 400:
+                    await run_in_threadpool(session.commit)
+                else:
+                    session.rollback()
+            return response
+
+        return unit_of_work_handler
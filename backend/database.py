@@ -1,3 +1,4 @@
+from fastapi import Request
 from sqlmodel import Session, SQLModel, create_engine
 
 from core.config import settings
@@ -20,7 +21,16 @@ def create_db_and_tables():
     SQLModel.metadata.create_all(engine)
 
 
-def get_session():
-    """Get database session for dependency injection."""
-    with Session(engine) as session:
+def get_session(request: Request):
+    """
+    Get database session for dependency injection.
+
+    The session is the request's unit of work: services only flush, and
+    UnitOfWorkRoute commits once after the endpoint returns (anything left
+    uncommitted is rolled back on close). Objects are not expired on commit:
+    services return what they wrote (or what RETURNING gave back) without
+    re-reading it.
+    """
+    with Session(engine, expire_on_commit=False) as session:
+        request.state.db_session = session
         yield session
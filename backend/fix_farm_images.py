@@ -2,9 +2,12 @@
 Fix farm image URLs for Farm 1 and 2
 """
 
+from datetime import datetime
+
 from sqlmodel import Session, create_engine, select
 
 from core.config import settings
+from models.farm import Farm
 from models.farm_image import FarmImage
 
 
@@ -34,6 +37,12 @@ def fix_farm_images():
             session.add(img3)
             print(f"✅ Updated Farm 2 main image: {img3.image_url}")
 
+        # 画像を変更したファームの updated_at を更新（キャッシュ・条件付きGETに反映させる）
+        farm_ids = {img.farm_id for img in (img1, img2, img3) if img}
+        for farm in session.exec(select(Farm).where(Farm.id.in_(farm_ids))).all():
+            farm.updated_at = datetime.utcnow()
+            session.add(farm)
+
         session.commit()
         print("\n🎉 Farm image URLs updated successfully!")
 
@@ -20,6 +20,9 @@ from models import (
     Review,
     User,
 )
+from services.occupancy import OccupancyService
+from services.post import comment_path, trending_score
+from services.rating import RatingService
 
 
 def create_db_and_tables():
@@ -308,6 +311,9 @@ def seed_sample_data(engine):
         ]
         for reservation in reservations:
             session.add(reservation)
+        session.flush()
+        # 予約カレンダー（farm_occupancy）を予約から作成
+        OccupancyService.rebuild(session)
         session.commit()
         for reservation in reservations:
             session.refresh(reservation)
@@ -350,6 +356,8 @@ def seed_sample_data(engine):
         ]
         for review in reviews:
             session.add(review)
+        session.flush()
+        RatingService.rebuild(session)
         session.commit()
         print(f"✅ Created {len(reviews)} reviews")
 
@@ -405,6 +413,15 @@ def seed_sample_data(engine):
         ]
         for comment in comments:
             session.add(comment)
+        session.flush()
+        for comment in comments:
+            comment.path = comment_path("", comment.id)
+        # コメント数とトレンドスコアを作成したデータに合わせる
+        for post in posts:
+            post.comment_count = sum(c.post_id == post.id for c in comments)
+            post.trending_score = trending_score(
+                post.like_count, post.comment_count, post.created_at
+            )
         session.commit()
         print(f"✅ Created {len(comments)} comments")
 
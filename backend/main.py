@@ -1,17 +1,52 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 
 from core.config import settings
-from routers import auth, farms, posts, reservations, stamps, users
+from core.responses import ORJSONResponse
+from routers import auth, farms, hosts, posts, reservations, stamps, users
 from init_endpoint import router as init_router
 from seed_endpoint import router as seed_router
+from services.like_buffer import run_like_flush_loop
+from services.reservation_maintenance import run_reservation_maintenance_loop
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # いいねの書き込み遅延が有効な場合はバックグラウンドで定期的に反映する
+    tasks = []
+    if settings.LIKE_WRITE_BEHIND:
+        tasks.append(
+            asyncio.create_task(run_like_flush_loop(settings.LIKE_FLUSH_INTERVAL_SECONDS))
+        )
+    # 終了した予約の完了・放置された予約リクエストの取り消しを定期実行する
+    if settings.RESERVATION_MAINTENANCE_INTERVAL_SECONDS > 0:
+        tasks.append(
+            asyncio.create_task(
+                run_reservation_maintenance_loop(
+                    settings.RESERVATION_MAINTENANCE_INTERVAL_SECONDS
+                )
+            )
+        )
+    yield
+    for task in tasks:
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
 
 app = FastAPI(
     title=settings.APP_NAME,
     description="API for Farm Match - Connect people with farm stay experiences",
     version=settings.APP_VERSION,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -26,6 +61,7 @@ app.add_middleware(
 app.include_router(auth.router)
 app.include_router(farms.router)
 app.include_router(users.router)
+app.include_router(hosts.router)
 app.include_router(reservations.router)
 app.include_router(posts.router)
 app.include_router(stamps.router)
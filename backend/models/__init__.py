@@ -1,8 +1,12 @@
 from .comment import Comment
 from .farm import Farm
 from .farm_image import FarmImage
+from .farm_occupancy import FarmOccupancy
+from .farm_rating import FarmRating
+from .idempotency_key import IdempotencyKey
 from .post import Post
 from .post_image import PostImage
+from .post_like import PostLike
 from .prefecture_stamp import PrefectureStamp
 from .reservation import Reservation
 from .review import Review
@@ -18,7 +22,11 @@ __all__ = [
     "Post",
     "Comment",
     "FarmImage",
+    "FarmOccupancy",
+    "FarmRating",
+    "IdempotencyKey",
     "PostImage",
+    "PostLike",
     "PrefectureStamp",
     "UserStampCollection",
     "UserStampDetail",
@@ -1,6 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
@@ -11,5 +12,21 @@ class Comment(SQLModel, table=True):
     post_id: int = Field(foreign_key="posts.id", index=True)
     user_id: int = Field(foreign_key="users.id", index=True)
     content: str
+
+    # スレッド表示用: 親コメント、祖先から自身までのIDを固定長で連結したパス、深さ
+    parent_id: Optional[int] = Field(default=None, foreign_key="comments.id", index=True)
+    path: str = Field(default="")
+    depth: int = Field(default=0)
+    reply_count: int = Field(default=0)
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column_kwargs={"onupdate": datetime.utcnow},
+    )
+
+    __table_args__ = (
+        # 投稿ごとの最新コメント取得用
+        Index("ix_comments_post_id_created_at", "post_id", "created_at"),
+        # スレッド（部分木）を path の範囲検索で描画順に取得する用
+        Index("ix_comments_post_id_path", "post_id", "path"),
+    )
@@ -0,0 +1,24 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import UniqueConstraint
+from sqlmodel import Column, Field, JSON, SQLModel
+
+
+class FarmOccupancy(SQLModel, table=True):
+    """ファーム別・年別の日次予約人数テーブル"""
+
+    __tablename__ = "farm_occupancy"
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    farm_id: int = Field(foreign_key="farms.id", index=True)
+    year: int
+
+    # 1月1日を0とした日ごとの予約人数（366要素）
+    booked_guests: list[int] = Field(sa_column=Column(JSON, nullable=False))
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    __table_args__ = (
+        UniqueConstraint("farm_id", "year", name="uix_farm_occupancy_year"),
+    )
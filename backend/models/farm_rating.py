@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+
+class FarmRating(SQLModel, table=True):
+    """ファーム別のレビュー評価の集計（レビュー作成・削除と同じトランザクションで更新）"""
+
+    __tablename__ = "farm_ratings"
+
+    farm_id: int = Field(foreign_key="farms.id", primary_key=True)
+    rating_sum: int = Field(default=0)
+    review_count: int = Field(default=0)
+
+    # 評価ごとのレビュー数（1〜5）
+    rating_1: int = Field(default=0)
+    rating_2: int = Field(default=0)
+    rating_3: int = Field(default=0)
+    rating_4: int = Field(default=0)
+    rating_5: int = Field(default=0)
+
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import Column, LargeBinary
+from sqlmodel import Field, SQLModel
+
+
+class IdempotencyKey(SQLModel, table=True):
+    """Idempotency-Key ヘッダーごとに保存した作成APIのレスポンス"""
+
+    __tablename__ = "idempotency_keys"
+
+    key: str = Field(primary_key=True, max_length=255)
+    request_hash: str = Field(max_length=64)  # メソッド・パス・ボディのSHA-256
+    status_code: Optional[int] = Field(default=None)
+    response_body: Optional[bytes] = Field(
+        default=None, sa_column=Column(LargeBinary)
+    )
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime = Field(index=True)
@@ -13,5 +13,12 @@ class Post(SQLModel, table=True):
     title: str = Field(max_length=100)
     content: str
     like_count: int = Field(default=0)
+    comment_count: int = Field(default=0)
+
+    # トレンド順の並び替え用スコア（いいね・コメント・投稿日時から算出）
+    trending_score: float = Field(default=0, index=True)
     created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column_kwargs={"onupdate": datetime.utcnow},
+    )
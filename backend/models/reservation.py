@@ -1,6 +1,7 @@
 from datetime import date, datetime
 from typing import Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 
@@ -17,7 +18,23 @@ class Reservation(SQLModel, table=True):
     status: str = Field(
         default="pending", max_length=20, index=True
     )  # pending, approved, completed, cancelled
+    version: int = Field(default=1)  # 更新のたびに加算（楽観的排他制御）
     contact_phone: str = Field(max_length=20)
     message: Optional[str] = Field(default=None)
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column_kwargs={"onupdate": datetime.utcnow},
+    )
+
+    __table_args__ = (
+        # ファーム別のチェックイン日範囲での集計・一覧用
+        Index("ix_reservations_farm_id_start_date", "farm_id", "start_date"),
+        # ホストの予約一覧（ファーム別・ステータス絞り込み・新しい順）用
+        Index(
+            "ix_reservations_farm_id_status_created_at",
+            "farm_id",
+            "status",
+            "created_at",
+        ),
+    )
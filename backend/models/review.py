@@ -15,4 +15,7 @@ class Review(SQLModel, table=True):
     comment: Optional[str] = Field(default=None)
     experience_date: date
     created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(
+        default_factory=datetime.utcnow,
+        sa_column_kwargs={"onupdate": datetime.utcnow},
+    )
@@ -2,6 +2,7 @@ from fastapi import APIRouter, Depends, HTTPException, Header
 from sqlmodel import Session
 from typing import Optional
 
+from core.unit_of_work import UnitOfWorkRoute
 from database import get_session
 from models.user import User
 from services.auth_service import AuthService
@@ -9,7 +10,7 @@ from services.user import UserService
 from pydantic import BaseModel
 
 
-router = APIRouter(prefix="/auth", tags=["auth"])
+router = APIRouter(prefix="/auth", tags=["auth"], route_class=UnitOfWorkRoute)
 
 
 class LoginRequest(BaseModel):
@@ -1,16 +1,41 @@
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from datetime import date, datetime, timedelta
+from functools import partial
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlmodel import Session, select
 import os
 import uuid
 from pathlib import Path
 
+from core.conditional import make_etag, not_modified, with_validators
+from core.fieldsets import parse_fields
+from core.responses import model_response, rows_response
+from core.unit_of_work import UnitOfWorkRoute, after_commit
 from database import get_session
 from models import Farm, FarmImage
-from schemas.farm import FarmCreate, FarmListResponse, FarmResponse, FarmUpdate
-from services.farm import FarmService
-from services.appwrite_storage import get_appwrite_storage
+from schemas.farm import (
+    FarmCalendarResponse,
+    FarmCreate,
+    FarmDetailResponse,
+    FarmListResponse,
+    FarmResponse,
+    FarmUpdate,
+)
+from services.farm import FARM_DETAIL_INCLUDES, FarmService
+from services.ical import stream_farm_calendar
+from services.occupancy import OccupancyService
+from services.reservation import ReservationService
+from services.appwrite_storage import ImageUploadError, upload_image
+
+router = APIRouter(prefix="/api/farms", tags=["farms"], route_class=UnitOfWorkRoute)
+
+# ?fields= で指定できる項目（Farmの全列 + main_image_url）
+FARM_LIST_FIELDS = [*Farm.model_fields, "main_image_url"]
 
-router = APIRouter(prefix="/api/farms", tags=["farms"])
+FARM_ADAPTER = TypeAdapter(FarmResponse)
+FARM_DETAIL_ADAPTER = TypeAdapter(FarmDetailResponse)
 
 
 def get_farm_main_image_url(session: Session, farm_id: int) -> str | None:
@@ -34,13 +59,44 @@ def get_farm_main_image_url(session: Session, farm_id: int) -> str | None:
     return farm_image.image_url if farm_image else None
 
 
+def parse_farm_fields(fields: str | None) -> list[str] | None:
+    """Validate a ?fields= value for farm list endpoints"""
+    try:
+        return parse_fields(fields, FARM_LIST_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+def farm_list_columns(selected: list[str] | None) -> list[str] | None:
+    """Farm columns to SELECT for the requested fields (None means the list default)"""
+    if selected is None:
+        return None
+    return [name for name in selected if name != "main_image_url"]
+
+
+def build_farm_list_response(
+    session: Session, farms: list[dict], selected: list[str] | None
+):
+    """Attach main images and serialize the rows (only the selected keys) with orjson"""
+    if selected is None or "main_image_url" in selected:
+        image_urls = FarmService.get_main_image_urls(
+            session, [farm["id"] for farm in farms]
+        )
+        for farm in farms:
+            farm["main_image_url"] = image_urls.get(farm["id"])
+
+    return rows_response(farms)
+
+
 @router.get("", response_model=list[FarmListResponse])
 async def list_farms(
+    request: Request,
     session: Session = Depends(get_session),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     prefecture: str | None = None,
     experience_type: str | None = None,
+    fields: str | None = None,
 ):
     """
     Get list of active farms with optional filters
@@ -49,28 +105,34 @@ async def list_farms(
     - **experience_type**: Filter by experience type (agriculture, livestock, fishery)
     - **skip**: Number of records to skip (pagination)
     - **limit**: Number of records to return (max 100)
+    - **fields**: Comma-separated fields to return (e.g. `name,prefecture,main_image_url`)
     """
+    selected = parse_farm_fields(fields)
+
+    count, last_modified = FarmService.get_farms_version(
+        session, prefecture=prefecture, experience_type=experience_type
+    )
+    etag = make_etag("farms", request.url.query, count, last_modified)
+    if cached := not_modified(request, etag, last_modified):
+        return cached
+
     farms = FarmService.get_farms(
         session=session,
         skip=skip,
         limit=limit,
         prefecture=prefecture,
         experience_type=experience_type,
+        columns=farm_list_columns(selected),
+    )
+    return with_validators(
+        build_farm_list_response(session, farms, selected), etag, last_modified
     )
-
-    # Add main_image_url to each farm
-    farm_list = []
-    for farm in farms:
-        farm_dict = farm.model_dump()
-        farm_dict["main_image_url"] = get_farm_main_image_url(session, farm.id)
-        farm_list.append(FarmListResponse(**farm_dict))
-
-    return farm_list
 
 
 @router.get("/{farm_id}", response_model=FarmResponse)
 async def get_farm(
     farm_id: int,
+    request: Request,
     session: Session = Depends(get_session),
 ):
     """Get a specific farm by ID"""
@@ -78,28 +140,140 @@ async def get_farm(
     if not farm:
         raise HTTPException(status_code=404, detail="Farm not found")
 
+    etag = make_etag("farm", farm.id, farm.updated_at)
+    if cached := not_modified(request, etag, farm.updated_at):
+        return cached
+
     # Add main_image_url to response
     farm_dict = farm.model_dump()
     farm_dict["main_image_url"] = get_farm_main_image_url(session, farm.id)
-    return FarmResponse(**farm_dict)
+    return with_validators(
+        model_response(FARM_ADAPTER, farm_dict), etag, farm.updated_at
+    )
+
+
+@router.get("/{farm_id}/detail", response_model=FarmDetailResponse)
+async def get_farm_detail(
+    farm_id: int,
+    session: Session = Depends(get_session),
+    include: str = Query(",".join(FARM_DETAIL_INCLUDES)),
+    reviews_limit: int = Query(5, ge=1, le=20),
+):
+    """
+    Get a farm with its gallery, rating, recent reviews and host in one call
+
+    - **include**: Comma-separated sections to include (images, rating, reviews, host)
+    - **reviews_limit**: Number of recent reviews to return (max 20)
+    """
+    sections = {part.strip() for part in include.split(",") if part.strip()}
+    unknown = sections - set(FARM_DETAIL_INCLUDES)
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown include: {', '.join(sorted(unknown))}",
+        )
+
+    detail = FarmService.get_farm_detail(session, farm_id, sections, reviews_limit)
+    if not detail:
+        raise HTTPException(status_code=404, detail="Farm not found")
+    return model_response(FARM_DETAIL_ADAPTER, detail)
+
+
+@router.get("/{farm_id}/calendar", response_model=FarmCalendarResponse)
+async def get_farm_calendar(
+    farm_id: int,
+    session: Session = Depends(get_session),
+    date_from: date | None = Query(None, alias="from"),
+    date_to: date | None = Query(None, alias="to"),
+):
+    """
+    Get per-day booked guests and remaining capacity for a farm
+
+    - **from**: First day of the calendar (default: today)
+    - **to**: Last day of the calendar, inclusive (default: from + 90 days, max 366 days)
+    """
+    farm = FarmService.get_farm(session, farm_id)
+    if not farm:
+        raise HTTPException(status_code=404, detail="Farm not found")
+
+    date_from = date_from or date.today()
+    date_to = date_to or date_from + timedelta(days=90)
+    if date_to < date_from:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (date_to - date_from).days > 366:
+        raise HTTPException(
+            status_code=400, detail="Calendar range must be 366 days or less"
+        )
+
+    days = OccupancyService.get_calendar(
+        session, farm_id, farm.max_guests, date_from, date_to
+    )
+    return rows_response(
+        {"farm_id": farm_id, "max_guests": farm.max_guests, "days": days}
+    )
+
+
+@router.get("/{farm_id}/calendar.ics")
+async def get_farm_ical(
+    farm_id: int,
+    request: Request,
+    session: Session = Depends(get_session),
+):
+    """
+    Subscribe to a farm's bookings from an external calendar (iCalendar)
+
+    Pending, approved and completed reservations are streamed as all-day
+    events. The ETag changes whenever a reservation of the farm is created,
+    updated or deleted, so polling clients mostly get 304.
+    """
+    farm = FarmService.get_farm(session, farm_id)
+    if not farm:
+        raise HTTPException(status_code=404, detail="Farm not found")
+
+    count, last_modified = ReservationService.get_reservations_version(
+        session, farm_id=farm_id
+    )
+    etag = make_etag("farm-ical", farm_id, farm.name, count, last_modified)
+    farm_name = farm.name
+    # The stream reads with its own session; release this connection now
+    session.close()
+    if cached := not_modified(request, etag, last_modified):
+        return cached
+
+    return with_validators(
+        StreamingResponse(
+            stream_farm_calendar(farm_id, farm_name),
+            media_type="text/calendar",
+            headers={"Content-Disposition": f'inline; filename="farm-{farm_id}.ics"'},
+        ),
+        etag,
+        last_modified,
+    )
 
 
 @router.get("/host/{host_id}", response_model=list[FarmListResponse])
 async def list_farms_by_host(
     host_id: int,
+    request: Request,
     session: Session = Depends(get_session),
+    fields: str | None = None,
 ):
     """Get all farms owned by a specific host"""
-    farms = FarmService.get_farms_by_host(session, host_id)
+    selected = parse_farm_fields(fields)
 
-    # Add main_image_url to each farm
-    farm_list = []
-    for farm in farms:
-        farm_dict = farm.model_dump()
-        farm_dict["main_image_url"] = get_farm_main_image_url(session, farm.id)
-        farm_list.append(FarmListResponse(**farm_dict))
+    count, last_modified = FarmService.get_farms_version(
+        session, is_active=False, host_id=host_id
+    )
+    etag = make_etag("host-farms", host_id, request.url.query, count, last_modified)
+    if cached := not_modified(request, etag, last_modified):
+        return cached
 
-    return farm_list
+    farms = FarmService.get_farms_by_host(
+        session, host_id, columns=farm_list_columns(selected)
+    )
+    return with_validators(
+        build_farm_list_response(session, farms, selected), etag, last_modified
+    )
 
 
 @router.post("", response_model=FarmResponse, status_code=201)
@@ -120,7 +294,7 @@ async def create_farm(
     - **max_guests**: Maximum number of guests
     """
     farm = FarmService.create_farm(session, farm_data)
-    return farm
+    return model_response(FARM_ADAPTER, farm, status_code=201)
 
 
 @router.put("/{farm_id}", response_model=FarmResponse)
@@ -133,7 +307,7 @@ async def update_farm(
     farm = FarmService.update_farm(session, farm_id, farm_data)
     if not farm:
         raise HTTPException(status_code=404, detail="Farm not found")
-    return farm
+    return model_response(FARM_ADAPTER, farm)
 
 
 @router.delete("/{farm_id}", status_code=204)
@@ -161,32 +335,16 @@ async def upload_farm_image(
     - **file**: Image file (JPEG, PNG, GIF, WebP)
     - **is_main**: Set as main image (default: False)
     """
-    # Validate file type
-    allowed_types = ["image/jpeg", "image/png", "image/gif", "image/webp"]
-    if file.content_type not in allowed_types:
-        raise HTTPException(
-            status_code=400,
-            detail="Invalid file type. Only JPEG, PNG, GIF, and WebP are allowed.",
-        )
-
-    # Validate file size (max 10MB)
-    content = await file.read()
-    file_size = len(content)
-
-    if file_size > 10 * 1024 * 1024:  # 10MB
-        raise HTTPException(
-            status_code=400, detail="File too large. Maximum size is 10MB."
-        )
-
     # Check if farm exists
     farm = FarmService.get_farm(session, farm_id)
     if not farm:
         raise HTTPException(status_code=404, detail="Farm not found")
 
-    # Upload to Appwrite Storage
+    # Validate and upload to Appwrite Storage
     try:
-        storage = get_appwrite_storage()
-        image_url = storage.upload_file(content, file.filename, file.content_type)
+        image_url = await upload_image(file)
+    except ImageUploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to upload file: {str(e)}")
 
@@ -218,8 +376,12 @@ async def upload_farm_image(
         display_order=display_order,
     )
     session.add(farm_image)
-    session.commit()
-    session.refresh(farm_image)
+
+    # Bump the farm's updated_at so cached/conditional responses see the new image
+    farm.updated_at = datetime.utcnow()
+    session.add(farm)
+    session.flush()
+    after_commit(session, partial(FarmService.invalidate_farm_detail, farm_id))
 
     return {
         "id": farm_image.id,
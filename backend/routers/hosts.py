@@ -0,0 +1,107 @@
+from datetime import date
+from typing import Literal
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session
+
+from core.responses import rows_response
+from core.unit_of_work import UnitOfWorkRoute
+from database import get_session
+from schemas.dashboard import HostDashboardResponse
+from services.dashboard import DashboardService
+from services.export import EXPORT_MEDIA_TYPES, ExportService, stream_rows
+from services.user import UserService
+
+router = APIRouter(prefix="/api/hosts", tags=["hosts"], route_class=UnitOfWorkRoute)
+
+
+@router.get("/{host_id}/dashboard", response_model=HostDashboardResponse)
+async def get_host_dashboard(
+    host_id: int,
+    session: Session = Depends(get_session),
+):
+    """
+    Get a host's dashboard: reservation counts by status, upcoming
+    check-ins, monthly revenue, per-farm occupancy and ratings
+    """
+    dashboard = DashboardService.get_host_dashboard(session, host_id)
+    if not dashboard:
+        raise HTTPException(
+            status_code=404, detail="Host not found or user is not a host"
+        )
+    return rows_response(dashboard)
+
+
+def export_response(
+    session: Session, host_id: int, name: str, query, fmt: str
+) -> StreamingResponse:
+    """Check the host, release the request's connection and stream the export"""
+    host = UserService.get_user(session, host_id)
+    if not host or host.user_type != "host":
+        raise HTTPException(
+            status_code=404, detail="Host not found or user is not a host"
+        )
+    # The stream reads with its own session; release this connection now
+    session.close()
+
+    filename = f"{name}-host-{host_id}-{date.today():%Y%m%d}.{fmt}"
+    return StreamingResponse(
+        stream_rows(query, fmt),
+        media_type=EXPORT_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+@router.get("/{host_id}/exports/reservations")
+async def export_host_reservations(
+    host_id: int,
+    session: Session = Depends(get_session),
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    status: str | None = None,
+    farm_id: int | None = None,
+    start_date_from: date | None = None,
+    start_date_to: date | None = None,
+):
+    """
+    Download all reservations for a host's farms as CSV or NDJSON
+
+    Rows are streamed from the database, so there is no page size limit.
+
+    - **status**: Optional status filter (pending, approved, completed, cancelled)
+    - **start_date_from** / **start_date_to**: Optional check-in date range (inclusive)
+    """
+    query = ExportService.reservations_query(
+        host_id,
+        farm_id=farm_id,
+        status=status,
+        start_date_from=start_date_from,
+        start_date_to=start_date_to,
+    )
+    return export_response(session, host_id, "reservations", query, format)
+
+
+@router.get("/{host_id}/exports/reviews")
+async def export_host_reviews(
+    host_id: int,
+    session: Session = Depends(get_session),
+    format: Literal["csv", "ndjson"] = Query("csv"),
+    farm_id: int | None = None,
+    rating: int | None = Query(None, ge=1, le=5),
+    experience_date_from: date | None = None,
+    experience_date_to: date | None = None,
+):
+    """
+    Download all reviews received by a host's farms as CSV or NDJSON
+
+    - **rating**: Optional rating filter (1-5)
+    - **experience_date_from** / **experience_date_to**: Optional experience date range (inclusive)
+    """
+    query = ExportService.reviews_query(
+        host_id,
+        farm_id=farm_id,
+        rating=rating,
+        experience_date_from=experience_date_from,
+        experience_date_to=experience_date_to,
+    )
+    return export_response(session, host_id, "reviews", query, format)
@@ -1,56 +1,137 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import asyncio
+from typing import Literal
+
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
 from sqlmodel import Session
 
+from core.conditional import make_etag, not_modified, with_validators
+from core.fieldsets import parse_fields
+from core.idempotency import claim_idempotency_key, remember_response
+from core.responses import model_response, rows_response
+from core.unit_of_work import UnitOfWorkRoute
 from database import get_session
 from schemas.post import (
     CommentCreate,
     CommentListResponse,
     CommentResponse,
     PostCreate,
+    PostImageResponse,
     PostListResponse,
     PostResponse,
     PostUpdate,
 )
-from schemas.review import ReviewCreate, ReviewListResponse, ReviewResponse
-from services.post import CommentService, PostService
-from services.review import ReviewService
+from schemas.review import (
+    FarmRatingResponse,
+    ReviewCreate,
+    ReviewListResponse,
+    ReviewResponse,
+)
+from core.config import settings
+from services.appwrite_storage import ImageUploadError, upload_image
+from services.like_buffer import like_buffer
+from services.post import (
+    POST_LIST_FIELDS,
+    CommentService,
+    LikeUserNotFoundError,
+    PostService,
+)
+from services.post_events import StreamLimitError, post_events, sse_message
+from services.rating import RatingService
+from services.review import ReviewExistsError, ReviewService
 
-router = APIRouter(tags=["posts", "reviews", "comments"])
+router = APIRouter(tags=["posts", "reviews", "comments"], route_class=UnitOfWorkRoute)
+
+REVIEW_ADAPTER = TypeAdapter(ReviewResponse)
+POST_IMAGE_ADAPTER = TypeAdapter(PostImageResponse)
+POST_IMAGE_LIST_ADAPTER = TypeAdapter(list[PostImageResponse])
 
 
 # ========== Posts ==========
 @router.get("/api/posts", response_model=list[PostListResponse])
 async def list_posts(
+    request: Request,
     session: Session = Depends(get_session),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     user_id: int | None = None,
+    fields: str | None = None,
+    viewer_id: int | None = None,
+    sort: Literal["recent", "trending"] = "recent",
 ):
-    """Get list of posts with optional filter"""
-    posts = PostService.get_posts(session, skip=skip, limit=limit, user_id=user_id)
-    return posts
+    """
+    Get list of posts with optional filter
+
+    - **sort**: `recent` (newest first) or `trending` (likes, comments and recency)
+    - **fields**: Comma-separated fields to return (e.g. `title,user_name,like_count,comment_count,latest_comment,first_image_url`)
+    - **viewer_id**: Annotate each post with `liked_by_me` for this user
+    """
+    try:
+        selected = parse_fields(fields, POST_LIST_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    count, last_modified = PostService.get_posts_version(session, user_id=user_id)
+    etag = make_etag(
+        "posts", request.url.query, count, last_modified, like_buffer.generation
+    )
+    if cached := not_modified(request, etag, last_modified):
+        return cached
+
+    posts = PostService.get_posts(
+        session,
+        skip=skip,
+        limit=limit,
+        user_id=user_id,
+        fields=selected,
+        viewer_id=viewer_id,
+        sort=sort,
+    )
+    return with_validators(rows_response(posts), etag, last_modified)
 
 
 @router.get("/api/posts/{post_id}", response_model=PostResponse)
 async def get_post(
     post_id: int,
+    request: Request,
     session: Session = Depends(get_session),
+    viewer_id: int | None = None,
 ):
     """Get a specific post by ID"""
-    post = PostService.get_post(session, post_id)
+    last_modified = PostService.get_post_version(session, post_id)
+    if last_modified is None:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    # 書き込み待ちのいいねは一覧と同じく like_buffer の世代で検知する
+    etag = make_etag(
+        "post", post_id, last_modified, like_buffer.generation, viewer_id
+    )
+    if cached := not_modified(request, etag, last_modified):
+        return cached
+
+    post = PostService.get_post(session, post_id, viewer_id=viewer_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
-    return post
+    return with_validators(rows_response(post), etag, last_modified)
 
 
 @router.post("/api/posts", response_model=PostResponse, status_code=201)
 async def create_post(
     post_data: PostCreate,
+    request: Request,
     session: Session = Depends(get_session),
 ):
-    """Create a new post"""
+    """
+    Create a new post
+
+    A retry with the same `Idempotency-Key` header returns the first response.
+    """
+    if replay := claim_idempotency_key(session, request, post_data):
+        return replay
+
     post = PostService.create_post(session, post_data)
-    return post
+    return remember_response(session, request, rows_response(post, status_code=201))
 
 
 @router.put("/api/posts/{post_id}", response_model=PostResponse)
@@ -63,7 +144,7 @@ async def update_post(
     post = PostService.update_post(session, post_id, post_data)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
-    return post
+    return rows_response(post)
 
 
 @router.delete("/api/posts/{post_id}", status_code=204)
@@ -77,16 +158,118 @@ async def delete_post(
         raise HTTPException(status_code=404, detail="Post not found")
 
 
-@router.post("/api/posts/{post_id}/like", response_model=PostResponse)
+@router.put("/api/posts/{post_id}/likes/{user_id}", response_model=PostResponse)
 async def like_post(
     post_id: int,
+    user_id: int,
     session: Session = Depends(get_session),
 ):
-    """Like a post"""
-    post = PostService.like_post(session, post_id)
+    """Like a post (idempotent)"""
+    try:
+        post = PostService.like_post(session, post_id, user_id)
+    except LikeUserNotFoundError:
+        raise HTTPException(status_code=404, detail="User not found")
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
-    return post
+    return rows_response(post)
+
+
+@router.delete("/api/posts/{post_id}/likes/{user_id}", response_model=PostResponse)
+async def unlike_post(
+    post_id: int,
+    user_id: int,
+    session: Session = Depends(get_session),
+):
+    """Remove a like from a post (idempotent)"""
+    post = PostService.unlike_post(session, post_id, user_id)
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+    return rows_response(post)
+
+
+@router.get("/api/posts/{post_id}/images", response_model=list[PostImageResponse])
+async def list_post_images(
+    post_id: int,
+    session: Session = Depends(get_session),
+):
+    """Get all images of a post in display order"""
+    images = PostService.get_post_images(session, post_id)
+    return model_response(POST_IMAGE_LIST_ADAPTER, images)
+
+
+@router.post(
+    "/api/posts/{post_id}/images", response_model=PostImageResponse, status_code=201
+)
+async def upload_post_image(
+    post_id: int,
+    file: UploadFile = File(...),
+    session: Session = Depends(get_session),
+):
+    """
+    Upload an image for a post
+
+    - **file**: Image file (JPEG, PNG, GIF, WebP, max 10MB)
+    """
+    if not PostService.get_post(session, post_id):
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    try:
+        image_url = await upload_image(file)
+    except ImageUploadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to upload file: {str(e)}")
+
+    post_image = PostService.add_post_image(session, post_id, image_url)
+    return model_response(POST_IMAGE_ADAPTER, post_image, status_code=201)
+
+
+@router.get("/api/posts/{post_id}/stream")
+async def stream_post_events(
+    post_id: int,
+    session: Session = Depends(get_session),
+):
+    """
+    Live activity for a post as Server-Sent Events
+
+    Events: `comment`, `comment_deleted`, `like`. An `overflow` event means
+    the client fell behind and should reload the post and reconnect.
+    """
+    exists = PostService.get_post(session, post_id)
+    # Release the DB connection; it is not needed while the stream is open
+    session.close()
+    if not exists:
+        raise HTTPException(status_code=404, detail="Post not found")
+
+    try:
+        subscription = post_events.subscribe(post_id)
+    except StreamLimitError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+    async def event_stream():
+        try:
+            yield b"retry: 3000\n\n"
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        subscription.queue.get(),
+                        timeout=settings.POST_STREAM_HEARTBEAT_SECONDS,
+                    )
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+                    continue
+                if message is None:
+                    yield sse_message("overflow", {"post_id": post_id})
+                    break
+                yield sse_message(*message)
+        finally:
+            post_events.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # ========== Comments ==========
@@ -101,7 +284,41 @@ async def list_comments(
     comments = CommentService.get_comments_by_post(
         session, post_id, skip=skip, limit=limit
     )
-    return comments
+    return rows_response(comments)
+
+
+@router.get(
+    "/api/posts/{post_id}/comments/thread", response_model=list[CommentListResponse]
+)
+async def get_comment_thread(
+    post_id: int,
+    session: Session = Depends(get_session),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+):
+    """Get a post's comments as a tree, each reply right after its parent"""
+    comments = CommentService.get_comment_thread(
+        session, post_id, skip=skip, limit=limit
+    )
+    return rows_response(comments)
+
+
+@router.get("/api/comments/{comment_id}/thread", response_model=list[CommentListResponse])
+async def get_comment_subtree(
+    comment_id: int,
+    session: Session = Depends(get_session),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=100),
+):
+    """Get a comment followed by all of its replies, in tree order"""
+    comment = CommentService.get_comment(session, comment_id)
+    if not comment:
+        raise HTTPException(status_code=404, detail="Comment not found")
+
+    comments = CommentService.get_comment_thread(
+        session, comment.post_id, root=comment, skip=skip, limit=limit
+    )
+    return rows_response(comments)
 
 
 @router.post(
@@ -110,15 +327,27 @@ async def list_comments(
 async def create_comment(
     post_id: int,
     comment_data: CommentCreate,
+    request: Request,
     session: Session = Depends(get_session),
 ):
-    """Create a new comment on a post"""
+    """
+    Create a new comment on a post, or a reply when parent_id is given
+
+    A retry with the same `Idempotency-Key` header returns the first response.
+    """
+    if replay := claim_idempotency_key(session, request, comment_data):
+        return replay
+
     post = PostService.get_post(session, post_id)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
 
     comment = CommentService.create_comment(session, comment_data)
-    return comment
+    if comment is None:
+        raise HTTPException(status_code=404, detail="Parent comment not found")
+    return remember_response(
+        session, request, rows_response(comment, status_code=201)
+    )
 
 
 @router.delete("/api/comments/{comment_id}", status_code=204)
@@ -126,7 +355,7 @@ async def delete_comment(
     comment_id: int,
     session: Session = Depends(get_session),
 ):
-    """Delete a comment"""
+    """Delete a comment and its replies"""
     success = CommentService.delete_comment(session, comment_id)
     if not success:
         raise HTTPException(status_code=404, detail="Comment not found")
@@ -148,35 +377,49 @@ async def list_farm_reviews(
 @router.get("/api/reviews/{review_id}", response_model=ReviewResponse)
 async def get_review(
     review_id: int,
+    request: Request,
     session: Session = Depends(get_session),
 ):
     """Get a specific review by ID"""
     review = ReviewService.get_review(session, review_id)
     if not review:
         raise HTTPException(status_code=404, detail="Review not found")
-    return review
+
+    etag = make_etag("review", review.id, review.updated_at)
+    if cached := not_modified(request, etag, review.updated_at):
+        return cached
+    return with_validators(
+        model_response(REVIEW_ADAPTER, review), etag, review.updated_at
+    )
 
 
 @router.post("/api/reviews", response_model=ReviewResponse, status_code=201)
 async def create_review(
     review_data: ReviewCreate,
+    request: Request,
     session: Session = Depends(get_session),
 ):
-    """Create a new review"""
+    """
+    Create a new review
+
+    A retry with the same `Idempotency-Key` header returns the first response.
+    """
+    if replay := claim_idempotency_key(session, request, review_data):
+        return replay
+
     try:
         review = ReviewService.create_review(session, review_data)
-        return review
-    except Exception as e:
-        # Check for unique constraint violation
-        if "unique" in str(e).lower() or "duplicate" in str(e).lower():
-            raise HTTPException(
-                status_code=422,
-                detail="この予約は既にレビュー済みです"
-            )
+    except ReviewExistsError:
+        # 1予約につき1レビュー
         raise HTTPException(
-            status_code=500,
-            detail=f"レビューの作成に失敗しました: {str(e)}"
+            status_code=422,
+            detail="この予約は既にレビュー済みです"
         )
+    return remember_response(
+        session,
+        request,
+        model_response(REVIEW_ADAPTER, review, status_code=201),
+    )
 
 
 @router.delete("/api/reviews/{review_id}", status_code=204)
@@ -190,14 +433,14 @@ async def delete_review(
         raise HTTPException(status_code=404, detail="Review not found")
 
 
-@router.get("/api/farms/{farm_id}/rating")
+@router.get("/api/farms/{farm_id}/rating", response_model=FarmRatingResponse)
 async def get_farm_rating(
     farm_id: int,
     session: Session = Depends(get_session),
 ):
-    """Get average rating for a farm"""
-    avg_rating = ReviewService.get_farm_average_rating(session, farm_id)
-    return {
-        "farm_id": farm_id,
-        "average_rating": avg_rating,
-    }
+    """
+    Get average rating, review count and the 1-5 rating distribution for a farm
+
+    Read from the farm's rating aggregate, not computed over its reviews.
+    """
+    return rows_response(RatingService.get_farm_rating(session, farm_id))
@@ -1,89 +1,117 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+import logging
+from datetime import date
+
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request
+from pydantic import TypeAdapter
 from sqlmodel import Session, select
 
+from core.conditional import make_etag, not_modified, with_validators
+from core.fieldsets import parse_fields
+from core.idempotency import claim_idempotency_key, remember_response
+from core.responses import model_response, rows_response
+from core.unit_of_work import UnitOfWorkRoute
 from database import get_session
 from models.farm import Farm
 from models.farm_image import FarmImage
+from models.reservation import Reservation
 from models.user import User
-from models import Review
 from schemas.reservation import (
     ApprovalRequest,
+    BulkStatusRequest,
+    BulkStatusResponse,
     ReservationCreate,
     ReservationListResponse,
     ReservationResponse,
     ReservationUpdate,
 )
 from services.email_service import EmailService
-from services.reservation import ReservationService
+from services.reservation import (
+    RESERVATION_LIST_FIELDS,
+    ReservationConflictError,
+    ReservationService,
+)
+
+router = APIRouter(
+    prefix="/api/reservations", tags=["reservations"],
+    route_class=UnitOfWorkRoute,
+)
+
+RESERVATION_ADAPTER = TypeAdapter(ReservationResponse)
 
-router = APIRouter(prefix="/api/reservations", tags=["reservations"])
+logger = logging.getLogger(__name__)
+
+
+def parse_reservation_fields(fields: str | None) -> list[str] | None:
+    """Validate a ?fields= value for reservation list endpoints"""
+    try:
+        return parse_fields(fields, RESERVATION_LIST_FIELDS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("", response_model=list[ReservationListResponse])
 async def list_reservations(
+    request: Request,
     session: Session = Depends(get_session),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     guest_id: int | None = None,
     farm_id: int | None = None,
     status: str | None = None,
+    fields: str | None = None,
 ):
-    """Get list of reservations with optional filters"""
-    reservations = ReservationService.get_reservations(
-        session, skip=skip, limit=limit, guest_id=guest_id, farm_id=farm_id, status=status
-    )
-
-    # レビューの有無をチェックし、ファーム情報を追加
-    result = []
-    for reservation in reservations:
-        review = session.exec(
-            select(Review).where(Review.reservation_id == reservation.id)
-        ).first()
+    """
+    Get list of reservations with optional filters
 
-        # ファーム情報を取得
-        farm = session.exec(
-            select(Farm).where(Farm.id == reservation.farm_id)
-        ).first()
+    - **fields**: Comma-separated fields to return (e.g. `start_date,end_date,status,farm`)
+    """
+    selected = parse_reservation_fields(fields)
 
-        farm_info = None
-        if farm:
-            # メイン画像を取得
-            main_image = session.exec(
-                select(FarmImage)
-                .where(FarmImage.farm_id == farm.id)
-                .where(FarmImage.is_main == True)
-            ).first()
-
-            farm_info = {
-                "id": farm.id,
-                "name": farm.name,
-                "main_image_url": main_image.image_url if main_image else None
-            }
-
-        reservation_dict = {
-            **reservation.model_dump(),
-            "has_review": review is not None,
-            "farm": farm_info
-        }
-        result.append(ReservationListResponse(**reservation_dict))
+    count, last_modified = ReservationService.get_reservations_version(
+        session, guest_id=guest_id, farm_id=farm_id, status=status
+    )
+    etag = make_etag("reservations", request.url.query, count, last_modified)
+    if cached := not_modified(request, etag, last_modified):
+        return cached
 
-    return result
+    reservations = ReservationService.get_reservations(
+        session,
+        skip=skip,
+        limit=limit,
+        guest_id=guest_id,
+        farm_id=farm_id,
+        status=status,
+        fields=selected,
+    )
+    return with_validators(rows_response(reservations), etag, last_modified)
 
 
 @router.get("/{reservation_id}", response_model=ReservationResponse)
 async def get_reservation(
     reservation_id: int,
+    request: Request,
     session: Session = Depends(get_session),
 ):
-    """Get a specific reservation by ID"""
-    reservation = ReservationService.get_reservation(session, reservation_id)
-    if not reservation:
-        raise HTTPException(status_code=404, detail="Reservation not found")
+    """
+    Get a specific reservation by ID
 
-    # ファーム情報を取得
-    farm = session.exec(
-        select(Farm).where(Farm.id == reservation.farm_id)
+    The validators cover the embedded farm too, so a farm rename or a new
+    main image is not hidden behind a 304.
+    """
+    result = session.exec(
+        select(Reservation, Farm)
+        .outerjoin(Farm, Reservation.farm_id == Farm.id)
+        .where(Reservation.id == reservation_id)
     ).first()
+    if not result:
+        raise HTTPException(status_code=404, detail="Reservation not found")
+    reservation, farm = result
+
+    farm_modified = farm.updated_at if farm else None
+    last_modified = max(reservation.updated_at, farm_modified or reservation.updated_at)
+    etag = make_etag("reservation", reservation.id, reservation.updated_at, farm_modified)
+    if cached := not_modified(request, etag, last_modified):
+        return cached
 
     farm_info = None
     if farm:
@@ -105,17 +133,34 @@ async def get_reservation(
         "farm": farm_info
     }
 
-    return ReservationResponse(**reservation_dict)
+    return with_validators(
+        model_response(RESERVATION_ADAPTER, reservation_dict),
+        etag,
+        last_modified,
+    )
 
 
 @router.post("", response_model=ReservationResponse, status_code=201)
 async def create_reservation(
     reservation_data: ReservationCreate,
+    request: Request,
     session: Session = Depends(get_session),
 ):
-    """Create a new reservation"""
+    """
+    Create a new reservation
+
+    Send an `Idempotency-Key` header to make retries safe: a repeated request
+    with the same key returns the first response instead of a new reservation.
+    """
+    if replay := claim_idempotency_key(session, request, reservation_data):
+        return replay
+
     reservation = ReservationService.create_reservation(session, reservation_data)
-    return reservation
+    return remember_response(
+        session,
+        request,
+        model_response(RESERVATION_ADAPTER, reservation, status_code=201),
+    )
 
 
 @router.put("/{reservation_id}", response_model=ReservationResponse)
@@ -124,13 +169,23 @@ async def update_reservation(
     reservation_data: ReservationUpdate,
     session: Session = Depends(get_session),
 ):
-    """Update a reservation status"""
-    reservation = ReservationService.update_reservation(
-        session, reservation_id, reservation_data
-    )
+    """
+    Update a reservation status
+
+    The status may only change along the allowed transitions
+    (pending → approved/cancelled, approved → completed/cancelled). Send
+    ``version`` to update only the version you read; a concurrent change
+    answers 409.
+    """
+    try:
+        reservation = ReservationService.update_reservation(
+            session, reservation_id, reservation_data
+        )
+    except ReservationConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     if not reservation:
         raise HTTPException(status_code=404, detail="Reservation not found")
-    return reservation
+    return model_response(RESERVATION_ADAPTER, reservation)
 
 
 @router.post("/{reservation_id}/cancel", response_model=ReservationResponse)
@@ -143,12 +198,14 @@ async def cancel_reservation(
     if not reservation:
         raise HTTPException(status_code=404, detail="Reservation not found")
 
-    # ステータスを cancelled に更新
-    reservation_update = ReservationUpdate(status="cancelled")
-    updated_reservation = ReservationService.update_reservation(
-        session, reservation_id, reservation_update
-    )
-    return updated_reservation
+    # ステータスを cancelled に更新（他のリクエストと競合したら 409）
+    try:
+        updated_reservation = ReservationService.transition_status(
+            session, reservation, "cancelled"
+        )
+    except ReservationConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return model_response(RESERVATION_ADAPTER, updated_reservation)
 
 
 @router.delete("/{reservation_id}", status_code=204)
@@ -165,10 +222,15 @@ async def delete_reservation(
 @router.get("/host/{host_id}", response_model=list[ReservationListResponse])
 async def get_host_reservations(
     host_id: int,
+    request: Request,
     session: Session = Depends(get_session),
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=100),
     status: str | None = None,
+    farm_id: int | None = None,
+    start_date_from: date | None = None,
+    start_date_to: date | None = None,
+    fields: str | None = None,
 ):
     """
     Get all reservations for farms owned by a specific host
@@ -179,100 +241,136 @@ async def get_host_reservations(
         skip: Number of records to skip
         limit: Maximum number of records to return
         status: Optional status filter (pending, approved, completed, cancelled)
+        farm_id: Optional filter to one of the host's farms
+        start_date_from: Optional earliest check-in date (inclusive)
+        start_date_to: Optional latest check-in date (inclusive)
+        fields: Optional comma-separated fields to return
 
     Returns:
         List of reservations for the host's farms
     """
-    # Get all farm IDs owned by the host
-    farms = session.exec(select(Farm).where(Farm.host_id == host_id)).all()
-    farm_ids = [farm.id for farm in farms]
-
-    if not farm_ids:
-        return []
-
-    # Get reservations for these farms
-    from models.reservation import Reservation
+    selected = parse_reservation_fields(fields)
+    filters = dict(
+        host_id=host_id,
+        farm_id=farm_id,
+        status=status,
+        start_date_from=start_date_from,
+        start_date_to=start_date_to,
+    )
 
-    query = select(Reservation).where(Reservation.farm_id.in_(farm_ids))
+    count, last_modified = ReservationService.get_reservations_version(
+        session, **filters
+    )
+    etag = make_etag(
+        "host-reservations", host_id, request.url.query, count, last_modified
+    )
+    if cached := not_modified(request, etag, last_modified):
+        return cached
 
-    if status:
-        query = query.where(Reservation.status == status)
+    reservations = ReservationService.get_reservations(
+        session,
+        skip=skip,
+        limit=limit,
+        fields=selected,
+        **filters,
+    )
+    return with_validators(rows_response(reservations), etag, last_modified)
 
-    query = query.offset(skip).limit(limit).order_by(Reservation.created_at.desc())
 
-    reservations = session.exec(query).all()
+@router.post("/bulk-status", response_model=BulkStatusResponse)
+async def bulk_update_reservation_status(
+    bulk_data: BulkStatusRequest,
+    background_tasks: BackgroundTasks,
+    session: Session = Depends(get_session),
+):
+    """
+    Approve, cancel or complete many reservations of one host at once
 
-    # レビューの有無をチェックし、ファーム情報を追加
-    result = []
-    for reservation in reservations:
-        review = session.exec(
-            select(Review).where(Review.reservation_id == reservation.id)
-        ).first()
+    All reservations must exist and belong to the host's farms, or nothing
+    is changed. Reservations whose status does not allow the transition are
+    returned in ``skipped``. Approval emails are queued as one batch that
+    is sent after the commit.
+    """
+    reservation_ids = list(dict.fromkeys(bulk_data.reservation_ids))
+    rows = ReservationService.get_reservations_for_host_action(session, reservation_ids)
 
-        # ファーム情報を取得
-        farm = session.exec(
-            select(Farm).where(Farm.id == reservation.farm_id)
-        ).first()
+    found_ids = {reservation.id for reservation, _, _, _ in rows}
+    missing = [rid for rid in reservation_ids if rid not in found_ids]
+    if missing:
+        raise HTTPException(
+            status_code=404, detail=f"Reservations not found: {missing}"
+        )
+    if any(host_id != bulk_data.host_id for _, host_id, _, _ in rows):
+        raise HTTPException(
+            status_code=403,
+            detail="Only the farm host can update these reservations",
+        )
 
-        farm_info = None
-        if farm:
-            # メイン画像を取得
-            main_image = session.exec(
-                select(FarmImage)
-                .where(FarmImage.farm_id == farm.id)
-                .where(FarmImage.is_main == True)
-            ).first()
-
-            farm_info = {
-                "id": farm.id,
-                "name": farm.name,
-                "main_image_url": main_image.image_url if main_image else None
-            }
-
-        reservation_dict = {
-            **reservation.model_dump(),
-            "has_review": review is not None,
-            "farm": farm_info
-        }
-        result.append(ReservationListResponse(**reservation_dict))
+    updated_ids, skipped = ReservationService.bulk_update_status(
+        session, [reservation for reservation, _, _, _ in rows], bulk_data.status
+    )
 
-    return result
+    if bulk_data.status == "approved":
+        updated = set(updated_ids)
+        recipients = [
+            (
+                guest_email,
+                {
+                    "farm_name": farm_name,
+                    "start_date": str(reservation.start_date),
+                    "end_date": str(reservation.end_date),
+                    "num_guests": reservation.num_guests,
+                    "total_price": reservation.total_amount,
+                    "approval_message": bulk_data.approval_message or "",
+                },
+            )
+            for reservation, _, farm_name, guest_email in rows
+            if reservation.id in updated and guest_email
+        ]
+        if recipients:
+            background_tasks.add_task(
+                EmailService.send_reservation_approved_emails, recipients
+            )
+
+    return rows_response(
+        {"status": bulk_data.status, "updated_ids": updated_ids, "skipped": skipped}
+    )
 
 
 @router.post("/{reservation_id}/approve", response_model=ReservationResponse)
 async def approve_reservation(
     reservation_id: int,
     approval_data: ApprovalRequest,
+    background_tasks: BackgroundTasks,
     session: Session = Depends(get_session),
 ):
     """
     Approve a reservation and send email notification to the guest
 
+    The status changes with one conditional UPDATE (pending and the version
+    that was read, or ``approval_data.version`` if given), so when two tabs
+    approve at once only one succeeds and sends the email; the other gets
+    409. The email is sent as a background task, i.e. only after the
+    approval has been committed and the response sent.
+
     Args:
         reservation_id: ID of the reservation to approve
         approval_data: Approval data including host_id and optional message
+        background_tasks: Runs the email after the response
         session: Database session
 
     Returns:
         Updated reservation
 
     Raises:
-        HTTPException: If reservation not found, already approved, or user not authorized
+        HTTPException: If reservation not found, user not authorized, or the
+            reservation is no longer pending (409)
     """
-    from models.reservation import Reservation
-
     # Get the reservation
     reservation = ReservationService.get_reservation(session, reservation_id)
     if not reservation:
         raise HTTPException(status_code=404, detail="Reservation not found")
 
-    # Check if already approved
-    if reservation.status != "pending":
-        raise HTTPException(
-            status_code=400,
-            detail=f"Reservation is already {reservation.status}"
-        )
-
     # Get the farm to check authorization
     farm = session.exec(select(Farm).where(Farm.id == reservation.farm_id)).first()
     if not farm:
@@ -285,17 +383,19 @@ async def approve_reservation(
             detail="Only the farm host can approve reservations"
         )
 
-    # Update reservation status to approved
-    reservation_update = ReservationUpdate(status="approved")
-    updated_reservation = ReservationService.update_reservation(
-        session, reservation_id, reservation_update
-    )
+    # Update reservation status to approved (pending → approved only once)
+    try:
+        updated_reservation = ReservationService.transition_status(
+            session, reservation, "approved", approval_data.version
+        )
+    except ReservationConflictError as e:
+        raise HTTPException(status_code=409, detail=str(e))
 
     # Get guest information for email
     guest = session.exec(select(User).where(User.id == reservation.guest_id)).first()
     if not guest or not guest.email:
         # If no guest email, still approve but don't send email
-        return updated_reservation
+        return model_response(RESERVATION_ADAPTER, updated_reservation)
 
     # Prepare email data
     email_data = {
@@ -307,13 +407,15 @@ async def approve_reservation(
         "approval_message": approval_data.approval_message or "",
     }
 
-    # Send email asynchronously (don't fail approval if email fails)
+    # Send email after commit (don't fail approval if email fails)
+    background_tasks.add_task(send_approval_email, guest.email, email_data)
+
+    return model_response(RESERVATION_ADAPTER, updated_reservation)
+
+
+async def send_approval_email(email: str, email_data: dict) -> None:
+    """Send the approval email, logging instead of raising on failure"""
     try:
-        await EmailService.send_reservation_approved_email(guest.email, email_data)
+        await EmailService.send_reservation_approved_email(email, email_data)
     except Exception as e:
-        # Log the error but don't fail the approval
-        import logging
-        logger = logging.getLogger(__name__)
         logger.error(f"Failed to send approval email: {str(e)}")
-
-    return updated_reservation
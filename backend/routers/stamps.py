@@ -1,8 +1,11 @@
 from fastapi import APIRouter, Depends, HTTPException
+from pydantic import TypeAdapter
 from sqlmodel import Session
 from typing import Optional
 
 
+from core.responses import model_response
+from core.unit_of_work import UnitOfWorkRoute
 from database import get_session
 from schemas.stamp import (
     PrefectureStampResponse,
@@ -13,7 +16,12 @@ from schemas.stamp import (
 from services.stamp import StampService
 
 
-router = APIRouter(prefix="/api/stamps", tags=["stamps"])
+router = APIRouter(prefix="/api/stamps", tags=["stamps"], route_class=UnitOfWorkRoute)
+
+PREFECTURE_LIST_ADAPTER = TypeAdapter(list[PrefectureStampResponse])
+COLLECTION_ADAPTER = TypeAdapter(StampCollectionResponse)
+PREFECTURE_DETAIL_ADAPTER = TypeAdapter(PrefectureDetailResponse)
+RANKING_ADAPTER = TypeAdapter(RankingResponse)
 
 
 
@@ -23,7 +31,7 @@ async def get_all_prefectures(session: Session = Depends(get_session)):
     """全都道府県マスタを取得"""
     prefectures = StampService.get_all_prefectures(session)
 
-    return prefectures
+    return model_response(PREFECTURE_LIST_ADAPTER, prefectures)
 
 
 
@@ -35,7 +43,7 @@ async def get_user_stamp_collection(
     """ユーザーのスタンプ収集状況を取得"""
     # TODO: 認証チェック（ログインユーザーのみ自分のコレクションを閲覧可能）
     collection = StampService.get_user_stamp_collection(session, user_id)
-    return collection
+    return model_response(COLLECTION_ADAPTER, collection)
 
 
 
@@ -54,7 +62,7 @@ async def get_prefecture_detail(
         raise HTTPException(
             status_code=404, detail="Prefecture not visited or not found"
         )
-    return detail
+    return model_response(PREFECTURE_DETAIL_ADAPTER, detail)
 
 
 
@@ -67,4 +75,4 @@ async def get_stamp_rally_ranking(
 ):
     """スタンプラリーランキングを取得"""
     ranking = StampService.get_ranking(session, limit, current_user_id)
-    return ranking
+    return model_response(RANKING_ADAPTER, ranking)
@@ -3,8 +3,12 @@ import uuid
 from datetime import datetime
 from pathlib import Path
 
+from core.conditional import make_etag, not_modified, with_validators
+from core.responses import model_response
+from core.unit_of_work import UnitOfWorkRoute
 from database import get_session
-from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, UploadFile
+from pydantic import TypeAdapter
 from schemas.user import (
     HostReceivedReviewsResponse,
     UserCreate,
@@ -15,7 +19,9 @@ from schemas.user import (
 from services.user import UserService
 from sqlmodel import Session
 
-router = APIRouter(prefix="/api/users", tags=["users"])
+router = APIRouter(prefix="/api/users", tags=["users"], route_class=UnitOfWorkRoute)
+
+USER_ADAPTER = TypeAdapter(UserResponse)
 
 
 @router.get("", response_model=list[UserListResponse])
@@ -45,13 +51,18 @@ async def get_user_by_email(
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: int,
+    request: Request,
     session: Session = Depends(get_session),
 ):
     """Get a specific user by ID"""
     user = UserService.get_user(session, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+
+    etag = make_etag("user", user.id, user.updated_at)
+    if cached := not_modified(request, etag, user.updated_at):
+        return cached
+    return with_validators(model_response(USER_ADAPTER, user), etag, user.updated_at)
 
 
 @router.post("", response_model=UserResponse, status_code=201)
@@ -65,7 +76,7 @@ async def create_user(
         raise HTTPException(status_code=400, detail="User already exists")
 
     user = UserService.create_user(session, user_data)
-    return user
+    return model_response(USER_ADAPTER, user, status_code=201)
 
 
 @router.put("/{user_id}", response_model=UserResponse)
@@ -78,7 +89,7 @@ async def update_user(
     user = UserService.update_user(session, user_id, user_data)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    return model_response(USER_ADAPTER, user)
 
 
 @router.delete("/{user_id}", status_code=204)
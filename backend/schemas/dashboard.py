@@ -0,0 +1,49 @@
+from datetime import date
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class UpcomingCheckIn(BaseModel):
+    """直近のチェックイン予定"""
+
+    id: int
+    farm_id: int
+    farm_name: str
+    guest_id: int
+    guest_name: str
+    start_date: date
+    end_date: date
+    num_guests: int
+    status: str
+
+
+class MonthlyRevenue(BaseModel):
+    """月別売上（承認済み・完了した予約の total_amount をチェックイン月で集計）"""
+
+    month: str  # YYYY-MM
+    revenue: int
+    reservations: int
+
+
+class FarmDashboardStats(BaseModel):
+    """ファームごとの稼働率と評価"""
+
+    farm_id: int
+    farm_name: str
+    occupancy_rate: float  # 今後30日間の予約人泊 / 定員人泊
+    average_rating: Optional[float] = None
+    review_count: int
+
+
+class HostDashboardResponse(BaseModel):
+    """ホストダッシュボードの集計"""
+
+    host_id: int
+    status_counts: dict[str, int]
+    total_reservations: int
+    upcoming_check_ins: list[UpcomingCheckIn]
+    monthly_revenue: list[MonthlyRevenue]
+    farms: list[FarmDashboardStats]
+    average_rating: Optional[float] = None
+    review_count: int
@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
 from typing import Optional
 
@@ -77,3 +77,70 @@ class FarmListResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class CalendarDay(BaseModel):
+    """Schema for a single day of a farm's occupancy calendar"""
+
+    date: date
+    booked_guests: int
+    remaining_capacity: int
+
+
+class FarmCalendarResponse(BaseModel):
+    """Schema for Farm occupancy calendar response"""
+
+    farm_id: int
+    max_guests: int
+    days: list[CalendarDay]
+
+
+class FarmImageResponse(BaseModel):
+    """Schema for Farm image response"""
+
+    id: int
+    farm_id: int
+    image_url: str
+    is_main: bool
+    display_order: int
+
+    class Config:
+        from_attributes = True
+
+
+class FarmHostInfo(BaseModel):
+    """Host information for farm detail response"""
+
+    id: int
+    name: str
+    avatar_url: Optional[str] = None
+
+
+class FarmRatingSummary(BaseModel):
+    """Rating summary for farm detail response"""
+
+    average_rating: Optional[float] = None
+    review_count: int = 0
+    distribution: dict[str, int] = {}  # 評価（"1"〜"5"）ごとのレビュー数
+
+
+class FarmDetailReview(BaseModel):
+    """Review information for farm detail response"""
+
+    id: int
+    guest_id: int
+    guest_name: Optional[str] = None
+    rating: int
+    comment: Optional[str] = None
+    experience_date: date
+    created_at: datetime
+
+
+class FarmDetailResponse(BaseModel):
+    """Schema for composite Farm detail response"""
+
+    farm: FarmResponse
+    images: Optional[list[FarmImageResponse]] = None
+    rating: Optional[FarmRatingSummary] = None
+    recent_reviews: Optional[list[FarmDetailReview]] = None
+    host: Optional[FarmHostInfo] = None
@@ -31,16 +31,28 @@ class PostResponse(PostBase):
     id: int
     user_id: int
     like_count: int
+    comment_count: int = 0
     created_at: datetime
     updated_at: datetime
     user_name: Optional[str] = None
     user_type: Optional[str] = None
     farm_name: Optional[str] = None
+    liked_by_me: Optional[bool] = None
 
     class Config:
         from_attributes = True
 
 
+class CommentPreview(BaseModel):
+    """Schema for the latest comment shown on a post list item"""
+
+    id: int
+    user_id: int
+    user_name: Optional[str] = None
+    content: str
+    created_at: datetime
+
+
 class PostListResponse(BaseModel):
     """Schema for Post list response"""
 
@@ -49,11 +61,28 @@ class PostListResponse(BaseModel):
     title: str
     content: str
     like_count: int
+    comment_count: int = 0
+    latest_comment: Optional[CommentPreview] = None
+    first_image_url: Optional[str] = None
     created_at: datetime
     user_name: Optional[str] = None
     user_type: Optional[str] = None
     farm_id: Optional[int] = None
     farm_name: Optional[str] = None
+    liked_by_me: Optional[bool] = None
+
+    class Config:
+        from_attributes = True
+
+
+class PostImageResponse(BaseModel):
+    """Schema for Post image response"""
+
+    id: int
+    post_id: int
+    image_url: str
+    display_order: int
+    created_at: datetime
 
     class Config:
         from_attributes = True
@@ -70,6 +99,7 @@ class CommentCreate(CommentBase):
 
     user_id: int
     post_id: int
+    parent_id: Optional[int] = None
 
 
 class CommentResponse(CommentBase):
@@ -78,6 +108,9 @@ class CommentResponse(CommentBase):
     id: int
     post_id: int
     user_id: int
+    parent_id: Optional[int] = None
+    depth: int = 0
+    reply_count: int = 0
     created_at: datetime
     updated_at: datetime
     user_name: Optional[str] = None
@@ -93,6 +126,9 @@ class CommentListResponse(BaseModel):
     id: int
     post_id: int
     user_id: int
+    parent_id: Optional[int] = None
+    depth: int = 0
+    reply_count: int = 0
     content: str
     created_at: datetime
     user_name: Optional[str] = None
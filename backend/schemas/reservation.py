@@ -1,5 +1,5 @@
 from datetime import date, datetime
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -22,11 +22,15 @@ class ReservationCreate(ReservationBase):
     guest_id: int
 
 
+ReservationStatus = Literal["pending", "approved", "completed", "cancelled"]
+
+
 class ReservationUpdate(BaseModel):
     """Schema for updating a Reservation"""
 
-    status: Optional[str] = None
+    status: Optional[ReservationStatus] = None
     message: Optional[str] = None
+    version: Optional[int] = None  # 指定した場合、このバージョンのときだけ更新する
 
 
 class FarmInfo(BaseModel):
@@ -43,6 +47,7 @@ class ReservationResponse(ReservationBase):
     id: int
     guest_id: int
     status: str
+    version: int
     created_at: datetime
     updated_at: datetime
     farm: Optional[FarmInfo] = None  # ファーム情報
@@ -60,6 +65,7 @@ class ReservationListResponse(BaseModel):
     start_date: date
     end_date: date
     status: str
+    version: int
     total_amount: int
     created_at: datetime
     has_review: bool = False  # レビューが存在するかどうか
@@ -74,3 +80,28 @@ class ApprovalRequest(BaseModel):
 
     approval_message: Optional[str] = None
     host_id: int  # ホストのIDを指定
+    version: Optional[int] = None  # 画面に表示していた予約のバージョン
+
+
+class BulkStatusRequest(BaseModel):
+    """Schema for applying one status change to many reservations"""
+
+    host_id: int  # ホストのIDを指定
+    reservation_ids: list[int] = Field(..., min_length=1, max_length=100)
+    status: Literal["approved", "cancelled", "completed"]
+    approval_message: Optional[str] = None  # 承認時のメールに記載
+
+
+class SkippedReservation(BaseModel):
+    """A reservation left unchanged because its status does not allow the transition"""
+
+    id: int
+    status: str
+
+
+class BulkStatusResponse(BaseModel):
+    """Schema for the result of a bulk status change"""
+
+    status: str
+    updated_ids: list[int]
+    skipped: list[SkippedReservation]
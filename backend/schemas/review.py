@@ -45,3 +45,12 @@ class ReviewListResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class FarmRatingResponse(BaseModel):
+    """Schema for a farm's rating aggregate"""
+
+    farm_id: int
+    average_rating: Optional[float] = None
+    review_count: int
+    distribution: dict[str, int]  # 評価（"1"〜"5"）ごとのレビュー数
@@ -0,0 +1,195 @@
+"""
+ユーザー削除（関連データの一括削除）のベンチマーク
+
+数千件の関連行を持つユーザーを作成し、次の2つの経路で削除時間とSQL実行回数を比較する。
+
+旧経路: 関連行をすべてセッションに読み込み、1件ずつ session.delete()
+新経路: UserService.delete_user（テーブルごとに DELETE ... WHERE を1回）
+
+Usage:
+    cd backend
+    python scripts/bench_cascade_delete.py [--posts 200]
+
+一時ディレクトリのSQLiteに作成したデータで計測する（既存のデータベースには触れない）。
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, create_engine, func, select
+
+from models import (
+    Comment,
+    Farm,
+    FarmImage,
+    Post,
+    PostLike,
+    PrefectureStamp,
+    Reservation,
+    Review,
+    User,
+    UserStampDetail,
+)
+from services.post import comment_path
+from services.rating import RatingService
+from services.user import UserService
+
+
+def build_fixture(session: Session, posts: int) -> int:
+    """削除対象ユーザーと関連行を作成し、ユーザーIDを返す"""
+    target = User(google_id="target", email="target@example.com", name="削除対象", user_type="host")
+    others = [
+        User(google_id=f"other{i}", email=f"other{i}@example.com", name=f"ゲスト{i}")
+        for i in range(10)
+    ]
+    session.add(target)
+    session.add_all(others)
+    session.add(PrefectureStamp(
+        prefecture_code="20", name="長野県", name_romaji="Nagano",
+        image_url="/stamps/nagano.png", region="中部", display_order=20,
+    ))
+    session.flush()
+
+    farm_args = dict(
+        description="農業体験", prefecture="長野県", city="松本市", address="住所",
+        experience_type="agriculture", price_per_day=8000, max_guests=100,
+        facilities={}, access_info="駅から20分",
+    )
+    own_farm = Farm(host_id=target.id, name="削除対象の農園", **farm_args)
+    other_farm = Farm(host_id=others[0].id, name="他の農園", **farm_args)
+    session.add_all([own_farm, other_farm])
+    session.flush()
+    session.add_all(
+        FarmImage(farm_id=own_farm.id, image_url=f"/img/{i}.jpg", display_order=i)
+        for i in range(20)
+    )
+
+    # 投稿（他ユーザーのいいね・コメント付き）と、他ユーザーの投稿へのいいね・コメント
+    own_posts = [Post(user_id=target.id, title=f"投稿{i}", content="本文") for i in range(posts)]
+    other_posts = [Post(user_id=others[0].id, title=f"他の投稿{i}", content="本文") for i in range(posts)]
+    session.add_all(own_posts + other_posts)
+    session.flush()
+    comments = []
+    for post in own_posts:
+        session.add_all(PostLike(post_id=post.id, user_id=u.id) for u in others)
+        comments += [Comment(post_id=post.id, user_id=u.id, content="コメント") for u in others]
+    for post in other_posts:
+        session.add(PostLike(post_id=post.id, user_id=target.id))
+        comments += [Comment(post_id=post.id, user_id=target.id, content="コメント") for _ in range(3)]
+        post.like_count, post.comment_count = 1, 3
+    session.add_all(comments)
+    session.flush()
+    for comment in comments:
+        comment.path = comment_path("", comment.id)
+
+    # 予約・レビュー（自分の農園への他ユーザーの予約と、他の農園への自分の予約）
+    start = date(2025, 1, 1)
+    for i in range(posts):
+        for guest_id, farm_id in ((others[i % 10].id, own_farm.id), (target.id, other_farm.id)):
+            reservation = Reservation(
+                guest_id=guest_id, farm_id=farm_id,
+                start_date=start + timedelta(days=i), end_date=start + timedelta(days=i + 1),
+                num_guests=1, total_amount=8000, status="completed", contact_phone="000",
+            )
+            session.add(reservation)
+            session.flush()
+            review = Review(
+                reservation_id=reservation.id, guest_id=guest_id, farm_id=farm_id,
+                rating=5, experience_date=reservation.start_date,
+            )
+            session.add(review)
+            session.flush()
+            session.add(UserStampDetail(
+                guest_id=guest_id, prefecture_code="20", farm_id=farm_id,
+                review_id=review.id, visit_date=review.experience_date,
+                experience_type="agriculture",
+            ))
+
+    RatingService.rebuild(session)
+    session.commit()
+    return target.id
+
+
+def count_dependents(session: Session, user_id: int) -> int:
+    """ユーザーに依存する行数（概算）"""
+    own_posts = select(Post.id).where(Post.user_id == user_id)
+    own_farms = select(Farm.id).where(Farm.host_id == user_id)
+    return sum(
+        session.exec(select(func.count()).select_from(model).where(condition)).one()
+        for model, condition in (
+            (Post, Post.user_id == user_id),
+            (PostLike, (PostLike.user_id == user_id) | PostLike.post_id.in_(own_posts)),
+            (Comment, (Comment.user_id == user_id) | Comment.post_id.in_(own_posts)),
+            (Reservation, (Reservation.guest_id == user_id) | Reservation.farm_id.in_(own_farms)),
+            (Review, (Review.guest_id == user_id) | Review.farm_id.in_(own_farms)),
+            (UserStampDetail, (UserStampDetail.guest_id == user_id) | UserStampDetail.farm_id.in_(own_farms)),
+            (FarmImage, FarmImage.farm_id.in_(own_farms)),
+        )
+    )
+
+
+def delete_user_orm(session: Session, user_id: int) -> None:
+    """旧経路: 関連行を読み込んで1件ずつ削除"""
+    farm_ids = list(session.exec(select(Farm.id).where(Farm.host_id == user_id)).all())
+    post_ids = list(session.exec(select(Post.id).where(Post.user_id == user_id)).all())
+    for model, condition in (
+        (UserStampDetail, (UserStampDetail.guest_id == user_id) | UserStampDetail.farm_id.in_(farm_ids)),
+        (PostLike, (PostLike.user_id == user_id) | PostLike.post_id.in_(post_ids)),
+        (Comment, (Comment.user_id == user_id) | Comment.post_id.in_(post_ids)),
+        (Post, Post.user_id == user_id),
+        (Review, (Review.guest_id == user_id) | Review.farm_id.in_(farm_ids)),
+        (Reservation, (Reservation.guest_id == user_id) | Reservation.farm_id.in_(farm_ids)),
+        (FarmImage, FarmImage.farm_id.in_(farm_ids)),
+        (Farm, Farm.host_id == user_id),
+        (User, User.id == user_id),
+    ):
+        for row in session.exec(select(model).where(condition)).all():
+            session.delete(row)
+        session.flush()
+    session.commit()
+
+
+def run(database_url: str, posts: int, delete) -> tuple[int, float, int]:
+    """新しいデータベースにデータを作成し、削除にかかった時間とSQL数を計測"""
+    engine = create_engine(database_url)
+    SQLModel.metadata.create_all(engine)
+
+    statements = []
+    with Session(engine) as session:
+        user_id = build_fixture(session, posts)
+        dependents = count_dependents(session, user_id)
+
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    with Session(engine) as session:
+        started = time.perf_counter()
+        delete(session, user_id)
+        session.commit()
+        elapsed = time.perf_counter() - started
+
+    engine.dispose()
+    return dependents, elapsed, len(statements)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark cascading user deletion")
+    parser.add_argument("--posts", type=int, default=200, help="scale of the fixture")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"{'path':<14}{'dependents':>12}{'time (ms)':>12}{'executes':>12}")
+        for name, delete in (("ORM per row", delete_user_orm), ("bulk DELETE", UserService.delete_user)):
+            database_url = f"sqlite:///{tmp}/{delete.__name__}.db"
+            dependents, elapsed, statements = run(database_url, args.posts, delete)
+            print(f"{name:<14}{dependents:>12}{elapsed * 1000:>12.0f}{statements:>12}")
+
+
+if __name__ == "__main__":
+    main()
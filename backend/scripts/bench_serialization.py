@@ -0,0 +1,179 @@
+"""
+レスポンスのシリアライズコストを計測するベンチマーク（100件/ページ）
+
+旧経路: model_dump() → XxxResponse(**dict) → FastAPIのresponse_model検証 → json.dumps
+新経路: 選択列のdictをorjsonで直接出力 / TypeAdapterで1回だけ検証してJSON化
+
+Usage:
+    cd backend
+    python scripts/bench_serialization.py
+"""
+
+import asyncio
+import sys
+import timeit
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import TypeAdapter
+
+from core.responses import model_response, rows_response
+from models import Farm, PrefectureStamp, Reservation
+from schemas.farm import FarmListResponse
+from schemas.post import PostListResponse
+from schemas.reservation import ReservationListResponse, ReservationResponse
+from schemas.stamp import PrefectureStampResponse
+
+PAGE_SIZE = 100
+NUMBER = 200
+REPEAT = 5
+
+
+def build_fixtures() -> dict:
+    """ベンチマーク用のORMオブジェクトと一覧行を生成"""
+    now = datetime.utcnow()
+    farms = [
+        Farm(
+            id=i,
+            host_id=1,
+            name=f"ファーム{i}",
+            description="農業体験のご案内。" * 50,
+            prefecture="長野県",
+            city="松本市",
+            address="長野県松本市1-2-3",
+            experience_type="agriculture",
+            price_per_day=8000,
+            max_guests=6,
+            facilities={"wifi": True, "parking": True},
+            access_info="松本駅から車で20分",
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(PAGE_SIZE)
+    ]
+    farm_rows = [
+        {
+            **{name: getattr(farm, name) for name in FarmListResponse.model_fields if name != "main_image_url"},
+            "main_image_url": f"/uploads/farm_images/{farm.id}.jpg",
+        }
+        for farm in farms
+    ]
+    reservations = [
+        Reservation(
+            id=i,
+            guest_id=2,
+            farm_id=i,
+            start_date=date(2026, 5, 1) + timedelta(days=i),
+            end_date=date(2026, 5, 3) + timedelta(days=i),
+            num_guests=2,
+            total_amount=32000,
+            status="approved",
+            contact_phone="090-0000-0000",
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(PAGE_SIZE)
+    ]
+    reservation_rows = [
+        {
+            **{name: getattr(r, name) for name in ReservationListResponse.model_fields if name not in ("has_review", "farm")},
+            "has_review": False,
+            "farm": {"id": r.farm_id, "name": f"ファーム{r.farm_id}", "main_image_url": None},
+        }
+        for r in reservations
+    ]
+    post_rows = [
+        {
+            "id": i,
+            "user_id": 2,
+            "title": f"投稿{i}",
+            "content": "収穫体験をしてきました！" * 10,
+            "like_count": i,
+            "created_at": now,
+            "user_name": "ゲスト",
+            "user_type": "guest",
+            "farm_id": i,
+            "farm_name": f"ファーム{i}",
+        }
+        for i in range(PAGE_SIZE)
+    ]
+    stamps = [
+        PrefectureStamp(
+            prefecture_code=f"{i % 47 + 1:02d}",
+            name="長野県",
+            name_romaji="Nagano",
+            image_url="/stamps/nagano.png",
+            region="中部",
+            display_order=i,
+            created_at=now,
+        )
+        for i in range(PAGE_SIZE)
+    ]
+    return {
+        "farms": farms,
+        "farm_rows": farm_rows,
+        "reservations": reservations,
+        "reservation_rows": reservation_rows,
+        "post_rows": post_rows,
+        "stamps": stamps,
+    }
+
+
+def fastapi_render(response_type, content) -> bytes:
+    """FastAPIがresponse_modelに対して行う検証とJSONResponseの描画を再現"""
+    field = create_response_field(name="response", type_=response_type)
+    value = asyncio.run(
+        serialize_response(field=field, response_content=content, is_coroutine=True)
+    )
+    return JSONResponse(value).body
+
+
+def main() -> None:
+    data = build_fixtures()
+    reservation_adapter = TypeAdapter(list[ReservationResponse])
+    stamp_adapter = TypeAdapter(list[PrefectureStampResponse])
+
+    cases = {
+        "farms (list)": (
+            lambda: fastapi_render(
+                list[FarmListResponse],
+                [FarmListResponse(**{**f.model_dump(), "main_image_url": None}) for f in data["farms"]],
+            ),
+            lambda: rows_response(data["farm_rows"]).body,
+        ),
+        "reservations (list)": (
+            lambda: fastapi_render(
+                list[ReservationListResponse],
+                [ReservationListResponse(**row) for row in data["reservation_rows"]],
+            ),
+            lambda: rows_response(data["reservation_rows"]).body,
+        ),
+        "reservations (ORM)": (
+            lambda: fastapi_render(list[ReservationResponse], data["reservations"]),
+            lambda: model_response(reservation_adapter, data["reservations"]).body,
+        ),
+        "posts (list)": (
+            lambda: fastapi_render(list[PostListResponse], data["post_rows"]),
+            lambda: rows_response(data["post_rows"]).body,
+        ),
+        "stamps (ORM)": (
+            lambda: fastapi_render(list[PrefectureStampResponse], data["stamps"]),
+            lambda: model_response(stamp_adapter, data["stamps"]).body,
+        ),
+    }
+
+    print(f"{'case':<22}{'before (us)':>14}{'after (us)':>14}{'speedup':>10}")
+    for name, (before, after) in cases.items():
+        t_before = min(timeit.repeat(before, number=NUMBER, repeat=REPEAT)) / NUMBER * 1e6
+        t_after = min(timeit.repeat(after, number=NUMBER, repeat=REPEAT)) / NUMBER * 1e6
+        print(f"{name:<22}{t_before:>14.0f}{t_after:>14.0f}{t_before / t_after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
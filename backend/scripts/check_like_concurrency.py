@@ -0,0 +1,100 @@
+"""
+いいねの同時実行で like_count と post_likes がずれないことを確認するスクリプト
+
+指定した投稿に対して複数スレッドから同時に PostService.like_post / unlike_post を
+呼び出し、like_count の増減が post_likes の行数の増減と一致するかを検証する。
+書き込み遅延（LIKE_WRITE_BEHIND）の経路はバッファを反映した後に検証する。
+
+Usage:
+    cd backend
+    python scripts/check_like_concurrency.py <post_id> [--users 20] [--threads 16] [--ops 50]
+"""
+
+import argparse
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlmodel import Session, func, select
+
+from core.config import settings
+from database import engine
+from models import Post, PostLike, User
+from services.like_buffer import flush_like_buffer
+from services.post import PostService
+
+
+def read_counts(post_id: int) -> tuple[int, int]:
+    """DBに保存されている (like_count, post_likes の行数) を取得"""
+    with Session(engine) as session:
+        like_count = session.exec(select(Post.like_count).where(Post.id == post_id)).one()
+        likes = session.exec(
+            select(func.count(PostLike.id)).where(PostLike.post_id == post_id)
+        ).one()
+        return like_count, likes
+
+
+def toggle_many(post_id: int, user_ids: list[int], count: int, seed: int) -> None:
+    """1スレッド分のいいね/取り消しを送る（リクエストごとにセッションを作成）"""
+    rng = random.Random(seed)
+    for _ in range(count):
+        user_id = rng.choice(user_ids)
+        with Session(engine) as session:
+            if rng.random() < 0.6:
+                PostService.like_post(session, post_id, user_id)
+            else:
+                PostService.unlike_post(session, post_id, user_id)
+            session.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check concurrent likes stay consistent")
+    parser.add_argument("post_id", type=int)
+    parser.add_argument("--users", type=int, default=20, help="number of users to like with")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=50, help="like/unlike calls per thread")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        user_ids = list(session.exec(select(User.id).order_by(User.id).limit(args.users)).all())
+    if not user_ids:
+        print("❌ ユーザーが存在しません")
+        sys.exit(1)
+
+    mode = "write-behind" if settings.LIKE_WRITE_BEHIND else "atomic UPDATE"
+    count_before, likes_before = read_counts(args.post_id)
+    print(
+        f"モード: {mode} / ユーザー数: {len(user_ids)} / "
+        f"送信数: {args.threads * args.ops}"
+    )
+
+    with ThreadPoolExecutor(max_workers=args.threads) as executor:
+        futures = [
+            executor.submit(toggle_many, args.post_id, user_ids, args.ops, seed)
+            for seed in range(args.threads)
+        ]
+        for future in futures:
+            future.result()
+
+    if settings.LIKE_WRITE_BEHIND:
+        flushed = flush_like_buffer()
+        print(f"バッファから反映: {flushed}")
+
+    count_after, likes_after = read_counts(args.post_id)
+    drift = (count_after - count_before) - (likes_after - likes_before)
+    print(
+        f"like_count: {count_before} → {count_after} / "
+        f"post_likes: {likes_before} → {likes_after} / ずれ: {drift}"
+    )
+    if drift:
+        print("❌ like_count と post_likes が一致しません")
+        sys.exit(1)
+    print("✅ like_count と post_likes は一致しています")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+書き込み系エンドポイントのDB往復回数（SQL実行 + COMMIT）を確認するスクリプト
+
+各エンドポイントが呼び出すサービス関数を一時的なインメモリSQLiteに対して実行し、
+発行されたSQLとCOMMITの回数を数えて上限（BUDGETS）を超えていないかを検証する。
+サービスはflushのみ行うため、APIのUnitOfWorkRouteと同じく最後に1回コミットする。
+上限を超えたエンドポイントがあれば終了コード1で終了する。
+
+Usage:
+    cd backend
+    python scripts/check_write_queries.py [-v]
+"""
+
+import argparse
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from models import Comment, Farm, Post, PrefectureStamp, Reservation, User
+from schemas.farm import FarmCreate, FarmUpdate
+from schemas.post import CommentCreate, PostCreate, PostUpdate
+from schemas.reservation import ReservationCreate, ReservationUpdate
+from schemas.review import ReviewCreate
+from schemas.user import UserCreate, UserUpdate
+from services.farm import FarmService
+from services.occupancy import OccupancyService
+from services.post import CommentService, PostService, comment_path
+from services.reservation import ReservationService
+from services.review import ReviewService
+from services.user import UserService
+
+# エンドポイントごとの往復回数の上限（SQL実行 + COMMIT）
+# 2回を超えるものは、書き込む行が複数テーブルにまたがるための下限:
+# - コメント: パスに新しいIDが必要なため INSERT の後に UPDATE、さらに投稿の件数
+# - コメント削除: 部分木の範囲を求める SELECT、範囲 DELETE、投稿の件数
+# - 予約作成・ステータス変更: カレンダー（JSON列）の行ロック付き読み書き、遷移元の確認
+# - レビュー: reviews, reservations, farm_ratings, スタンプ詳細・集計の各1文
+BUDGETS = {
+    "POST /api/posts": 2,
+    "PUT /api/posts/{id}": 2,
+    "PUT /api/posts/{id}/likes/{user_id}": 3,
+    "DELETE /api/posts/{id}/likes/{user_id}": 3,
+    "POST /api/posts/{id}/comments": 4,
+    "POST /api/posts/{id}/comments (reply)": 4,
+    "DELETE /api/comments/{id}": 4,
+    "POST /api/farms": 2,
+    "PUT /api/farms/{id}": 2,
+    "DELETE /api/farms/{id}": 2,
+    "POST /api/users": 2,
+    "PUT /api/users/{id}": 2,
+    "POST /api/reservations": 4,
+    "PUT /api/reservations/{id}/status": 3,
+    "POST /api/reviews": 6,
+}
+
+# 計測で作成する予約のチェックイン日
+RESERVATION_START = date.today() + timedelta(days=30)
+
+
+class RoundTripCounter:
+    """エンジンに対して発行されたSQLとCOMMITを記録"""
+
+    def __init__(self, engine):
+        self.statements: list[str] = []
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+        event.listen(engine, "commit", self._on_commit)
+
+    def _on_execute(self, conn, cursor, statement, *args):
+        self.statements.append(" ".join(statement.split()))
+
+    def _on_commit(self, conn):
+        self.statements.append("COMMIT")
+
+    def reset(self) -> None:
+        self.statements.clear()
+
+
+def seed(engine) -> dict:
+    """計測に使うユーザー・農園・投稿・予約を作成"""
+    with Session(engine) as session:
+        host = User(google_id="host", email="host@example.com", name="ホスト", user_type="host")
+        guest = User(google_id="guest", email="guest@example.com", name="ゲスト")
+        session.add_all([host, guest])
+        session.flush()
+        farm = Farm(
+            host_id=host.id, name="農園", description="農業体験", prefecture="長野県",
+            city="松本市", address="住所", experience_type="agriculture",
+            price_per_day=8000, max_guests=6, facilities={}, access_info="駅から20分",
+        )
+        session.add(farm)
+        # レビュー投稿でスタンプ同期まで通るよう、農園の都道府県のマスタを用意する
+        session.add(PrefectureStamp(
+            prefecture_code="20", name="長野県", name_romaji="Nagano",
+            image_url="/stamps/20.png", region="中部", display_order=20,
+        ))
+        session.flush()
+        post = Post(user_id=guest.id, farm_id=farm.id, title="投稿", content="本文")
+        session.add(post)
+        session.flush()
+        comment = Comment(post_id=post.id, user_id=host.id, content="コメント")
+        reply = Comment(post_id=post.id, user_id=guest.id, content="返信", depth=1)
+        session.add(comment)
+        session.flush()
+        comment.path = comment_path("", comment.id)
+        reply.parent_id, comment.reply_count = comment.id, 1
+        session.add(reply)
+        session.flush()
+        reply.path = comment_path(comment.path, reply.id)
+        post.comment_count = 2
+        # 新規予約と同じ期間（カレンダーの行が既にある通常のケースを計測する）
+        reservation = Reservation(
+            guest_id=guest.id, farm_id=farm.id, start_date=RESERVATION_START,
+            end_date=RESERVATION_START + timedelta(days=2), num_guests=2,
+            total_amount=16000, status="pending", contact_phone="000",
+        )
+        # レビュー未投稿の完了済み予約
+        completed = Reservation(
+            guest_id=guest.id, farm_id=farm.id,
+            start_date=date.today() - timedelta(days=10),
+            end_date=date.today() - timedelta(days=8), num_guests=2,
+            total_amount=16000, status="completed", contact_phone="000",
+        )
+        session.add_all([reservation, completed])
+        session.flush()
+        OccupancyService.rebuild(session)
+        session.commit()
+        return {
+            "host": host.id, "guest": guest.id, "farm": farm.id, "post": post.id,
+            "comment": comment.id, "reservation": reservation.id,
+            "completed": completed.id,
+        }
+
+
+def scenarios(ids: dict) -> dict:
+    """エンドポイント名 → そのエンドポイントが呼び出すサービス処理"""
+    start = RESERVATION_START
+    return {
+        "POST /api/posts": lambda s: PostService.create_post(
+            s, PostCreate(user_id=ids["guest"], farm_id=ids["farm"], title="新規", content="本文")
+        ),
+        "PUT /api/posts/{id}": lambda s: PostService.update_post(
+            s, ids["post"], PostUpdate(title="更新")
+        ),
+        "PUT /api/posts/{id}/likes/{user_id}": lambda s: PostService.like_post(
+            s, ids["post"], ids["host"]
+        ),
+        "DELETE /api/posts/{id}/likes/{user_id}": lambda s: PostService.unlike_post(
+            s, ids["post"], ids["host"]
+        ),
+        "POST /api/posts/{id}/comments": lambda s: CommentService.create_comment(
+            s, CommentCreate(post_id=ids["post"], user_id=ids["host"], content="コメント")
+        ),
+        "POST /api/posts/{id}/comments (reply)": lambda s: CommentService.create_comment(
+            s,
+            CommentCreate(
+                post_id=ids["post"], user_id=ids["host"], content="返信",
+                parent_id=ids["comment"],
+            ),
+        ),
+        "DELETE /api/comments/{id}": lambda s: CommentService.delete_comment(
+            s, ids["comment"]
+        ),
+        "POST /api/farms": lambda s: FarmService.create_farm(
+            s, FarmCreate(
+                host_id=ids["host"], name="新しい農園", description="説明", prefecture="長野県",
+                city="松本市", address="住所", experience_type="agriculture",
+                price_per_day=5000, max_guests=4,
+            )
+        ),
+        "PUT /api/farms/{id}": lambda s: FarmService.update_farm(
+            s, ids["farm"], FarmUpdate(price_per_day=9000)
+        ),
+        "DELETE /api/farms/{id}": lambda s: FarmService.delete_farm(s, ids["farm"]),
+        "POST /api/users": lambda s: UserService.create_user(
+            s, UserCreate(google_id="new", email="new@example.com", name="新規ユーザー")
+        ),
+        "PUT /api/users/{id}": lambda s: UserService.update_user(
+            s, ids["guest"], UserUpdate(name="更新")
+        ),
+        "POST /api/reservations": lambda s: ReservationService.create_reservation(
+            s, ReservationCreate(
+                guest_id=ids["guest"], farm_id=ids["farm"], start_date=start,
+                end_date=start + timedelta(days=2), num_guests=2,
+                total_amount=16000, contact_phone="000",
+            )
+        ),
+        "PUT /api/reservations/{id}/status": lambda s: ReservationService.update_reservation(
+            s, ids["reservation"], ReservationUpdate(status="approved")
+        ),
+        "POST /api/reviews": lambda s: ReviewService.create_review(
+            s, ReviewCreate(
+                reservation_id=ids["completed"], guest_id=ids["guest"], farm_id=ids["farm"],
+                rating=5, comment="楽しかったです", experience_date=date.today() - timedelta(days=9),
+            )
+        ),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Check DB round trips of write endpoints")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print each statement")
+    args = parser.parse_args()
+
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    SQLModel.metadata.create_all(engine)
+    ids = seed(engine)
+    counter = RoundTripCounter(engine)
+
+    failed = []
+    print(f"{'endpoint':<42}{'round trips':>12}{'budget':>8}")
+    for name, run in scenarios(ids).items():
+        counter.reset()
+        # APIのセッションと同じ設定（コミット時に失効させない）
+        with Session(engine, expire_on_commit=False) as session:
+            run(session)
+            session.commit()
+        count = len(counter.statements)
+        budget = BUDGETS[name]
+        mark = "" if count <= budget else "  ❌"
+        print(f"{name:<42}{count:>12}{budget:>8}{mark}")
+        if args.verbose:
+            for statement in counter.statements:
+                print(f"    {statement[:110]}")
+        if count > budget:
+            failed.append(name)
+
+    if failed:
+        print(f"\n❌ 上限を超えたエンドポイント: {', '.join(failed)}")
+        sys.exit(1)
+    print("\n✅ すべてのエンドポイントが上限内です")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""
+既存の予約からファームの日次予約人数（farm_occupancy）を再構築するスクリプト
+
+Usage:
+    cd backend
+    python scripts/rebuild_farm_occupancy.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlmodel import Session, create_engine, select
+from core.config import settings
+from models import FarmOccupancy
+from services.occupancy import OccupancyService
+
+
+def rebuild_all():
+    """farm_occupancy を全削除し、定員を消費する予約から作り直す"""
+    print("farm_occupancy の再構築を開始...")
+
+    database_url = settings.DATABASE_URL.replace("postgres://", "postgresql://")
+    engine = create_engine(database_url)
+
+    with Session(engine) as session:
+        reservations = OccupancyService.rebuild(session)
+        print(f"対象予約数: {reservations}")
+        session.commit()
+
+        rows = session.exec(select(FarmOccupancy)).all()
+        print(f"✓ 再構築完了: {len(rows)} 行 (ファーム×年)")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("ファーム予約カレンダー再構築スクリプト")
+    print("=" * 60)
+    print()
+    rebuild_all()
@@ -0,0 +1,38 @@
+"""
+既存のレビューからファーム別の評価集計（farm_ratings）を再構築するスクリプト
+
+Usage:
+    cd backend
+    python scripts/rebuild_farm_ratings.py
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlmodel import Session, create_engine
+from core.config import settings
+from services.rating import RatingService
+
+
+def rebuild_all():
+    """farm_ratings を全削除し、reviews から作り直す"""
+    print("farm_ratings の再構築を開始...")
+
+    database_url = settings.DATABASE_URL.replace("postgres://", "postgresql://")
+    engine = create_engine(database_url)
+
+    with Session(engine) as session:
+        farms = RatingService.rebuild(session)
+        session.commit()
+        print(f"✓ 再構築完了: {farms} ファーム")
+
+
+if __name__ == "__main__":
+    print("=" * 60)
+    print("ファーム評価集計再構築スクリプト")
+    print("=" * 60)
+    print()
+    rebuild_all()
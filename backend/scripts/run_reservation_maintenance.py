@@ -0,0 +1,46 @@
+"""
+終了した予約の自動完了・放置された予約リクエストの取り消しを実行するスクリプト
+
+cron などから定期実行する場合は、アプリ内の定期実行を
+RESERVATION_MAINTENANCE_INTERVAL_SECONDS=0 で無効にしておく。
+
+Usage:
+    cd backend
+    python scripts/run_reservation_maintenance.py [--date 2026-01-31] [--chunk-size 500]
+"""
+
+import argparse
+import logging
+import sys
+from datetime import date
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.append(str(Path(__file__).parent.parent))
+
+from sqlmodel import Session
+
+from database import engine
+from services.reservation_maintenance import run_reservation_maintenance
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Complete past stays and expire stale requests")
+    parser.add_argument("--date", type=date.fromisoformat, help="treat this day as today")
+    parser.add_argument("--chunk-size", type=int, help="reservations per UPDATE")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    with Session(engine) as session:
+        metrics = run_reservation_maintenance(
+            session, today=args.date, chunk_size=args.chunk_size
+        )
+
+    print(f"完了にした予約: {metrics['completed']}")
+    print(f"取り消した予約リクエスト: {metrics['expired']}")
+    print(f"削除した期限切れIdempotency-Key: {metrics['idempotency_keys_purged']}")
+    print(f"チャンク数: {metrics['chunks']} / 実行時間: {metrics['duration_ms']} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -14,7 +14,7 @@ sys.path.append(str(Path(__file__).parent.parent))
 
 from sqlmodel import Session, create_engine, select
 from core.config import settings
-from models import Review
+from models import Farm, Review
 from services.stamp import StampService
 
 
@@ -25,8 +25,14 @@ def sync_all_reviews():
     engine = create_engine(settings.DATABASE_URL)
 
     with Session(engine) as session:
-        # 全レビューを取得
-        reviews = list(session.exec(select(Review).order_by(Review.id)).all())
+        # 全レビューを農園の都道府県・体験タイプと一緒に取得
+        reviews = list(
+            session.exec(
+                select(Review, Farm.prefecture, Farm.experience_type)
+                .join(Farm, Review.farm_id == Farm.id)
+                .order_by(Review.id)
+            ).all()
+        )
         total_reviews = len(reviews)
 
         if total_reviews == 0:
@@ -44,17 +50,21 @@ def sync_all_reviews():
         error_count = 0
         skipped_count = 0
 
-        for i, review in enumerate(reviews, 1):
+        for i, (review, prefecture, experience_type) in enumerate(reviews, 1):
             try:
                 # 進捗表示
                 if i % 10 == 0 or i == total_reviews:
                     print(f"処理中... {i}/{total_reviews} ({i*100//total_reviews}%)")
 
                 # スタンプ同期を実行
-                StampService.sync_stamp_from_review(session, review.id)
+                StampService.sync_stamp_from_review(
+                    session, review, prefecture, experience_type
+                )
+                session.commit()
                 success_count += 1
 
             except Exception as e:
+                session.rollback()
                 error_message = str(e)
 
                 # 都道府県が見つからない場合はスキップ（エラーとしてカウントしない）
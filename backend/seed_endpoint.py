@@ -18,6 +18,9 @@ from models import (
     Review,
     User,
 )
+from services.post import comment_path, trending_score
+from services.occupancy import OccupancyService
+from services.rating import RatingService
 
 router = APIRouter()
 
@@ -282,6 +285,9 @@ async def seed_sample_data():
             ]
             for reservation in reservations:
                 session.add(reservation)
+            session.flush()
+            # 予約カレンダー（farm_occupancy）を予約から作成
+            OccupancyService.rebuild(session)
             session.commit()
             for reservation in reservations:
                 session.refresh(reservation)
@@ -323,6 +329,8 @@ async def seed_sample_data():
             ]
             for review in reviews:
                 session.add(review)
+            session.flush()
+            RatingService.rebuild(session)
             session.commit()
 
             # Create posts
@@ -375,6 +383,15 @@ async def seed_sample_data():
             ]
             for comment in comments:
                 session.add(comment)
+            session.flush()
+            for comment in comments:
+                comment.path = comment_path("", comment.id)
+            # コメント数とトレンドスコアを作成したデータに合わせる
+            for post in posts:
+                post.comment_count = sum(c.post_id == post.id for c in comments)
+                post.trending_score = trending_score(
+                    post.like_count, post.comment_count, post.created_at
+                )
             session.commit()
 
             return {
@@ -9,6 +9,16 @@ from appwrite.client import Client
 from appwrite.services.storage import Storage
 from appwrite.input_file import InputFile
 from appwrite.id import ID
+from fastapi import UploadFile
+from fastapi.concurrency import run_in_threadpool
+
+ALLOWED_IMAGE_TYPES = ["image/jpeg", "image/png", "image/gif", "image/webp"]
+MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+class ImageUploadError(ValueError):
+    """Raised when an uploaded image is rejected before it is stored"""
 
 
 class AppwriteStorageService:
@@ -109,3 +119,35 @@ def get_appwrite_storage() -> AppwriteStorageService:
     if appwrite_storage is None:
         appwrite_storage = AppwriteStorageService()
     return appwrite_storage
+
+
+async def read_image_upload(file: UploadFile) -> bytes:
+    """
+    Validate an uploaded image and read its content
+
+    The file is read in chunks and rejected as soon as it exceeds
+    MAX_IMAGE_SIZE, so oversized uploads are never held in memory whole.
+    """
+    if file.content_type not in ALLOWED_IMAGE_TYPES:
+        raise ImageUploadError(
+            "Invalid file type. Only JPEG, PNG, GIF, and WebP are allowed."
+        )
+
+    chunks = []
+    size = 0
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        size += len(chunk)
+        if size > MAX_IMAGE_SIZE:
+            raise ImageUploadError("File too large. Maximum size is 10MB.")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def upload_image(file: UploadFile) -> str:
+    """Validate an uploaded image and store it in Appwrite, returning its URL"""
+    content = await read_image_upload(file)
+    storage = get_appwrite_storage()
+    # The Appwrite SDK is synchronous; keep it off the event loop
+    return await run_in_threadpool(
+        storage.upload_file, content, file.filename, file.content_type
+    )
@@ -0,0 +1,173 @@
+from datetime import date, timedelta
+
+from sqlmodel import Session, extract, func, select
+
+from core.cache import TTLCache
+from models import Farm, FarmRating, Reservation, User
+from services.occupancy import OccupancyService
+from services.rating import rating_summary
+
+# ホストごとのダッシュボード集計（短時間だけキャッシュする）
+host_dashboard_cache = TTLCache(ttl_seconds=60)
+
+# 売上に計上する予約ステータス
+REVENUE_STATUSES = ("approved", "completed")
+
+# チェックイン予定として表示する予約ステータスと期間・件数
+CHECK_IN_STATUSES = ("pending", "approved")
+CHECK_IN_DAYS = 30
+CHECK_IN_LIMIT = 10
+
+# 売上推移を集計する月数（今月を含む）
+REVENUE_MONTHS = 12
+
+# 稼働率を計算する期間（今日から）
+OCCUPANCY_DAYS = 30
+
+
+def _month_start(day: date, months_back: int) -> date:
+    """day の月から months_back か月前の月初日"""
+    index = day.year * 12 + day.month - 1 - months_back
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class DashboardService:
+    """Service for host dashboard aggregates"""
+
+    @staticmethod
+    def get_host_dashboard(
+        session: Session, host_id: int, today: date | None = None
+    ) -> dict | None:
+        """
+        Summarize a host's reservations, revenue, occupancy and ratings
+
+        Each section is one aggregate query over the host's farms (joined on
+        farms.host_id), so the cost does not grow with the number of
+        reservations returned. Results are cached per host for a short time.
+        Returns None if the user does not exist or is not a host.
+        """
+        today = today or date.today()
+        cache_key = (host_id, today)
+        if (cached := host_dashboard_cache.get(cache_key)) is not None:
+            return cached
+
+        host = session.exec(
+            select(User.id).where(User.id == host_id, User.user_type == "host")
+        ).first()
+        if not host:
+            return None
+
+        host_farm_ids = select(Farm.id).where(Farm.host_id == host_id)
+
+        # 予約数（ステータス別）
+        status_counts = dict(
+            session.exec(
+                select(Reservation.status, func.count(Reservation.id))
+                .where(Reservation.farm_id.in_(host_farm_ids))
+                .group_by(Reservation.status)
+            ).all()
+        )
+
+        # 直近のチェックイン予定
+        upcoming = session.execute(
+            select(
+                Reservation.id,
+                Reservation.farm_id,
+                Farm.name.label("farm_name"),
+                Reservation.guest_id,
+                User.name.label("guest_name"),
+                Reservation.start_date,
+                Reservation.end_date,
+                Reservation.num_guests,
+                Reservation.status,
+            )
+            .join(Farm, Reservation.farm_id == Farm.id)
+            .join(User, Reservation.guest_id == User.id)
+            .where(
+                Farm.host_id == host_id,
+                Reservation.status.in_(CHECK_IN_STATUSES),
+                Reservation.start_date >= today,
+                Reservation.start_date < today + timedelta(days=CHECK_IN_DAYS),
+            )
+            .order_by(Reservation.start_date, Reservation.id)
+            .limit(CHECK_IN_LIMIT)
+        ).mappings().all()
+
+        # 月別売上（チェックイン月で集計）
+        year = extract("year", Reservation.start_date)
+        month = extract("month", Reservation.start_date)
+        first_month = _month_start(today, REVENUE_MONTHS - 1)
+        revenue_rows = session.exec(
+            select(
+                year,
+                month,
+                func.sum(Reservation.total_amount),
+                func.count(Reservation.id),
+            )
+            .where(
+                Reservation.farm_id.in_(host_farm_ids),
+                Reservation.status.in_(REVENUE_STATUSES),
+                Reservation.start_date >= first_month,
+                Reservation.start_date < _month_start(today, -1),
+            )
+            .group_by(year, month)
+        ).all()
+        revenue = {
+            (int(y), int(m)): (int(total), count) for y, m, total, count in revenue_rows
+        }
+        monthly_revenue = []
+        for months_back in range(REVENUE_MONTHS - 1, -1, -1):
+            start = _month_start(today, months_back)
+            total, count = revenue.get((start.year, start.month), (0, 0))
+            monthly_revenue.append(
+                {"month": f"{start:%Y-%m}", "revenue": total, "reservations": count}
+            )
+
+        # ファームごとの評価（集計テーブルから。レビューがないファームも含める）
+        farm_rows = session.exec(
+            select(
+                Farm.id,
+                Farm.name,
+                Farm.max_guests,
+                func.coalesce(FarmRating.rating_sum, 0),
+                func.coalesce(FarmRating.review_count, 0),
+            )
+            .outerjoin(FarmRating, FarmRating.farm_id == Farm.id)
+            .where(Farm.host_id == host_id)
+            .order_by(Farm.id)
+        ).all()
+
+        # ファームごとの稼働率（今日から OCCUPANCY_DAYS 日間の予約人泊 / 定員人泊）
+        occupancy_to = today + timedelta(days=OCCUPANCY_DAYS - 1)
+        booked = OccupancyService.get_booked_guest_nights(
+            session, [row[0] for row in farm_rows], today, occupancy_to
+        )
+
+        farms = []
+        rating_total, review_count = 0, 0
+        for farm_id, name, max_guests, rating_sum, reviews in farm_rows:
+            capacity = max_guests * OCCUPANCY_DAYS
+            farms.append(
+                {
+                    "farm_id": farm_id,
+                    "farm_name": name,
+                    "occupancy_rate": round(booked[farm_id] / capacity, 4) if capacity else 0.0,
+                    "average_rating": rating_summary(rating_sum, reviews),
+                    "review_count": reviews,
+                }
+            )
+            rating_total += rating_sum
+            review_count += reviews
+
+        dashboard = {
+            "host_id": host_id,
+            "status_counts": status_counts,
+            "total_reservations": sum(status_counts.values()),
+            "upcoming_check_ins": [dict(row) for row in upcoming],
+            "monthly_revenue": monthly_revenue,
+            "farms": farms,
+            "average_rating": rating_summary(rating_total, review_count),
+            "review_count": review_count,
+        }
+        host_dashboard_cache.set(cache_key, dashboard)
+        return dashboard
@@ -0,0 +1,158 @@
+import csv
+import io
+from datetime import date, datetime
+from typing import Iterator
+
+from sqlmodel import Session, select
+
+from core.responses import json_bytes
+from models import Farm, Reservation, Review, User
+from services.reservation import ReservationService
+
+# エクスポート形式と Content-Type
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+# サーバーサイドカーソルから一度に取得・送信する行数
+EXPORT_CHUNK_SIZE = 1000
+
+
+# 表計算ソフトが数式として解釈する先頭文字（CSVインジェクション対策）
+FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+
+def _csv_value(value):
+    """
+    CSV cell for a column value (ISO dates, empty for NULL)
+
+    Text starting with a formula character gets a leading ' so spreadsheet
+    apps show it as text instead of running it.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _csv_chunk(rows, header: list[str] | None = None) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\r\n")
+    if header:
+        writer.writerow(header)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def stream_rows(query, fmt: str, chunk_size: int = EXPORT_CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Yield the rows of a column query as CSV or NDJSON, chunk by chunk
+
+    Uses its own session so the connection lives as long as the response
+    body. Rows are read with yield_per (a server-side cursor on PostgreSQL)
+    and each chunk is encoded and sent before the next is fetched, so memory
+    stays flat however many rows match. CSV starts with a UTF-8 BOM so Excel
+    opens Japanese text correctly.
+    """
+    from database import engine
+
+    with Session(engine) as session:
+        result = session.execute(query.execution_options(yield_per=chunk_size))
+        columns = list(result.keys())
+        if fmt == "csv":
+            yield "\ufeff".encode() + _csv_chunk([], columns)
+            for rows in result.partitions():
+                yield _csv_chunk(rows)
+        else:
+            for rows in result.partitions():
+                yield b"".join(
+                    json_bytes(dict(zip(columns, row))) + b"\n" for row in rows
+                )
+
+
+class ExportService:
+    """Queries behind the host export endpoints"""
+
+    @staticmethod
+    def reservations_query(
+        host_id: int,
+        farm_id: int | None = None,
+        status: str | None = None,
+        start_date_from: date | None = None,
+        start_date_to: date | None = None,
+    ):
+        """Reservations of a host's farms with farm and guest names, oldest first"""
+        query = select(
+            Reservation.id,
+            Reservation.farm_id,
+            Farm.name.label("farm_name"),
+            Reservation.guest_id,
+            User.name.label("guest_name"),
+            Reservation.start_date,
+            Reservation.end_date,
+            Reservation.num_guests,
+            Reservation.total_amount,
+            Reservation.status,
+            Reservation.contact_phone,
+            Reservation.message,
+            Reservation.created_at,
+            Reservation.updated_at,
+        ).select_from(Reservation)
+        query = ReservationService._filter_reservations(
+            query,
+            host_id=host_id,
+            farm_id=farm_id,
+            status=status,
+            start_date_from=start_date_from,
+            start_date_to=start_date_to,
+        )
+        return query.join(User, Reservation.guest_id == User.id).order_by(
+            Reservation.id
+        )
+
+    @staticmethod
+    def reviews_query(
+        host_id: int,
+        farm_id: int | None = None,
+        rating: int | None = None,
+        experience_date_from: date | None = None,
+        experience_date_to: date | None = None,
+    ):
+        """Reviews received by a host's farms with farm and guest names, oldest first"""
+        query = (
+            select(
+                Review.id,
+                Review.reservation_id,
+                Review.farm_id,
+                Farm.name.label("farm_name"),
+                Review.guest_id,
+                User.name.label("guest_name"),
+                Review.rating,
+                Review.comment,
+                Review.experience_date,
+                Review.created_at,
+            )
+            .select_from(Review)
+            .join(Farm, Review.farm_id == Farm.id)
+            .join(User, Review.guest_id == User.id)
+            .where(Farm.host_id == host_id)
+            .order_by(Review.id)
+        )
+
+        if farm_id:
+            query = query.where(Review.farm_id == farm_id)
+
+        if rating:
+            query = query.where(Review.rating == rating)
+
+        if experience_date_from:
+            query = query.where(Review.experience_date >= experience_date_from)
+
+        if experience_date_to:
+            query = query.where(Review.experience_date <= experience_date_to)
+
+        return query
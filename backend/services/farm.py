@@ -1,7 +1,23 @@
-from sqlmodel import Session, select
+from datetime import datetime
+from functools import partial
 
-from models import Farm
-from schemas.farm import FarmCreate, FarmUpdate
+from sqlmodel import Session, func, select, update
+
+from core.cache import TTLCache
+from core.unit_of_work import after_commit
+from models import Farm, FarmImage, Review, User
+from schemas.farm import FarmCreate, FarmListResponse, FarmUpdate
+from services.rating import RatingService
+
+# 一覧取得で既定でSELECTする列（description, facilities, access_info などの重い列は除外）
+FARM_LIST_COLUMNS = [
+    name for name in FarmListResponse.model_fields if name != "main_image_url"
+]
+
+FARM_DETAIL_INCLUDES = ("images", "rating", "reviews", "host")
+
+# ファーム詳細の短期キャッシュ（キー: farm_id, updated_at, ホストの updated_at, include, reviews_limit）
+farm_detail_cache = TTLCache(ttl_seconds=30)
 
 
 class FarmService:
@@ -13,17 +29,101 @@ class FarmService:
         return session.exec(select(Farm).where(Farm.id == farm_id)).first()
 
     @staticmethod
-    def get_farms(
+    def get_farm_detail(
         session: Session,
-        skip: int = 0,
-        limit: int = 100,
+        farm_id: int,
+        include: set[str],
+        reviews_limit: int = 5,
+    ) -> dict | None:
+        """
+        Get a farm together with its gallery, rating, recent reviews and host
+
+        Each included section costs at most one query; the farm and host are
+        loaded together. Results are cached briefly and keyed by the farm's
+        and the host's updated_at so farm and host edits are visible
+        immediately.
+        """
+        result = session.exec(
+            select(Farm, User).outerjoin(User, Farm.host_id == User.id).where(
+                Farm.id == farm_id
+            )
+        ).first()
+        if not result:
+            return None
+        farm, host = result
+
+        cache_key = (
+            farm_id,
+            farm.updated_at,
+            host.updated_at if host else None,
+            frozenset(include),
+            reviews_limit,
+        )
+        cached = farm_detail_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        images = list(
+            session.exec(
+                select(FarmImage)
+                .where(FarmImage.farm_id == farm_id)
+                .order_by(FarmImage.display_order)
+            ).all()
+        )
+        main_image = next((img for img in images if img.is_main), None) or (
+            images[0] if images else None
+        )
+
+        farm_dict = farm.model_dump()
+        farm_dict["main_image_url"] = main_image.image_url if main_image else None
+        detail: dict = {"farm": farm_dict}
+
+        if "images" in include:
+            detail["images"] = [img.model_dump() for img in images]
+
+        if "rating" in include:
+            detail["rating"] = RatingService.get_farm_rating(session, farm_id)
+
+        if "reviews" in include:
+            rows = session.exec(
+                select(Review, User.name)
+                .outerjoin(User, Review.guest_id == User.id)
+                .where(Review.farm_id == farm_id)
+                .order_by(Review.created_at.desc())
+                .limit(reviews_limit)
+            ).all()
+            detail["recent_reviews"] = [
+                {**review.model_dump(), "guest_name": guest_name}
+                for review, guest_name in rows
+            ]
+
+        if "host" in include and host:
+            detail["host"] = {
+                "id": host.id,
+                "name": host.name,
+                "avatar_url": host.avatar_url,
+            }
+
+        farm_detail_cache.set(cache_key, detail)
+        return detail
+
+    @staticmethod
+    def invalidate_farm_detail(farm_id: int | None = None) -> None:
+        """Drop cached detail responses for a farm (all farms if None)"""
+        if farm_id is None:
+            farm_detail_cache.clear()
+        else:
+            farm_detail_cache.invalidate_where(lambda key: key[0] == farm_id)
+
+    @staticmethod
+    def _filter_farms(
+        query,
         prefecture: str | None = None,
         experience_type: str | None = None,
         is_active: bool = True,
-    ) -> list[Farm]:
-        """Get list of farms with optional filters"""
-        query = select(Farm)
-
+        host_id: int | None = None,
+    ):
+        """Apply list filters shared by the list and version queries"""
         if is_active:
             query = query.where(Farm.is_active == True)
 
@@ -33,53 +133,120 @@ class FarmService:
         if experience_type:
             query = query.where(Farm.experience_type == experience_type)
 
+        if host_id is not None:
+            query = query.where(Farm.host_id == host_id)
+
+        return query
+
+    @staticmethod
+    def get_farms(
+        session: Session,
+        skip: int = 0,
+        limit: int = 100,
+        prefecture: str | None = None,
+        experience_type: str | None = None,
+        is_active: bool = True,
+        columns: list[str] | None = None,
+    ) -> list[dict]:
+        """Get list of farms with optional filters, selecting only the given columns"""
+        columns = columns or FARM_LIST_COLUMNS
+        query = FarmService._filter_farms(
+            select(*[getattr(Farm, name) for name in columns]),
+            prefecture=prefecture,
+            experience_type=experience_type,
+            is_active=is_active,
+        )
         query = query.offset(skip).limit(limit)
-        return session.exec(query).all()
+        return [dict(row) for row in session.execute(query).mappings().all()]
+
+    @staticmethod
+    def get_farms_by_host(
+        session: Session, host_id: int, columns: list[str] | None = None
+    ) -> list[dict]:
+        """Get all farms by a specific host, selecting only the given columns"""
+        columns = columns or FARM_LIST_COLUMNS
+        query = select(*[getattr(Farm, name) for name in columns]).where(
+            Farm.host_id == host_id
+        )
+        return [dict(row) for row in session.execute(query).mappings().all()]
+
+    @staticmethod
+    def get_farms_version(
+        session: Session,
+        prefecture: str | None = None,
+        experience_type: str | None = None,
+        is_active: bool = True,
+        host_id: int | None = None,
+    ) -> tuple[int, datetime | None]:
+        """Get (count, latest updated_at) of the farms matching the filters"""
+        query = FarmService._filter_farms(
+            select(func.count(Farm.id), func.max(Farm.updated_at)),
+            prefecture=prefecture,
+            experience_type=experience_type,
+            is_active=is_active,
+            host_id=host_id,
+        )
+        count, last_modified = session.exec(query).one()
+        return count, last_modified
 
     @staticmethod
-    def get_farms_by_host(session: Session, host_id: int) -> list[Farm]:
-        """Get all farms by a specific host"""
-        query = select(Farm).where(Farm.host_id == host_id)
-        return session.exec(query).all()
+    def get_main_image_urls(session: Session, farm_ids: list[int]) -> dict[int, str]:
+        """Get the main image URL for each farm in one query (falls back to the first image)"""
+        if not farm_ids:
+            return {}
+
+        rows = session.exec(
+            select(FarmImage.farm_id, FarmImage.image_url)
+            .where(FarmImage.farm_id.in_(farm_ids))
+            .order_by(
+                FarmImage.farm_id,
+                FarmImage.is_main.desc(),
+                FarmImage.display_order,
+            )
+        ).all()
+
+        urls: dict[int, str] = {}
+        for farm_id, image_url in rows:
+            urls.setdefault(farm_id, image_url)
+        return urls
 
     @staticmethod
     def create_farm(session: Session, farm_data: FarmCreate) -> Farm:
         """Create a new farm"""
         farm = Farm(**farm_data.model_dump())
         session.add(farm)
-        session.commit()
-        session.refresh(farm)
+        session.flush()
         return farm
 
     @staticmethod
     def update_farm(
         session: Session, farm_id: int, farm_data: FarmUpdate
     ) -> Farm | None:
-        """Update a farm"""
-        farm = session.exec(select(Farm).where(Farm.id == farm_id)).first()
-        if not farm:
-            return None
-
+        """Update a farm with a single UPDATE ... RETURNING"""
         update_data = farm_data.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(farm, key, value)
-
-        session.add(farm)
-        session.commit()
-        session.refresh(farm)
+        farm = session.exec(
+            update(Farm)
+            .where(Farm.id == farm_id)
+            .values(**update_data)
+            .returning(Farm)
+        ).scalar()
+        if farm and "name" in update_data:
+            from services.user import UserService
+
+            # ホストの受け取ったレビュー一覧にファーム名が含まれる
+            after_commit(
+                session,
+                partial(UserService.invalidate_host_received_reviews, farm.host_id),
+            )
         return farm
 
     @staticmethod
     def delete_farm(session: Session, farm_id: int) -> bool:
         """Delete a farm (soft delete by setting is_active to False)"""
-        farm = session.exec(select(Farm).where(Farm.id == farm_id)).first()
-        if not farm:
-            return False
-
-        farm.is_active = False
-        session.add(farm)
-        session.commit()
-        return True
+        updated = session.exec(
+            update(Farm).where(Farm.id == farm_id).values(is_active=False)
+        ).rowcount
+        return updated > 0
 
     @staticmethod
     def count_farms(session: Session) -> int:
@@ -0,0 +1,121 @@
+from datetime import datetime
+from typing import Iterator
+
+from sqlmodel import Session, select
+
+from models import Reservation
+
+# カレンダーに載せる予約ステータスと iCalendar の STATUS
+ICAL_STATUSES = {
+    "pending": "TENTATIVE",
+    "approved": "CONFIRMED",
+    "completed": "CONFIRMED",
+}
+
+# サーバーサイドカーソルから一度に取得・送信する予約数
+ICAL_CHUNK_SIZE = 500
+
+PRODID = "-//FarmMatch//Farm Bookings//JA"
+
+
+def _escape(text: str) -> str:
+    """Escape a TEXT value (RFC 5545 3.3.11); CRLF and lone CR count as line breaks"""
+    return (
+        text.replace("\r\n", "\n")
+        .replace("\r", "\n")
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Fold a content line at 75 octets without splitting UTF-8 characters"""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+
+    parts, current, size = [], "", 0
+    for char in line:
+        width = len(char.encode())
+        if size + width > (75 if not parts else 74):
+            parts.append(current)
+            current, size = "", 0
+        current += char
+        size += width
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _utc(value: datetime) -> str:
+    """Format a naive UTC datetime as an iCalendar UTC date-time"""
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def _event(row) -> str:
+    """One VEVENT for a reservation row (guest details are left out)"""
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:reservation-{row.id}@farmmatch",
+        f"DTSTAMP:{_utc(row.updated_at)}",
+        f"LAST-MODIFIED:{_utc(row.updated_at)}",
+        f"SEQUENCE:{row.version}",
+        f"DTSTART;VALUE=DATE:{row.start_date:%Y%m%d}",
+        f"DTEND;VALUE=DATE:{row.end_date:%Y%m%d}",
+        f"SUMMARY:{_escape(f'予約 #{row.id}（{row.num_guests}名）')}",
+        f"STATUS:{ICAL_STATUSES[row.status]}",
+        "TRANSP:OPAQUE",
+        "END:VEVENT",
+    ]
+    return "".join(_fold(line) for line in lines)
+
+
+def stream_farm_calendar(
+    farm_id: int, farm_name: str, chunk_size: int = ICAL_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """
+    Yield a farm's bookings as an iCalendar document, chunk by chunk
+
+    Uses its own session so the connection lives as long as the response
+    body. Rows are read with yield_per (a server-side cursor on PostgreSQL)
+    and each chunk of VEVENTs is sent as it is rendered, so memory use does
+    not grow with the number of reservations. The end date is the checkout
+    day, which matches DTEND being exclusive.
+    """
+    from database import engine
+
+    yield "".join(
+        _fold(line)
+        for line in (
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:{PRODID}",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            f"X-WR-CALNAME:{_escape(farm_name)}",
+        )
+    ).encode()
+
+    with Session(engine) as session:
+        result = session.execute(
+            select(
+                Reservation.id,
+                Reservation.start_date,
+                Reservation.end_date,
+                Reservation.num_guests,
+                Reservation.status,
+                Reservation.version,
+                Reservation.updated_at,
+            )
+            .where(
+                Reservation.farm_id == farm_id,
+                Reservation.status.in_(ICAL_STATUSES),
+            )
+            .order_by(Reservation.start_date, Reservation.id)
+            .execution_options(yield_per=chunk_size)
+        )
+        for rows in result.partitions():
+            yield "".join(_event(row) for row in rows).encode()
+
+    yield b"END:VCALENDAR\r\n"
@@ -0,0 +1,99 @@
+import asyncio
+import logging
+import threading
+
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session, update
+
+from models import Post
+
+logger = logging.getLogger(__name__)
+
+
+class LikeBuffer:
+    """In-memory buffer of pending like increments, flushed to posts in batches"""
+
+    def __init__(self):
+        self._pending: dict[int, int] = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    @property
+    def generation(self) -> int:
+        """Number of increments buffered so far (changes on every add)"""
+        with self._lock:
+            return self._generation
+
+    def add(self, post_id: int, count: int = 1) -> int:
+        """Buffer an increment and return the post's pending total"""
+        with self._lock:
+            self._pending[post_id] = self._pending.get(post_id, 0) + count
+            self._generation += 1
+            return self._pending[post_id]
+
+    def pending(self, post_id: int) -> int:
+        """Increments buffered for a post but not yet written"""
+        with self._lock:
+            return self._pending.get(post_id, 0)
+
+    def drain(self) -> dict[int, int]:
+        """Take all pending increments, leaving the buffer empty"""
+        with self._lock:
+            drained, self._pending = self._pending, {}
+            return drained
+
+    def flush(self, session: Session) -> int:
+        """
+        Write all pending increments in one transaction
+
+        Each post gets a single ``like_count = like_count + n`` UPDATE (which
+        also moves its trending_score), in post_id order to keep lock ordering
+        stable. On failure the increments are put back so they are retried on
+        the next flush.
+        """
+        from services.post import engagement_values
+
+        drained = self.drain()
+        if not drained:
+            return 0
+
+        try:
+            for post_id in sorted(drained):
+                session.exec(
+                    update(Post)
+                    .where(Post.id == post_id)
+                    .values(**engagement_values(likes=drained[post_id]))
+                )
+            session.commit()
+        except Exception:
+            session.rollback()
+            for post_id, count in drained.items():
+                self.add(post_id, count)
+            raise
+
+        return sum(drained.values())
+
+
+like_buffer = LikeBuffer()
+
+
+def flush_like_buffer() -> int:
+    """Flush the global like buffer using a fresh session"""
+    from database import engine
+
+    with Session(engine) as session:
+        return like_buffer.flush(session)
+
+
+async def run_like_flush_loop(interval_seconds: float) -> None:
+    """Periodically flush buffered likes until cancelled, then flush once more"""
+    try:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await run_in_threadpool(flush_like_buffer)
+            except Exception as e:
+                logger.error(f"Failed to flush buffered likes: {str(e)}")
+    except asyncio.CancelledError:
+        await run_in_threadpool(flush_like_buffer)
+        raise
@@ -0,0 +1,257 @@
+import logging
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, delete, select
+
+from models import FarmOccupancy, Reservation
+
+logger = logging.getLogger(__name__)
+
+# 定員を消費する予約ステータス
+OCCUPYING_STATUSES = {"pending", "approved"}
+
+DAYS_IN_YEAR = 366
+
+
+class OccupancyService:
+    """ファームの日次予約人数（カレンダー）の管理"""
+
+    @staticmethod
+    def _day_index(day: date) -> int:
+        """1月1日を0とした年内の日インデックス"""
+        return day.timetuple().tm_yday - 1
+
+    @staticmethod
+    def _get_rows(
+        session: Session, farm_id: int, years: list[int]
+    ) -> dict[int, FarmOccupancy]:
+        """指定年のFarmOccupancy行を1クエリで取得"""
+        query = select(FarmOccupancy).where(
+            FarmOccupancy.farm_id == farm_id, FarmOccupancy.year.in_(years)
+        )
+        return {row.year: row for row in session.exec(query).all()}
+
+    @staticmethod
+    def _stay_years(start_date: date, end_date: date) -> list[int]:
+        """宿泊日 [start_date, end_date) が含まれる年"""
+        return list(range(start_date.year, (end_date - timedelta(days=1)).year + 1))
+
+    @staticmethod
+    def _lock_rows(
+        session: Session, keys: set[tuple[int, int]]
+    ) -> dict[tuple[int, int], FarmOccupancy]:
+        """
+        (farm_id, year) の行を FOR UPDATE で取得し、ない行は作成してからロックする
+
+        存在しない行は INSERT ... ON CONFLICT DO NOTHING で作るため、同じファーム・
+        年の最初の予約が同時に来ても一意制約違反にならず、後の方は先の行を待つ。
+        """
+        def select_locked(wanted):
+            return {
+                (row.farm_id, row.year): row
+                for row in session.exec(
+                    select(FarmOccupancy)
+                    .where(tuple_(FarmOccupancy.farm_id, FarmOccupancy.year).in_(wanted))
+                    .with_for_update()
+                ).all()
+            }
+
+        rows = select_locked(keys)
+        missing = sorted(keys - rows.keys())
+        if missing:
+            session.exec(
+                pg_insert(FarmOccupancy)
+                .values(
+                    [
+                        {
+                            "farm_id": farm_id,
+                            "year": year,
+                            "booked_guests": [0] * DAYS_IN_YEAR,
+                            "updated_at": datetime.utcnow(),
+                        }
+                        for farm_id, year in missing
+                    ]
+                )
+                .on_conflict_do_nothing(index_elements=["farm_id", "year"])
+            )
+            rows.update(select_locked(missing))
+        return rows
+
+    @staticmethod
+    def _apply_deltas(
+        session: Session, changes: list[tuple[int, date, date, int]]
+    ) -> None:
+        """(farm_id, start_date, end_date, delta) の変更を行ロックして反映（commitはしない）"""
+        keys = {
+            (farm_id, year)
+            for farm_id, start_date, end_date, _ in changes
+            for year in OccupancyService._stay_years(start_date, end_date)
+        }
+        if not keys:
+            return
+        rows = OccupancyService._lock_rows(session, keys)
+
+        # JSON列の変更を検知させるため、年ごとに新しいリストを作って差し替える
+        updated: dict[tuple[int, int], list[int]] = {}
+        for farm_id, start_date, end_date, delta in changes:
+            day = start_date
+            while day < end_date:
+                key = (farm_id, day.year)
+                if key not in updated:
+                    updated[key] = list(rows[key].booked_guests)
+                counts = updated[key]
+                index = OccupancyService._day_index(day)
+                counts[index] += delta
+                if counts[index] < 0:
+                    # カレンダーが予約とずれている（rebuild で作り直すこと）
+                    logger.warning(
+                        "Occupancy for farm %d on %s would be %d; clamped to 0",
+                        farm_id, day, counts[index],
+                    )
+                    counts[index] = 0
+                day += timedelta(days=1)
+
+        now = datetime.utcnow()
+        for key, counts in updated.items():
+            row = rows[key]
+            row.booked_guests = counts
+            row.updated_at = now
+            session.add(row)
+
+    @staticmethod
+    def _add_guests(
+        session: Session, farm_id: int, start_date: date, end_date: date, delta: int
+    ) -> None:
+        """宿泊日 [start_date, end_date) の予約人数に delta を加算（commitはしない）"""
+        if delta == 0 or end_date <= start_date:
+            return
+
+        OccupancyService._apply_deltas(
+            session, [(farm_id, start_date, end_date, delta)]
+        )
+
+    @staticmethod
+    def apply_status_change(
+        session: Session,
+        reservation: Reservation,
+        old_status: str | None,
+        new_status: str | None,
+    ) -> None:
+        """
+        予約の作成・ステータス変更・削除をカレンダーに反映
+
+        old_status が None なら新規作成、new_status が None なら削除として扱う。
+        呼び出し側のトランザクションでcommitすること。
+        """
+        was_occupying = old_status in OCCUPYING_STATUSES
+        is_occupying = new_status in OCCUPYING_STATUSES
+        if was_occupying == is_occupying:
+            return
+
+        delta = reservation.num_guests if is_occupying else -reservation.num_guests
+        OccupancyService._add_guests(
+            session,
+            reservation.farm_id,
+            reservation.start_date,
+            reservation.end_date,
+            delta,
+        )
+
+    @staticmethod
+    def apply_bulk_status_change(
+        session: Session,
+        reservations: list[Reservation],
+        old_statuses: dict[int, str],
+        new_status: str,
+    ) -> None:
+        """
+        複数予約のステータス変更をまとめてカレンダーに反映
+
+        対象ファーム・年のFarmOccupancy行をまとめて行ロックして更新する。
+        呼び出し側のトランザクションでcommitすること。
+        """
+        is_occupying = new_status in OCCUPYING_STATUSES
+        changes = [
+            (
+                reservation.farm_id,
+                reservation.start_date,
+                reservation.end_date,
+                reservation.num_guests if is_occupying else -reservation.num_guests,
+            )
+            for reservation in reservations
+            if (old_statuses[reservation.id] in OCCUPYING_STATUSES) != is_occupying
+            and reservation.end_date > reservation.start_date
+        ]
+        OccupancyService._apply_deltas(session, changes)
+
+    @staticmethod
+    def rebuild(session: Session) -> int:
+        """farm_occupancy を全削除し、定員を消費する予約から作り直す（commitはしない）"""
+        session.exec(delete(FarmOccupancy))
+        reservations = session.exec(
+            select(
+                Reservation.farm_id,
+                Reservation.start_date,
+                Reservation.end_date,
+                Reservation.num_guests,
+            ).where(
+                Reservation.status.in_(OCCUPYING_STATUSES),
+                Reservation.end_date > Reservation.start_date,
+            )
+        ).all()
+        OccupancyService._apply_deltas(session, [tuple(row) for row in reservations])
+        return len(reservations)
+
+    @staticmethod
+    def get_booked_guest_nights(
+        session: Session, farm_ids: list[int], date_from: date, date_to: date
+    ) -> dict[int, int]:
+        """期間 [date_from, date_to] の予約人数の合計（人泊）をファームごとに1クエリで取得"""
+        if not farm_ids:
+            return {}
+
+        years = list(range(date_from.year, date_to.year + 1))
+        rows = session.exec(
+            select(FarmOccupancy).where(
+                FarmOccupancy.farm_id.in_(farm_ids), FarmOccupancy.year.in_(years)
+            )
+        ).all()
+
+        totals = dict.fromkeys(farm_ids, 0)
+        for row in rows:
+            first = max(date_from, date(row.year, 1, 1))
+            last = min(date_to, date(row.year, 12, 31))
+            if first <= last:
+                start = OccupancyService._day_index(first)
+                end = OccupancyService._day_index(last) + 1
+                totals[row.farm_id] += sum(row.booked_guests[start:end])
+        return totals
+
+    @staticmethod
+    def get_calendar(
+        session: Session,
+        farm_id: int,
+        max_guests: int,
+        date_from: date,
+        date_to: date,
+    ) -> list[dict]:
+        """期間 [date_from, date_to] の日ごとの予約人数と残り定員を取得"""
+        years = list(range(date_from.year, date_to.year + 1))
+        rows = OccupancyService._get_rows(session, farm_id, years)
+
+        days = []
+        day = date_from
+        while day <= date_to:
+            row = rows.get(day.year)
+            booked = row.booked_guests[OccupancyService._day_index(day)] if row else 0
+            days.append(
+                {
+                    "date": day,
+                    "booked_guests": booked,
+                    "remaining_capacity": max(0, max_guests - booked),
+                }
+            )
+            day += timedelta(days=1)
+        return days
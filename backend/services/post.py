@@ -1,15 +1,175 @@
-from sqlmodel import Session, select
+import math
+from datetime import datetime
 
-from models import Comment, Post, User, Farm
-from schemas.post import CommentCreate, PostCreate, PostUpdate
+from sqlalchemy import Float, case, cast, insert, literal, literal_column, true
+from sqlalchemy.orm import aliased
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, delete, func, select, update
+
+from core.config import settings
+from core.unit_of_work import after_commit
+from models import Comment, Post, PostImage, PostLike, User, Farm
+from schemas.post import CommentCreate, PostCreate, PostListResponse, PostUpdate
+from services.like_buffer import like_buffer
+from services.post_events import post_events
+
+# 一覧取得でSELECT可能な項目と対応する列
+POST_LIST_COLUMNS = {
+    "id": Post.id,
+    "user_id": Post.user_id,
+    "title": Post.title,
+    "content": Post.content,
+    "like_count": Post.like_count,
+    "comment_count": Post.comment_count,
+    "created_at": Post.created_at,
+    "updated_at": Post.updated_at,
+    "user_name": User.name.label("user_name"),
+    "user_type": User.user_type.label("user_type"),
+    "farm_id": Post.farm_id,
+    "farm_name": Farm.name.label("farm_name"),
+}
+
+# 列ではなく別クエリでまとめて取得する項目
+POST_LIST_EXTRAS = ("latest_comment", "first_image_url")
+POST_LIST_FIELDS = [*POST_LIST_COLUMNS, *POST_LIST_EXTRAS]
+
+# 一覧に表示する最新コメントの最大文字数
+COMMENT_PREVIEW_LENGTH = 100
+
+# コメントのパスで1階層に使う桁数（IDをゼロ埋めして祖先から順に連結する）
+COMMENT_PATH_DIGITS = 10
+
+# トレンドスコア: エンゲージメントが10倍になると TRENDING_DECAY_SECONDS だけ新しい投稿と同じ順位
+TRENDING_EPOCH = datetime(2024, 1, 1)
+TRENDING_DECAY_SECONDS = 45000
+TRENDING_COMMENT_WEIGHT = 2
+
+
+class LikeUserNotFoundError(Exception):
+    """Raised when a like is recorded for a user that does not exist"""
+
+
+def trending_score(like_count: int, comment_count: int, created_at: datetime) -> float:
+    """
+    Time-decayed ranking score for a post
+
+    ``log10(1 + engagement) + age / decay`` grows with the creation time, so older
+    posts need exponentially more engagement to rank at the top. The score
+    only changes when likes or comments change, so it can be stored in an
+    indexed column without periodic recomputation.
+    """
+    engagement = like_count + TRENDING_COMMENT_WEIGHT * comment_count
+    age = (created_at - TRENDING_EPOCH).total_seconds()
+    return math.log10(1 + engagement) + age / TRENDING_DECAY_SECONDS
+
+
+def engagement_values(likes: int = 0, comments: int = 0) -> dict:
+    """
+    SET values for a like/comment count change that keep trending_score in step
+
+    Only the log term of trending_score depends on the counts, so it is
+    swapped in place (right-hand columns are the pre-update values) and the
+    whole change stays a single UPDATE without reading the post first.
+    """
+    old = 1 + Post.like_count + TRENDING_COMMENT_WEIGHT * Post.comment_count
+    new = old + likes + TRENDING_COMMENT_WEIGHT * comments
+    values = {
+        "trending_score": Post.trending_score
+        + func.log10(cast(new, Float))
+        - func.log10(cast(old, Float)),
+    }
+    if likes:
+        values["like_count"] = Post.like_count + likes
+    if comments:
+        values["comment_count"] = Post.comment_count + comments
+    return values
+
+
+def comment_path(parent_path: str, comment_id: int) -> str:
+    """Materialized path of a comment: its parent's path plus its own zero-padded id"""
+    return f"{parent_path}{comment_id:0{COMMENT_PATH_DIGITS}d}"
+
+
+def subtree_range(path: str) -> tuple[str, str]:
+    """
+    [lower, upper) bounds on path covering a comment and all of its replies
+
+    Paths are digits only, so the range behaves the same under any collation
+    and is served by the (post_id, path) index. The upper bound is the path
+    of the next sibling id.
+    """
+    parent_path, own_id = path[:-COMMENT_PATH_DIGITS], int(path[-COMMENT_PATH_DIGITS:])
+    return path, comment_path(parent_path, own_id + 1)
+
+
+# 書き込み時に RETURNING で返す投稿者名・ファーム名
+# INSERT の RETURNING では相関サブクエリが自動で相関されないため、SQLで明示する
+POST_USER_NAME = literal_column(
+    "(SELECT users.name FROM users WHERE users.id = posts.user_id)"
+).label("user_name")
+POST_USER_TYPE = literal_column(
+    "(SELECT users.user_type FROM users WHERE users.id = posts.user_id)"
+).label("user_type")
+POST_FARM_NAME = literal_column(
+    "(SELECT farms.name FROM farms WHERE farms.id = posts.farm_id)"
+).label("farm_name")
+
+# 書き込み時に RETURNING で返す投稿の列（get_post と同じ形）
+POST_RETURNING = (
+    Post.id,
+    Post.user_id,
+    Post.title,
+    Post.content,
+    Post.like_count,
+    Post.comment_count,
+    Post.created_at,
+    Post.updated_at,
+    POST_USER_NAME,
+    POST_USER_TYPE,
+    Post.farm_id,
+    POST_FARM_NAME,
+)
+
+# 書き込み時に RETURNING で返すコメントの列
+COMMENT_RETURNING = (
+    Comment.id,
+    Comment.post_id,
+    Comment.user_id,
+    Comment.parent_id,
+    Comment.depth,
+    Comment.reply_count,
+    Comment.content,
+    Comment.created_at,
+    Comment.updated_at,
+    literal_column(
+        "(SELECT users.name FROM users WHERE users.id = comments.user_id)"
+    ).label("user_name"),
+    literal_column(
+        "(SELECT users.user_type FROM users WHERE users.id = comments.user_id)"
+    ).label("user_type"),
+)
+
+# 返信の作成時に一緒に返す親コメントのパス（パスの組み立て用、レスポンスには含めない）
+COMMENT_PARENT_PATH = literal_column(
+    "(SELECT parent.path FROM comments AS parent WHERE parent.id = comments.parent_id)"
+).label("parent_path")
 
 
 class PostService:
     """Service for Post operations"""
 
     @staticmethod
-    def get_post(session: Session, post_id: int) -> dict | None:
-        """Get a single post by ID"""
+    def _post_row(row) -> dict:
+        """Build a post dict from a POST_RETURNING row, including buffered likes"""
+        post = dict(row)
+        post["like_count"] += like_buffer.pending(post["id"])
+        return post
+
+    @staticmethod
+    def get_post(
+        session: Session, post_id: int, viewer_id: int | None = None
+    ) -> dict | None:
+        """Get a single post by ID, with liked_by_me when viewer_id is given"""
         result = session.exec(
             select(
                 Post,
@@ -26,12 +186,13 @@ class PostService:
             return None
 
         post, user_name, user_type, farm_name = result
-        return {
+        data = {
             "id": post.id,
             "user_id": post.user_id,
             "title": post.title,
             "content": post.content,
-            "like_count": post.like_count,
+            "like_count": post.like_count + like_buffer.pending(post.id),
+            "comment_count": post.comment_count,
             "created_at": post.created_at,
             "updated_at": post.updated_at,
             "user_name": user_name,
@@ -39,6 +200,11 @@ class PostService:
             "farm_id": post.farm_id,
             "farm_name": farm_name,
         }
+        if viewer_id is not None:
+            data["liked_by_me"] = post.id in PostService.get_liked_post_ids(
+                session, viewer_id, [post.id]
+            )
+        return data
 
     @staticmethod
     def get_posts(
@@ -46,101 +212,360 @@ class PostService:
         skip: int = 0,
         limit: int = 100,
         user_id: int | None = None,
+        fields: list[str] | None = None,
+        viewer_id: int | None = None,
+        sort: str = "recent",
     ) -> list[dict]:
-        """Get list of posts with optional filter"""
+        """
+        Get list of posts with optional filter, selecting only the given fields
+
+        When viewer_id is given, each post is annotated with liked_by_me using
+        a single lookup for the whole page. latest_comment is likewise loaded
+        for the whole page in one query.
+        """
+        fields = fields or [
+            name for name in PostListResponse.model_fields if name in POST_LIST_FIELDS
+        ]
+        columns = [name for name in fields if name not in POST_LIST_EXTRAS]
+        query = select(*[POST_LIST_COLUMNS[name] for name in columns]).select_from(
+            Post
+        )
+
+        # 必要な場合のみユーザー・ファームを結合する
+        if "user_name" in fields or "user_type" in fields:
+            query = query.join(User, Post.user_id == User.id)
+        if "farm_name" in fields:
+            query = query.outerjoin(Farm, Post.farm_id == Farm.id)
+
+        if user_id:
+            query = query.where(Post.user_id == user_id)
+
+        if sort == "trending":
+            query = query.order_by(Post.trending_score.desc())
+        else:
+            query = query.order_by(Post.created_at.desc())
+        query = query.offset(skip).limit(limit)
+        posts = [dict(row) for row in session.execute(query).mappings().all()]
+
+        if "latest_comment" in fields:
+            latest = CommentService.get_latest_comments(
+                session, [post["id"] for post in posts]
+            )
+            for post in posts:
+                post["latest_comment"] = latest.get(post["id"])
+
+        if "first_image_url" in fields:
+            image_urls = PostService.get_first_image_urls(
+                session, [post["id"] for post in posts]
+            )
+            for post in posts:
+                post["first_image_url"] = image_urls.get(post["id"])
+
+        # 書き込み待ちのいいねを反映する
+        if settings.LIKE_WRITE_BEHIND and "like_count" in fields:
+            for post in posts:
+                post["like_count"] += like_buffer.pending(post["id"])
+
+        if viewer_id is not None:
+            liked = PostService.get_liked_post_ids(
+                session, viewer_id, [post["id"] for post in posts]
+            )
+            for post in posts:
+                post["liked_by_me"] = post["id"] in liked
+        return posts
+
+    @staticmethod
+    def get_liked_post_ids(
+        session: Session, user_id: int, post_ids: list[int]
+    ) -> set[int]:
+        """Get the subset of post_ids the user has liked, in one query"""
+        if not post_ids:
+            return set()
+        return set(
+            session.exec(
+                select(PostLike.post_id).where(
+                    PostLike.user_id == user_id, PostLike.post_id.in_(post_ids)
+                )
+            ).all()
+        )
+
+    @staticmethod
+    def get_posts_version(
+        session: Session, user_id: int | None = None
+    ) -> tuple[int, datetime | None]:
+        """
+        Get (count, latest updated_at) of the posts matching the filter
+
+        The latest updated_at also covers what list rows embed: the authors'
+        names, the farms' names and the latest comments with their authors.
+        """
+        commenter = aliased(User)
+        comments = select(
+            func.max(Comment.updated_at).label("comment_updated_at"),
+            func.max(commenter.updated_at).label("commenter_updated_at"),
+        ).join(commenter, Comment.user_id == commenter.id)
         query = (
             select(
-                Post,
-                User.name.label("user_name"),
-                User.user_type.label("user_type"),
-                Farm.name.label("farm_name"),
+                func.count(Post.id),
+                func.max(Post.updated_at),
+                func.max(User.updated_at),
+                func.max(Farm.updated_at),
             )
+            .select_from(Post)
             .join(User, Post.user_id == User.id)
             .outerjoin(Farm, Post.farm_id == Farm.id)
         )
-
         if user_id:
             query = query.where(Post.user_id == user_id)
+            comments = comments.join(Post, Comment.post_id == Post.id).where(
+                Post.user_id == user_id
+            )
+        comments = comments.subquery()
+        count, *modified = session.exec(
+            # 集約クエリなので、1行だけのサブクエリの列も max() で受け取る
+            query.add_columns(*[func.max(column) for column in comments.c]).join(
+                comments, true()
+            )
+        ).one()
+        return count, max(filter(None, modified), default=None)
 
-        query = query.offset(skip).limit(limit).order_by(Post.created_at.desc())
-        results = session.exec(query).all()
+    @staticmethod
+    def get_post_version(session: Session, post_id: int) -> datetime | None:
+        """
+        Latest updated_at of a post, its author and its farm (None if missing)
 
-        posts = []
-        for post, user_name, user_type, farm_name in results:
-            post_dict = {
-                "id": post.id,
-                "user_id": post.user_id,
-                "title": post.title,
-                "content": post.content,
-                "like_count": post.like_count,
-                "created_at": post.created_at,
-                "user_name": user_name,
-                "user_type": user_type,
-                "farm_id": post.farm_id,
-                "farm_name": farm_name,
-            }
-            posts.append(post_dict)
-        return posts
+        Like the list version, this covers the names embedded in the detail
+        response, so renames are not hidden behind a 304.
+        """
+        row = session.exec(
+            select(Post.updated_at, User.updated_at, Farm.updated_at)
+            .join(User, Post.user_id == User.id)
+            .outerjoin(Farm, Post.farm_id == Farm.id)
+            .where(Post.id == post_id)
+        ).first()
+        return max(filter(None, row)) if row else None
 
     @staticmethod
-    def create_post(session: Session, post_data: PostCreate) -> dict:
-        """Create a new post"""
-        post = Post(**post_data.model_dump())
-        session.add(post)
-        session.commit()
-        session.refresh(post)
+    def get_first_image_urls(session: Session, post_ids: list[int]) -> dict[int, str]:
+        """Get the first image URL (lowest display_order) of each post, in one query"""
+        if not post_ids:
+            return {}
 
-        # Get post with user_name and farm_name
-        return PostService.get_post(session, post.id)
+        ranked = (
+            select(
+                PostImage.post_id,
+                PostImage.image_url,
+                func.row_number()
+                .over(
+                    partition_by=PostImage.post_id,
+                    order_by=(PostImage.display_order, PostImage.id),
+                )
+                .label("rank"),
+            )
+            .where(PostImage.post_id.in_(post_ids))
+            .subquery()
+        )
+        rows = session.execute(
+            select(ranked.c.post_id, ranked.c.image_url).where(ranked.c.rank == 1)
+        ).all()
+        return {post_id: image_url for post_id, image_url in rows}
 
     @staticmethod
-    def update_post(session: Session, post_id: int, post_data: PostUpdate) -> dict | None:
-        """Update a post"""
-        post = session.exec(select(Post).where(Post.id == post_id)).first()
-        if not post:
-            return None
+    def get_post_images(session: Session, post_id: int) -> list[PostImage]:
+        """Get all images of a post in display order"""
+        return session.exec(
+            select(PostImage)
+            .where(PostImage.post_id == post_id)
+            .order_by(PostImage.display_order, PostImage.id)
+        ).all()
 
-        update_data = post_data.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(post, key, value)
+    @staticmethod
+    def add_post_image(session: Session, post_id: int, image_url: str) -> PostImage:
+        """Append an image to a post's gallery (display_order is computed in the INSERT)"""
+        next_order = (
+            select(func.coalesce(func.max(PostImage.display_order) + 1, 0))
+            .where(PostImage.post_id == post_id)
+            .scalar_subquery()
+        )
+        post_image = session.exec(
+            insert(PostImage)
+            .values(
+                post_id=post_id,
+                image_url=image_url,
+                display_order=next_order,
+                created_at=datetime.utcnow(),
+            )
+            .returning(PostImage)
+        ).scalar_one()
+
+        # Bump the post's updated_at so conditional responses see the new image
+        session.exec(
+            update(Post).where(Post.id == post_id).values(updated_at=datetime.utcnow())
+        )
+        return post_image
 
-        session.add(post)
-        session.commit()
-        session.refresh(post)
+    @staticmethod
+    def create_post(session: Session, post_data: PostCreate) -> dict:
+        """Create a new post; the INSERT returns it with user_name and farm_name"""
+        post = Post(**post_data.model_dump())
+        values = post.model_dump(exclude={"id"})
+        values["trending_score"] = trending_score(0, 0, post.created_at)
+        row = session.execute(
+            insert(Post).values(**values).returning(*POST_RETURNING)
+        ).mappings().one()
+        return PostService._post_row(row)
 
-        # Get post with user_name and farm_name
-        return PostService.get_post(session, post.id)
+    @staticmethod
+    def update_post(session: Session, post_id: int, post_data: PostUpdate) -> dict | None:
+        """Update a post; the UPDATE returns it with user_name and farm_name"""
+        update_data = post_data.model_dump(exclude_unset=True)
+        row = session.execute(
+            update(Post)
+            .where(Post.id == post_id)
+            .values(**update_data)
+            .returning(*POST_RETURNING)
+        ).mappings().first()
+        return PostService._post_row(row) if row else None
 
     @staticmethod
     def delete_post(session: Session, post_id: int) -> bool:
-        """Delete a post and its comments"""
-        post = session.exec(select(Post).where(Post.id == post_id)).first()
-        if not post:
+        """Delete a post with its comments, likes and images"""
+        exists = session.exec(select(Post.id).where(Post.id == post_id)).first()
+        if not exists:
             return False
 
-        # Delete all comments for this post
-        comments = session.exec(select(Comment).where(Comment.post_id == post_id)).all()
-        for comment in comments:
-            session.delete(comment)
-
-        session.delete(post)
-        session.commit()
+        PostService.delete_posts(session, [post_id])
         return True
 
     @staticmethod
-    def like_post(session: Session, post_id: int) -> dict | None:
-        """Increment like count for a post"""
-        post = session.exec(select(Post).where(Post.id == post_id)).first()
-        if not post:
-            return None
+    def delete_posts(session: Session, post_ids) -> None:
+        """
+        Delete posts and their dependent rows with one DELETE per table
+
+        post_ids may be a list or a SELECT of post ids.
+        """
+        for model in (PostLike, Comment, PostImage):
+            session.exec(
+                delete(model)
+                .where(model.post_id.in_(post_ids))
+                .execution_options(synchronize_session=False)
+            )
+        session.exec(
+            delete(Post)
+            .where(Post.id.in_(post_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+    @staticmethod
+    def _apply_like(session: Session, post_id: int, delta: int) -> dict | None:
+        """
+        Apply a like count change and return the updated post
+
+        Without LIKE_WRITE_BEHIND this is one ``UPDATE ... RETURNING``. With it,
+        the change goes to the like buffer once the request commits, so the
+        post is read and the buffered change added to the returned count.
+        """
+        if settings.LIKE_WRITE_BEHIND:
+            post = PostService.get_post(session, post_id)
+            after_commit(session, lambda: like_buffer.add(post_id, delta))
+            if post:
+                post["like_count"] += delta
+            return post
 
-        post.like_count += 1
-        session.add(post)
-        session.commit()
-        session.refresh(post)
+        row = session.execute(
+            update(Post)
+            .where(Post.id == post_id)
+            .values(**engagement_values(likes=delta))
+            .returning(*POST_RETURNING)
+        ).mappings().first()
+        return PostService._post_row(row) if row else None
 
-        # Get post with user_name and farm_name
-        return PostService.get_post(session, post.id)
+    @staticmethod
+    def refresh_trending_scores(session: Session, post_ids) -> None:
+        """
+        Recompute trending_score from the current counts
+
+        post_ids may be a list or a SELECT of post ids.
+        """
+        rows = session.exec(
+            select(Post.id, Post.like_count, Post.comment_count, Post.created_at).where(
+                Post.id.in_(post_ids)
+            )
+        ).all()
+        if not rows:
+            return
+        session.execute(
+            update(Post),
+            [
+                {"id": post_id, "trending_score": trending_score(likes, comments, created_at)}
+                for post_id, likes, comments, created_at in rows
+            ],
+        )
+
+    @staticmethod
+    def like_post(session: Session, post_id: int, user_id: int) -> dict | None:
+        """
+        Record a user's like on a post; liking an already liked post is a no-op
+
+        The like is an ``INSERT ... SELECT ... ON CONFLICT DO NOTHING``, so a
+        duplicate (even a concurrent one), a missing post or a missing user
+        inserts nothing without aborting the request's transaction. The
+        like_count change is written in the same transaction, keeping the
+        counter consistent with post_likes.
+
+        Raises LikeUserNotFoundError if the post exists but the user does not.
+        """
+        inserted = session.exec(
+            pg_insert(PostLike)
+            .from_select(
+                ["post_id", "user_id", "created_at"],
+                select(
+                    literal(post_id), literal(user_id), literal(datetime.utcnow())
+                ).where(
+                    Post.id == post_id,
+                    select(User.id).where(User.id == user_id).exists(),
+                ),
+            )
+            .on_conflict_do_nothing(index_elements=["post_id", "user_id"])
+        ).rowcount
+
+        if inserted:
+            post = PostService._apply_like(session, post_id, 1)
+            PostService._publish_like(session, post)
+        else:
+            post = PostService.get_post(session, post_id)
+            # 挿入されなかった理由が重複ではなくユーザー不在の場合
+            if post and not session.exec(
+                select(User.id).where(User.id == user_id)
+            ).first():
+                raise LikeUserNotFoundError(user_id)
+        if post:
+            post["liked_by_me"] = True
+        return post
+
+    @staticmethod
+    def unlike_post(session: Session, post_id: int, user_id: int) -> dict | None:
+        """Remove a user's like from a post; unliking twice is a no-op"""
+        removed = session.exec(
+            delete(PostLike).where(
+                PostLike.post_id == post_id, PostLike.user_id == user_id
+            )
+        ).rowcount
+
+        if removed:
+            post = PostService._apply_like(session, post_id, -1)
+            PostService._publish_like(session, post)
+        else:
+            post = PostService.get_post(session, post_id)
+        if post:
+            post["liked_by_me"] = False
+        return post
+
+    @staticmethod
+    def _publish_like(session: Session, post: dict) -> None:
+        """Notify live viewers of the post's new like count once it is committed"""
+        data = {"post_id": post["id"], "like_count": post["like_count"]}
+        after_commit(session, lambda: post_events.publish(post["id"], "like", data))
 
 
 class CommentService:
@@ -177,6 +602,9 @@ class CommentService:
                 "id": comment.id,
                 "post_id": comment.post_id,
                 "user_id": comment.user_id,
+                "parent_id": comment.parent_id,
+                "depth": comment.depth,
+                "reply_count": comment.reply_count,
                 "content": comment.content,
                 "created_at": comment.created_at,
                 "user_name": user_name,
@@ -186,35 +614,189 @@ class CommentService:
         return comments
 
     @staticmethod
-    def create_comment(session: Session, comment_data: CommentCreate) -> dict:
-        """Create a new comment"""
+    def get_comment_thread(
+        session: Session,
+        post_id: int,
+        root: Comment | None = None,
+        skip: int = 0,
+        limit: int = 100,
+    ) -> list[dict]:
+        """
+        Get a post's comment tree, or the subtree under root, in display order
+
+        One range query on (post_id, path): ordering by path lists every
+        comment right after its parent (replies oldest first), so the client
+        only indents by depth.
+        """
+        query = (
+            select(
+                Comment.id,
+                Comment.post_id,
+                Comment.user_id,
+                Comment.parent_id,
+                Comment.depth,
+                Comment.reply_count,
+                Comment.content,
+                Comment.created_at,
+                User.name.label("user_name"),
+                User.user_type.label("user_type"),
+            )
+            .join(User, Comment.user_id == User.id)
+            .where(Comment.post_id == post_id)
+        )
+        if root is not None:
+            lower, upper = subtree_range(root.path)
+            query = query.where(Comment.path >= lower, Comment.path < upper)
+
+        query = query.order_by(Comment.path).offset(skip).limit(limit)
+        return [dict(row) for row in session.execute(query).mappings().all()]
+
+    @staticmethod
+    def get_latest_comments(session: Session, post_ids: list[int]) -> dict[int, dict]:
+        """
+        Get the newest comment of each post as {post_id: preview}
+
+        Uses ROW_NUMBER() over comments partitioned by post, so a whole page
+        is covered by one query.
+        """
+        if not post_ids:
+            return {}
+
+        ranked = (
+            select(
+                Comment.id,
+                Comment.post_id,
+                Comment.user_id,
+                func.substr(Comment.content, 1, COMMENT_PREVIEW_LENGTH).label("content"),
+                Comment.created_at,
+                func.row_number()
+                .over(
+                    partition_by=Comment.post_id,
+                    order_by=(Comment.created_at.desc(), Comment.id.desc()),
+                )
+                .label("rank"),
+            )
+            .where(Comment.post_id.in_(post_ids))
+            .subquery()
+        )
+        query = (
+            select(
+                ranked.c.post_id,
+                ranked.c.id,
+                ranked.c.user_id,
+                User.name.label("user_name"),
+                ranked.c.content,
+                ranked.c.created_at,
+            )
+            .join(User, ranked.c.user_id == User.id)
+            .where(ranked.c.rank == 1)
+        )
+
+        latest = {}
+        for row in session.execute(query).mappings().all():
+            preview = dict(row)
+            latest[preview.pop("post_id")] = preview
+        return latest
+
+    @staticmethod
+    def create_comment(session: Session, comment_data: CommentCreate) -> dict | None:
+        """
+        Create a new comment (a reply when parent_id is given) and increment the
+        post's comment_count
+
+        The INSERT returns the comment with user_name and user_type, so no
+        refresh or user lookup follows the write. A reply is inserted with
+        ``INSERT ... SELECT`` from its parent on the same post, which also
+        returns the parent's path; None is returned if there is no such
+        parent. The path needs the new id, so it is completed by one UPDATE
+        that also bumps the parent's reply_count.
+        """
         comment = Comment(**comment_data.model_dump())
-        session.add(comment)
-        session.commit()
-        session.refresh(comment)
-
-        # Get user_name and user_type
-        user = session.exec(select(User).where(User.id == comment.user_id)).first()
-        return {
-            "id": comment.id,
-            "post_id": comment.post_id,
-            "user_id": comment.user_id,
-            "content": comment.content,
-            "created_at": comment.created_at,
-            "updated_at": comment.updated_at,
-            "user_name": user.name if user else None,
-            "user_type": user.user_type if user else None,
-        }
+        values = comment.model_dump(exclude={"id", "depth"})
+        if comment.parent_id is None:
+            statement = insert(Comment).values(**values, depth=0)
+        else:
+            parent = aliased(Comment)
+            columns = Comment.__table__.c
+            statement = insert(Comment).from_select(
+                [*values, "depth"],
+                select(
+                    *[literal(value, columns[name].type) for name, value in values.items()],
+                    parent.depth + 1,
+                ).where(parent.id == comment.parent_id, parent.post_id == comment.post_id),
+            )
+        row = session.execute(
+            statement.returning(*COMMENT_RETURNING, COMMENT_PARENT_PATH)
+        ).mappings().first()
+        if row is None:
+            return None
+
+        result = dict(row)
+        parent_path = result.pop("parent_path")
+        path = comment_path(parent_path or "", row["id"])
+        if comment.parent_id is None:
+            session.exec(update(Comment).where(Comment.id == row["id"]).values(path=path))
+        else:
+            session.exec(
+                update(Comment)
+                .where(Comment.id.in_([row["id"], comment.parent_id]))
+                .values(
+                    path=case((Comment.id == row["id"], path), else_=Comment.path),
+                    reply_count=case(
+                        (Comment.id == comment.parent_id, Comment.reply_count + 1),
+                        else_=Comment.reply_count,
+                    ),
+                )
+            )
+        session.exec(
+            update(Post)
+            .where(Post.id == comment.post_id)
+            .values(**engagement_values(comments=1))
+        )
+
+        after_commit(
+            session, lambda: post_events.publish(comment.post_id, "comment", result)
+        )
+        return result
 
     @staticmethod
     def delete_comment(session: Session, comment_id: int) -> bool:
-        """Delete a comment"""
+        """
+        Delete a comment together with its replies
+
+        The whole subtree goes in one range DELETE; the parent's reply_count
+        and the post's comment_count are decremented accordingly.
+        """
         comment = session.exec(
-            select(Comment).where(Comment.id == comment_id)
+            select(Comment.post_id, Comment.parent_id, Comment.path).where(
+                Comment.id == comment_id
+            )
         ).first()
         if not comment:
             return False
 
-        session.delete(comment)
-        session.commit()
+        post_id, parent_id, path = comment
+        lower, upper = subtree_range(path)
+        deleted_ids = session.exec(
+            delete(Comment)
+            .where(Comment.post_id == post_id, Comment.path >= lower, Comment.path < upper)
+            .returning(Comment.id)
+            .execution_options(synchronize_session=False)
+        ).scalars().all()
+
+        if parent_id is not None:
+            session.exec(
+                update(Comment)
+                .where(Comment.id == parent_id)
+                .values(reply_count=Comment.reply_count - 1)
+            )
+        session.exec(
+            update(Post)
+            .where(Post.id == post_id)
+            .values(**engagement_values(comments=-len(deleted_ids)))
+        )
+        data = {"id": comment_id, "post_id": post_id, "deleted_ids": deleted_ids}
+        after_commit(
+            session, lambda: post_events.publish(post_id, "comment_deleted", data)
+        )
         return True
@@ -0,0 +1,101 @@
+import asyncio
+import threading
+from typing import Any
+
+from core.config import settings
+from core.responses import json_bytes
+
+
+class StreamLimitError(Exception):
+    """Raised when the broker already serves its maximum number of connections"""
+
+
+class Subscription:
+    """A single live viewer of a post, with a bounded event queue"""
+
+    def __init__(self, post_id: int, queue_size: int):
+        self.post_id = post_id
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def offer(self, message: tuple[str, Any]) -> None:
+        """
+        Enqueue an event without blocking the publisher
+
+        A viewer that cannot keep up is dropped: its backlog is discarded and
+        it receives an ``overflow`` event so the client reconnects and reloads.
+        """
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class PostEventBroker:
+    """In-process pub/sub of post activity (comments, likes) for live viewers"""
+
+    def __init__(self, max_connections: int, queue_size: int):
+        self.max_connections = max_connections
+        self.queue_size = queue_size
+        self._subscribers: dict[int, set[Subscription]] = {}
+        self._count = 0
+        self._lock = threading.Lock()
+
+    @property
+    def connection_count(self) -> int:
+        return self._count
+
+    def subscribe(self, post_id: int) -> Subscription:
+        """Register a viewer; must be called from the event loop"""
+        with self._lock:
+            if self._count >= self.max_connections:
+                raise StreamLimitError("Too many live connections")
+            subscription = Subscription(post_id, self.queue_size)
+            self._subscribers.setdefault(post_id, set()).add(subscription)
+            self._count += 1
+            return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.post_id)
+            if not subscribers or subscription not in subscribers:
+                return
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.post_id]
+            self._count -= 1
+
+    def publish(self, post_id: int, event: str, data: Any) -> None:
+        """
+        Send an event to every viewer of a post
+
+        Safe to call from any thread; delivery is scheduled on each viewer's
+        event loop and never blocks the caller.
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.get(post_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(
+                    subscription.offer, (event, data)
+                )
+            except RuntimeError:
+                # The viewer's event loop has already shut down
+                self.unsubscribe(subscription)
+
+
+def sse_message(event: str, data: Any) -> bytes:
+    """Format one Server-Sent Events message"""
+    return b"event: " + event.encode() + b"\ndata: " + json_bytes(data) + b"\n\n"
+
+
+post_events = PostEventBroker(
+    max_connections=settings.POST_STREAM_MAX_CONNECTIONS,
+    queue_size=settings.POST_STREAM_QUEUE_SIZE,
+)
@@ -0,0 +1,130 @@
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlmodel import Session, delete, func, select
+
+from models import FarmRating, Review
+
+RATING_VALUES = range(1, 6)
+
+
+def _histogram_column(rating: int) -> str:
+    return f"rating_{rating}"
+
+
+def rating_summary(rating_sum: int, review_count: int) -> float | None:
+    """Average rating from a sum and count (None when there are no reviews)"""
+    return round(rating_sum / review_count, 2) if review_count else None
+
+
+class RatingService:
+    """ファーム別レビュー評価の集計（farm_ratings）の管理"""
+
+    @staticmethod
+    def _apply_changes(
+        session: Session, changes: dict[int, dict[int, int]]
+    ) -> None:
+        """
+        {farm_id: {rating: delta}} を farm_ratings に加算（commitはしない）
+
+        ファームごとに1回の INSERT ... ON CONFLICT DO UPDATE で、行がなければ
+        作成し、あれば既存値に加算するため、同時に書き込んでも値を失わない。
+        """
+        now = datetime.utcnow()
+        for farm_id in sorted(changes):
+            deltas = changes[farm_id]
+            if not any(deltas.values()):
+                continue
+
+            counts = {
+                "rating_sum": sum(rating * delta for rating, delta in deltas.items()),
+                "review_count": sum(deltas.values()),
+                **{
+                    _histogram_column(rating): deltas.get(rating, 0)
+                    for rating in RATING_VALUES
+                },
+            }
+            statement = pg_insert(FarmRating).values(
+                farm_id=farm_id, updated_at=now, **counts
+            )
+            session.exec(
+                statement.on_conflict_do_update(
+                    index_elements=["farm_id"],
+                    set_={
+                        "updated_at": now,
+                        **{
+                            name: getattr(FarmRating, name) + getattr(statement.excluded, name)
+                            for name in counts
+                        },
+                    },
+                )
+            )
+
+    @staticmethod
+    def apply_review_change(
+        session: Session, farm_id: int, rating: int, delta: int
+    ) -> None:
+        """Add (delta=1) or remove (delta=-1) one review from its farm's aggregate"""
+        RatingService._apply_changes(session, {farm_id: {rating: delta}})
+
+    @staticmethod
+    def remove_reviews(session: Session, review_ids) -> None:
+        """
+        Take reviews matching review_ids (a list or a subquery) out of the
+        aggregates; call before deleting them
+
+        One grouped query finds the (farm, rating) counts, then each affected
+        farm gets a single upsert.
+        """
+        changes: dict[int, dict[int, int]] = defaultdict(dict)
+        for farm_id, rating, count in session.exec(
+            select(Review.farm_id, Review.rating, func.count(Review.id))
+            .where(Review.id.in_(review_ids))
+            .group_by(Review.farm_id, Review.rating)
+        ).all():
+            changes[farm_id][rating] = -count
+        RatingService._apply_changes(session, changes)
+
+    @staticmethod
+    def get_farm_rating(session: Session, farm_id: int) -> dict:
+        """Average, count and 1–5 distribution for a farm, read from its aggregate row"""
+        row = session.exec(
+            select(FarmRating).where(FarmRating.farm_id == farm_id)
+        ).first()
+        rating_sum = row.rating_sum if row else 0
+        review_count = row.review_count if row else 0
+        return {
+            "farm_id": farm_id,
+            "average_rating": rating_summary(rating_sum, review_count),
+            "review_count": review_count,
+            "distribution": {
+                str(rating): getattr(row, _histogram_column(rating)) if row else 0
+                for rating in RATING_VALUES
+            },
+        }
+
+    @staticmethod
+    def get_farm_ratings(session: Session, farm_ids) -> dict[int, tuple[int, int]]:
+        """{farm_id: (rating_sum, review_count)} for farms that have reviews"""
+        return {
+            farm_id: (rating_sum, review_count)
+            for farm_id, rating_sum, review_count in session.exec(
+                select(
+                    FarmRating.farm_id, FarmRating.rating_sum, FarmRating.review_count
+                ).where(FarmRating.farm_id.in_(farm_ids))
+            ).all()
+        }
+
+    @staticmethod
+    def rebuild(session: Session) -> int:
+        """farm_ratings を全削除し、reviews から作り直す（commitはしない）"""
+        session.exec(delete(FarmRating))
+        changes: dict[int, dict[int, int]] = defaultdict(dict)
+        for farm_id, rating, count in session.exec(
+            select(Review.farm_id, Review.rating, func.count(Review.id))
+            .group_by(Review.farm_id, Review.rating)
+        ).all():
+            changes[farm_id][rating] = count
+        RatingService._apply_changes(session, changes)
+        return len(changes)
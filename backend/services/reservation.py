@@ -1,7 +1,39 @@
-from sqlmodel import Session, select
+from datetime import date, datetime
 
-from models import Reservation
-from schemas.reservation import ReservationCreate, ReservationUpdate
+from sqlmodel import Session, func, select, update
+
+from models import Farm, Reservation, Review, User
+from schemas.reservation import (
+    ReservationCreate,
+    ReservationListResponse,
+    ReservationUpdate,
+)
+from services.farm import FarmService
+from services.occupancy import OccupancyService
+
+# 一覧で列から取得せず、別クエリでまとめて付与する項目
+RESERVATION_LIST_EXTRAS = ("has_review", "farm")
+
+# 一覧取得で既定でSELECTする列（message, contact_phone などは除外）
+RESERVATION_LIST_COLUMNS = [
+    name
+    for name in ReservationListResponse.model_fields
+    if name not in RESERVATION_LIST_EXTRAS
+]
+
+# ?fields= で指定できる項目
+RESERVATION_LIST_FIELDS = [*Reservation.model_fields, *RESERVATION_LIST_EXTRAS]
+
+# 予約ステータスの遷移表（遷移先: 遷移元）。pending には戻せない
+STATUS_TRANSITIONS = {
+    "approved": ("pending",),
+    "cancelled": ("pending", "approved"),
+    "completed": ("approved",),
+}
+
+
+class ReservationConflictError(Exception):
+    """Raised when a reservation is not in the status or version a change expects"""
 
 
 class ReservationService:
@@ -15,16 +47,26 @@ class ReservationService:
         ).first()
 
     @staticmethod
-    def get_reservations(
-        session: Session,
-        skip: int = 0,
-        limit: int = 100,
+    def _filter_reservations(
+        query,
         guest_id: int | None = None,
         farm_id: int | None = None,
         status: str | None = None,
-    ) -> list[Reservation]:
-        """Get list of reservations with optional filters"""
-        query = select(Reservation)
+        host_id: int | None = None,
+        start_date_from: date | None = None,
+        start_date_to: date | None = None,
+    ):
+        """
+        Apply list filters shared by the list and version queries
+
+        host_id joins farms on farms.host_id instead of loading the host's
+        farm ids first, so each farm is read through the
+        (farm_id, status, created_at) index.
+        """
+        if host_id is not None:
+            query = query.join(Farm, Reservation.farm_id == Farm.id).where(
+                Farm.host_id == host_id
+            )
 
         if guest_id:
             query = query.where(Reservation.guest_id == guest_id)
@@ -35,8 +77,123 @@ class ReservationService:
         if status:
             query = query.where(Reservation.status == status)
 
+        if start_date_from:
+            query = query.where(Reservation.start_date >= start_date_from)
+
+        if start_date_to:
+            query = query.where(Reservation.start_date <= start_date_to)
+
+        return query
+
+    @staticmethod
+    def get_reservations_version(
+        session: Session,
+        guest_id: int | None = None,
+        farm_id: int | None = None,
+        status: str | None = None,
+        host_id: int | None = None,
+        start_date_from: date | None = None,
+        start_date_to: date | None = None,
+    ) -> tuple[int, datetime | None]:
+        """
+        Get (count, latest updated_at) of the reservations matching the filters
+
+        The latest updated_at also covers the farms of those reservations,
+        since list rows embed the farm name and main image.
+        """
+        query = select(
+            func.count(Reservation.id),
+            func.max(Reservation.updated_at),
+            func.max(Farm.updated_at),
+        ).select_from(Reservation)
+        if host_id is None:
+            # host_id の場合は _filter_reservations が farms を JOIN する
+            query = query.join(Farm, Reservation.farm_id == Farm.id)
+        query = ReservationService._filter_reservations(
+            query,
+            guest_id=guest_id,
+            farm_id=farm_id,
+            status=status,
+            host_id=host_id,
+            start_date_from=start_date_from,
+            start_date_to=start_date_to,
+        )
+        count, reservations_modified, farms_modified = session.exec(query).one()
+        if count == 0:
+            return count, None
+        return count, max(reservations_modified, farms_modified)
+
+    @staticmethod
+    def get_reservations(
+        session: Session,
+        skip: int = 0,
+        limit: int = 100,
+        guest_id: int | None = None,
+        farm_id: int | None = None,
+        status: str | None = None,
+        host_id: int | None = None,
+        start_date_from: date | None = None,
+        start_date_to: date | None = None,
+        fields: list[str] | None = None,
+    ) -> list[dict]:
+        """
+        Get list of reservations with optional filters
+
+        Only the columns needed for ``fields`` are selected; has_review and farm
+        are attached with one batched query each instead of per row.
+        """
+        fields = fields or list(ReservationListResponse.model_fields)
+        columns = [name for name in fields if name not in RESERVATION_LIST_EXTRAS]
+        if "farm" in fields and "farm_id" not in columns:
+            columns.append("farm_id")
+
+        query = ReservationService._filter_reservations(
+            select(*[getattr(Reservation, name) for name in columns]),
+            guest_id=guest_id,
+            farm_id=farm_id,
+            status=status,
+            host_id=host_id,
+            start_date_from=start_date_from,
+            start_date_to=start_date_to,
+        )
         query = query.offset(skip).limit(limit).order_by(Reservation.created_at.desc())
-        return session.exec(query).all()
+        reservations = [dict(row) for row in session.execute(query).mappings().all()]
+
+        if "has_review" in fields:
+            reviewed_ids = set(
+                session.exec(
+                    select(Review.reservation_id).where(
+                        Review.reservation_id.in_([r["id"] for r in reservations])
+                    )
+                ).all()
+            )
+            for reservation in reservations:
+                reservation["has_review"] = reservation["id"] in reviewed_ids
+
+        if "farm" in fields:
+            farm_ids_on_page = list({r["farm_id"] for r in reservations})
+            farm_names = dict(
+                session.exec(
+                    select(Farm.id, Farm.name).where(Farm.id.in_(farm_ids_on_page))
+                ).all()
+            )
+            image_urls = FarmService.get_main_image_urls(session, farm_ids_on_page)
+            for reservation in reservations:
+                row_farm_id = reservation["farm_id"]
+                reservation["farm"] = (
+                    {
+                        "id": row_farm_id,
+                        "name": farm_names[row_farm_id],
+                        "main_image_url": image_urls.get(row_farm_id),
+                    }
+                    if row_farm_id in farm_names
+                    else None
+                )
+            if "farm_id" not in fields:
+                for reservation in reservations:
+                    del reservation["farm_id"]
+
+        return reservations
 
     @staticmethod
     def create_reservation(
@@ -45,29 +202,163 @@ class ReservationService:
         """Create a new reservation"""
         reservation = Reservation(**reservation_data.model_dump())
         session.add(reservation)
-        session.commit()
-        session.refresh(reservation)
+        OccupancyService.apply_status_change(
+            session, reservation, None, reservation.status
+        )
+        session.flush()
         return reservation
 
+    @staticmethod
+    def _check_transition(old_status: str, new_status: str) -> None:
+        """Raise ReservationConflictError unless STATUS_TRANSITIONS allows the change"""
+        if old_status not in STATUS_TRANSITIONS.get(new_status, ()):
+            raise ReservationConflictError(
+                f"Cannot change reservation from {old_status} to {new_status}"
+            )
+
+    @staticmethod
+    def _conditional_update(
+        session: Session,
+        reservation: Reservation,
+        expected_version: int | None,
+        values: dict,
+    ) -> Reservation:
+        """
+        Write values with one UPDATE that only matches the status and version
+        the reservation was read with, bumping the version
+
+        No row lock is taken: if another request changed the row in between,
+        nothing matches and ReservationConflictError is raised.
+        """
+        old_status = reservation.status
+        if expected_version is None:
+            expected_version = reservation.version
+        elif expected_version != reservation.version:
+            raise ReservationConflictError(
+                f"Reservation was modified (version {reservation.version}, "
+                f"expected {expected_version})"
+            )
+
+        updated = session.exec(
+            update(Reservation)
+            .where(
+                Reservation.id == reservation.id,
+                Reservation.status == old_status,
+                Reservation.version == expected_version,
+            )
+            .values(**values, version=Reservation.version + 1)
+            .returning(Reservation)
+            .execution_options(populate_existing=True)
+        ).scalars().first()
+        if updated is None:
+            raise ReservationConflictError(
+                "Reservation was modified by another request"
+            )
+
+        OccupancyService.apply_status_change(
+            session, updated, old_status, updated.status
+        )
+        return updated
+
+    @staticmethod
+    def transition_status(
+        session: Session,
+        reservation: Reservation,
+        new_status: str,
+        expected_version: int | None = None,
+    ) -> Reservation:
+        """
+        Move a reservation to new_status if STATUS_TRANSITIONS allows it
+
+        Raises ReservationConflictError if the transition is not allowed from
+        the current status or the reservation changed since it was read.
+        """
+        ReservationService._check_transition(reservation.status, new_status)
+        return ReservationService._conditional_update(
+            session, reservation, expected_version, {"status": new_status}
+        )
+
     @staticmethod
     def update_reservation(
         session: Session, reservation_id: int, reservation_data: ReservationUpdate
     ) -> Reservation | None:
-        """Update a reservation"""
-        reservation = session.exec(
-            select(Reservation).where(Reservation.id == reservation_id)
-        ).first()
+        """
+        Update a reservation
+
+        A status change must follow STATUS_TRANSITIONS. If version is given,
+        the update only applies to that version of the reservation. Raises
+        ReservationConflictError otherwise.
+        """
+        reservation = ReservationService.get_reservation(session, reservation_id)
         if not reservation:
             return None
 
-        update_data = reservation_data.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(reservation, key, value)
+        values = reservation_data.model_dump(exclude_unset=True, exclude={"version"})
+        new_status = values.get("status", reservation.status)
+        if new_status != reservation.status:
+            ReservationService._check_transition(reservation.status, new_status)
+        return ReservationService._conditional_update(
+            session, reservation, reservation_data.version, values
+        )
 
-        session.add(reservation)
-        session.commit()
-        session.refresh(reservation)
-        return reservation
+    @staticmethod
+    def get_reservations_for_host_action(
+        session: Session, reservation_ids: list[int]
+    ) -> list[tuple[Reservation, int, str, str | None]]:
+        """
+        Lock reservations for a host action and return them with
+        (host_id, farm_name, guest_email)
+
+        One query covers the authorization check for every id; rows are
+        locked (FOR UPDATE) until the request's transaction ends.
+        """
+        return session.exec(
+            select(Reservation, Farm.host_id, Farm.name, User.email)
+            .join(Farm, Reservation.farm_id == Farm.id)
+            .join(User, Reservation.guest_id == User.id)
+            .where(Reservation.id.in_(reservation_ids))
+            .order_by(Reservation.id)
+            .with_for_update(of=Reservation)
+        ).all()
+
+    @staticmethod
+    def bulk_update_status(
+        session: Session, reservations: list[Reservation], new_status: str
+    ) -> tuple[list[int], list[dict]]:
+        """
+        Apply one status transition to many reservations with a single UPDATE
+
+        Reservations whose current status cannot move to new_status (see
+        STATUS_TRANSITIONS) are skipped. Occupancy is adjusted for the
+        updated ones in one batch. Returns (updated ids, skipped rows).
+        """
+        allowed_from = STATUS_TRANSITIONS[new_status]
+        eligible = [r for r in reservations if r.status in allowed_from]
+        skipped = [
+            {"id": r.id, "status": r.status}
+            for r in reservations
+            if r.status not in allowed_from
+        ]
+        if not eligible:
+            return [], skipped
+
+        updated_ids = set(
+            session.exec(
+                update(Reservation)
+                .where(
+                    Reservation.id.in_([r.id for r in eligible]),
+                    Reservation.status.in_(allowed_from),
+                )
+                .values(status=new_status, version=Reservation.version + 1)
+                .returning(Reservation.id)
+                .execution_options(synchronize_session=False)
+            ).scalars().all()
+        )
+        updated = [r for r in eligible if r.id in updated_ids]
+        OccupancyService.apply_bulk_status_change(
+            session, updated, {r.id: r.status for r in updated}, new_status
+        )
+        return [r.id for r in updated], skipped
 
     @staticmethod
     def delete_reservation(session: Session, reservation_id: int) -> bool:
@@ -78,6 +369,8 @@ class ReservationService:
         if not reservation:
             return False
 
+        OccupancyService.apply_status_change(
+            session, reservation, reservation.status, None
+        )
         session.delete(reservation)
-        session.commit()
         return True
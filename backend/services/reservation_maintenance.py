@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import time
+from datetime import date, datetime, timedelta
+
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import Session, or_, select
+
+from core.config import settings
+from core.idempotency import purge_expired_idempotency_keys
+from models import Reservation
+from services.reservation import ReservationService
+
+logger = logging.getLogger(__name__)
+
+# 直近の実行結果（件数・実行時間）
+last_run_metrics: dict | None = None
+
+
+def _transition_in_chunks(
+    session: Session, condition, new_status: str, chunk_size: int
+) -> tuple[int, int]:
+    """
+    Move every reservation matching condition to new_status, chunk by chunk
+
+    Each chunk is locked with SKIP LOCKED (rows held by a request are left
+    for the next run), updated with one set-based UPDATE and committed on
+    its own, so locks stay short. Returns (rows updated, chunks).
+    """
+    updated, chunks = 0, 0
+    while True:
+        reservations = session.exec(
+            select(Reservation)
+            .where(condition)
+            .order_by(Reservation.id)
+            .limit(chunk_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        if not reservations:
+            break
+
+        updated_ids, _ = ReservationService.bulk_update_status(
+            session, reservations, new_status
+        )
+        session.commit()
+        session.expunge_all()
+        updated += len(updated_ids)
+        chunks += 1
+        if not updated_ids or len(reservations) < chunk_size:
+            break
+    return updated, chunks
+
+
+def run_reservation_maintenance(
+    session: Session,
+    today: date | None = None,
+    chunk_size: int | None = None,
+) -> dict:
+    """
+    Complete approved stays that have ended and cancel stale pending requests
+
+    A pending request is stale once its check-in date has passed or it has
+    waited longer than RESERVATION_PENDING_EXPIRE_DAYS; a same-day request
+    stays open through its check-in day so the host can still approve it. Expired
+    Idempotency-Key responses are purged in the same run. Returns metrics
+    (rows touched per transition, chunks, run time), which are also logged
+    and kept in last_run_metrics.
+    """
+    global last_run_metrics
+
+    today = today or date.today()
+    chunk_size = chunk_size or settings.RESERVATION_MAINTENANCE_CHUNK_SIZE
+    expire_before = datetime.utcnow() - timedelta(
+        days=settings.RESERVATION_PENDING_EXPIRE_DAYS
+    )
+    started = time.perf_counter()
+
+    completed, completed_chunks = _transition_in_chunks(
+        session,
+        (Reservation.status == "approved") & (Reservation.end_date < today),
+        "completed",
+        chunk_size,
+    )
+    expired, expired_chunks = _transition_in_chunks(
+        session,
+        (Reservation.status == "pending")
+        & or_(
+            Reservation.start_date < today,
+            Reservation.created_at < expire_before,
+        ),
+        "cancelled",
+        chunk_size,
+    )
+
+    # 期限切れの Idempotency-Key の保存レスポンスもここで削除する
+    purged_keys = purge_expired_idempotency_keys(session)
+    session.commit()
+
+    metrics = {
+        "completed": completed,
+        "expired": expired,
+        "idempotency_keys_purged": purged_keys,
+        "chunks": completed_chunks + expired_chunks,
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        "finished_at": datetime.utcnow(),
+    }
+    last_run_metrics = metrics
+    logger.info(
+        "Reservation maintenance: completed=%(completed)d expired=%(expired)d "
+        "chunks=%(chunks)d idempotency_keys_purged=%(idempotency_keys_purged)d "
+        "duration_ms=%(duration_ms).1f",
+        metrics,
+    )
+    return metrics
+
+
+def run_reservation_maintenance_once() -> dict:
+    """Run the maintenance job using a fresh session"""
+    from database import engine
+
+    with Session(engine) as session:
+        return run_reservation_maintenance(session)
+
+
+async def run_reservation_maintenance_loop(interval_seconds: float) -> None:
+    """Run the maintenance job periodically until cancelled"""
+    while True:
+        try:
+            await run_in_threadpool(run_reservation_maintenance_once)
+        except Exception as e:
+            logger.error(f"Reservation maintenance failed: {str(e)}")
+        await asyncio.sleep(interval_seconds)
@@ -1,7 +1,31 @@
-from sqlmodel import Session, select, func
+from datetime import datetime
+from functools import partial
 
-from models import Review
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select, update
+
+from core.unit_of_work import after_commit
+from models import Farm, Reservation, Review
 from schemas.review import ReviewCreate
+from services.farm import FarmService
+from services.rating import RatingService
+from services.user import UserService
+
+# reviews.reservation_id の一意制約（PostgreSQLの既定名）
+REVIEW_RESERVATION_UNIQUE = "reviews_reservation_id_key"
+
+
+class ReviewExistsError(Exception):
+    """Raised when the reservation already has a review"""
+
+
+def _is_duplicate_review(error: IntegrityError) -> bool:
+    """Whether an INSERT failed on the one-review-per-reservation constraint"""
+    diag = getattr(error.orig, "diag", None)
+    if diag is not None:
+        return getattr(diag, "constraint_name", None) == REVIEW_RESERVATION_UNIQUE
+    # SQLite（開発用）は制約名を返さないので列名で判定する
+    return "reviews.reservation_id" in str(error.orig)
 
 
 class ReviewService:
@@ -48,28 +72,76 @@ class ReviewService:
 
     @staticmethod
     def get_farm_average_rating(session: Session, farm_id: int) -> float | None:
-        """Get average rating for a farm"""
-        result = session.exec(
-            select(func.avg(Review.rating)).where(Review.farm_id == farm_id)
+        """Get average rating for a farm (from its farm_ratings aggregate)"""
+        return RatingService.get_farm_rating(session, farm_id)["average_rating"]
+
+    @staticmethod
+    def _touch_reservation(session: Session, reservation_id: int, farm_id: int):
+        """
+        Bump the reservation's updated_at so has_review changes invalidate its validators
+
+        The review's farm (host_id, prefecture, experience_type) is returned
+        by the same UPDATE, so it needs no SELECT of its own.
+        """
+        farm_columns = [
+            select(column).where(Farm.id == farm_id).scalar_subquery().label(column.key)
+            for column in (Farm.host_id, Farm.prefecture, Farm.experience_type)
+        ]
+        return session.exec(
+            update(Reservation)
+            .where(Reservation.id == reservation_id)
+            .values(updated_at=datetime.utcnow())
+            .returning(*farm_columns)
         ).first()
-        return float(result) if result else None
+
+    @staticmethod
+    def _invalidate_caches(
+        session: Session, farm_id: int, host_id: int | None = None
+    ) -> None:
+        """Drop the farm's detail and its host's received reviews after commit"""
+        if host_id is None:
+            host_id = session.exec(
+                select(Farm.host_id).where(Farm.id == farm_id)
+            ).first()
+        after_commit(session, partial(FarmService.invalidate_farm_detail, farm_id))
+        after_commit(
+            session, partial(UserService.invalidate_host_received_reviews, host_id)
+        )
 
     @staticmethod
     def create_review(session: Session, review_data: ReviewCreate) -> Review:
-        """Create a new review"""
+        """
+        Create a new review and sync the guest's stamp collection in the same transaction
+
+        There is no lookup before the INSERT: a reservation that already has a
+        review (also one inserted concurrently) is detected by the unique
+        constraint and raises ReviewExistsError; other integrity errors are
+        re-raised. The farm is read once, by the reservation UPDATE, for both
+        the stamp sync and the host whose cached pages are dropped.
+        """
         review = Review(**review_data.model_dump())
         session.add(review)
-        session.commit()
-        session.refresh(review)
-
-        # スタンプコレクションを自動同期
-        from services.stamp import StampService
-
         try:
-            StampService.sync_stamp_from_review(session, review.id)
-        except Exception as e:
-            print(f"Warning: Failed to sync stamp collection: {e}")
+            session.flush()
+        except IntegrityError as e:
+            if _is_duplicate_review(e):
+                raise ReviewExistsError("Reservation already has a review") from e
+            raise
+        farm = ReviewService._touch_reservation(
+            session, review.reservation_id, review.farm_id
+        )
+        RatingService.apply_review_change(session, review.farm_id, review.rating, 1)
+
+        if farm and farm.prefecture:
+            # スタンプコレクションを自動同期（失敗した場合はレビューごとロールバック）
+            from services.stamp import StampService
 
+            StampService.sync_stamp_from_review(
+                session, review, farm.prefecture, farm.experience_type
+            )
+        ReviewService._invalidate_caches(
+            session, review.farm_id, farm.host_id if farm else None
+        )
         return review
 
     @staticmethod
@@ -80,5 +152,11 @@ class ReviewService:
             return False
 
         session.delete(review)
-        session.commit()
+        farm = ReviewService._touch_reservation(
+            session, review.reservation_id, review.farm_id
+        )
+        RatingService.apply_review_change(session, review.farm_id, review.rating, -1)
+        ReviewService._invalidate_caches(
+            session, review.farm_id, farm.host_id if farm else None
+        )
         return True
@@ -1,4 +1,6 @@
 from datetime import datetime
+from sqlalchemy import case, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert
 from sqlmodel import Session, select, func
 from typing import Optional
 
@@ -188,103 +190,93 @@ class StampService:
 
 
     @staticmethod
-    def sync_stamp_from_review(session: Session, review_id: int) -> None:
-        """レビュー投稿時にスタンプコレクションを同期（自動実行）"""
-
-
-        # レビュー情報を取得
-        result = session.exec(
-            select(Review, Farm)
-            .join(Farm, Review.farm_id == Farm.id)
-            .where(Review.id == review_id)
-        ).first()
-
-
-        if not result:
-            return
-
-
-        review_obj, farm = result
-
-
-        # 都道府県コードを取得
-        prefecture_code = StampService._get_prefecture_code(farm.prefecture)
+    def sync_stamp_from_review(
+        session: Session, review: Review, prefecture: str, experience_type: str
+    ) -> None:
+        """
+        レビュー投稿時にスタンプコレクションを同期（自動実行）
+
+        review と農園の都道府県・体験タイプを受け取るので、レビューを読み直さない。
+        訪問詳細は都道府県マスタにある場合だけ INSERT ... SELECT で作成し
+        （同じレビューは ON CONFLICT で1回だけ）、作成できたときにコレクションを
+        1回の INSERT ... ON CONFLICT DO UPDATE で作成・更新する。
+        """
+        prefecture_code = StampService._get_prefecture_code(prefecture)
         if not prefecture_code:
             return
 
-        # prefecture_stampsテーブルに存在するかチェック
-        prefecture_exists = session.exec(
-            select(PrefectureStamp).where(
-                PrefectureStamp.prefecture_code == prefecture_code
+        now = datetime.utcnow()
+        inserted = session.exec(
+            pg_insert(UserStampDetail)
+            .from_select(
+                [
+                    "guest_id",
+                    "prefecture_code",
+                    "farm_id",
+                    "review_id",
+                    "visit_date",
+                    "experience_type",
+                    "created_at",
+                ],
+                select(
+                    literal(review.guest_id),
+                    PrefectureStamp.prefecture_code,
+                    literal(review.farm_id),
+                    literal(review.id),
+                    literal(review.experience_date),
+                    literal(experience_type),
+                    literal(now),
+                ).where(PrefectureStamp.prefecture_code == prefecture_code),
             )
-        ).first()
-        if not prefecture_exists:
-            print(f"Warning: Prefecture code {prefecture_code} not found in prefecture_stamps table. Skipping stamp sync.")
+            .on_conflict_do_nothing(index_elements=["review_id"])
+        ).rowcount
+        if not inserted:
+            # マスタにない都道府県、または同期済みのレビュー
             return
 
-        # UserStampDetail を作成（重複チェック: review_id が unique）
-        existing_detail = session.exec(
-            select(UserStampDetail).where(UserStampDetail.review_id == review_id)
-        ).first()
-
-
-        if not existing_detail:
-            detail = UserStampDetail(
-                guest_id=review_obj.guest_id,
-                prefecture_code=prefecture_code,
-                farm_id=farm.id,
-                review_id=review_id,
-                visit_date=review_obj.experience_date,
-                experience_type=farm.experience_type,
-            )
-            session.add(detail)
-
-
-        # UserStampCollection を更新または作成
-        collection = session.exec(
-            select(UserStampCollection).where(
-                UserStampCollection.guest_id == review_obj.guest_id,
-                UserStampCollection.prefecture_code == prefecture_code,
-            )
-        ).first()
-
-
-        if collection:
-            # 既存レコードを更新
-            collection.visit_count += 1
-            collection.last_visit_date = max(
-                collection.last_visit_date, review_obj.experience_date
-            )
-            collection.first_visit_date = min(
-                collection.first_visit_date, review_obj.experience_date
+        unique_farms = (
+            select(func.count(func.distinct(UserStampDetail.farm_id)))
+            .where(
+                UserStampDetail.guest_id == review.guest_id,
+                UserStampDetail.prefecture_code == prefecture_code,
             )
-
-
-            # 訪問ファーム数を再計算
-            unique_farms = session.exec(
-                select(func.count(func.distinct(UserStampDetail.farm_id))).where(
-                    UserStampDetail.guest_id == review_obj.guest_id,
-                    UserStampDetail.prefecture_code == prefecture_code,
-                )
-            ).first()
-            collection.unique_farms_count = unique_farms or 1
-
-
-            collection.updated_at = datetime.utcnow()
-        else:
-            # 新規作成
-            collection = UserStampCollection(
-                guest_id=review_obj.guest_id,
-                prefecture_code=prefecture_code,
-                visit_count=1,
-                first_visit_date=review_obj.experience_date,
-                last_visit_date=review_obj.experience_date,
-                unique_farms_count=1,
+            .scalar_subquery()
+        )
+        statement = pg_insert(UserStampCollection).values(
+            guest_id=review.guest_id,
+            prefecture_code=prefecture_code,
+            visit_count=1,
+            first_visit_date=review.experience_date,
+            last_visit_date=review.experience_date,
+            unique_farms_count=1,
+            created_at=now,
+            updated_at=now,
+        )
+        excluded = statement.excluded
+        session.exec(
+            statement.on_conflict_do_update(
+                index_elements=["guest_id", "prefecture_code"],
+                set_={
+                    "visit_count": UserStampCollection.visit_count + 1,
+                    "first_visit_date": case(
+                        (
+                            excluded.first_visit_date < UserStampCollection.first_visit_date,
+                            excluded.first_visit_date,
+                        ),
+                        else_=UserStampCollection.first_visit_date,
+                    ),
+                    "last_visit_date": case(
+                        (
+                            excluded.last_visit_date > UserStampCollection.last_visit_date,
+                            excluded.last_visit_date,
+                        ),
+                        else_=UserStampCollection.last_visit_date,
+                    ),
+                    "unique_farms_count": unique_farms,
+                    "updated_at": now,
+                },
             )
-            session.add(collection)
-
-
-        session.commit()
+        )
 
 
     @staticmethod
@@ -357,6 +349,53 @@ class StampService:
         }
 
 
+    @staticmethod
+    def recalculate_collections(
+        session: Session, pairs: set[tuple[int, str]]
+    ) -> None:
+        """スタンプ詳細の削除後、指定した（ゲスト, 都道府県）の集計を再計算（コミットしない）"""
+        if not pairs:
+            return
+
+        guest_ids = {guest_id for guest_id, _ in pairs}
+        rows = session.exec(
+            select(
+                UserStampDetail.guest_id,
+                UserStampDetail.prefecture_code,
+                func.count(UserStampDetail.id),
+                func.min(UserStampDetail.visit_date),
+                func.max(UserStampDetail.visit_date),
+                func.count(func.distinct(UserStampDetail.farm_id)),
+            )
+            .where(UserStampDetail.guest_id.in_(guest_ids))
+            .group_by(UserStampDetail.guest_id, UserStampDetail.prefecture_code)
+        ).all()
+        stats = {(row[0], row[1]): row[2:] for row in rows}
+
+        collections = session.exec(
+            select(UserStampCollection).where(
+                UserStampCollection.guest_id.in_(guest_ids)
+            )
+        ).all()
+        for collection in collections:
+            key = (collection.guest_id, collection.prefecture_code)
+            if key not in pairs:
+                continue
+
+            # 訪問記録が残っていなければスタンプ自体を削除
+            if key not in stats:
+                session.delete(collection)
+                continue
+
+            visit_count, first_visit, last_visit, unique_farms = stats[key]
+            collection.visit_count = visit_count
+            collection.first_visit_date = first_visit
+            collection.last_visit_date = last_visit
+            collection.unique_farms_count = unique_farms
+            collection.updated_at = datetime.utcnow()
+            session.add(collection)
+
+
     @staticmethod
     def _get_prefecture_code(prefecture_name: str) -> Optional[str]:
         """都道府県名からコードに変換（マッピングテーブル）"""
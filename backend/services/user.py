@@ -1,8 +1,44 @@
+from functools import partial
 from typing import Optional
-from sqlmodel import Session, select, func
+from sqlalchemy import true
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, delete, select, func, update
 
-from models import User
+from models import (
+    Comment,
+    Farm,
+    FarmImage,
+    FarmOccupancy,
+    FarmRating,
+    Post,
+    PostLike,
+    Reservation,
+    Review,
+    User,
+    UserStampCollection,
+    UserStampDetail,
+)
+from core.cache import TTLCache
+from core.unit_of_work import after_commit
 from schemas.user import UserCreate, UserUpdate
+from services.farm import FarmService
+from services.occupancy import OCCUPYING_STATUSES, OccupancyService
+from services.post import PostService
+from services.rating import RatingService
+from services.stamp import StampService
+
+# 農家が受け取ったレビュー一覧の短期キャッシュ（キー: host_id, skip, limit）
+host_reviews_cache = TTLCache(ttl_seconds=60)
+
+
+def _bulk_delete(session: Session, model, *conditions) -> int:
+    """Run a single DELETE ... WHERE without loading rows into the session"""
+    result = session.exec(
+        delete(model)
+        .where(*conditions)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount
 
 
 class UserService:
@@ -44,101 +80,264 @@ class UserService:
         """Create a new user"""
         user = User(**user_data.model_dump())
         session.add(user)
-        session.commit()
-        session.refresh(user)
+        session.flush()
         return user
 
     @staticmethod
     def update_user(
         session: Session, user_id: int, user_data: UserUpdate
     ) -> User | None:
-        """Update a user"""
-        user = session.exec(select(User).where(User.id == user_id)).first()
-        if not user:
-            return None
-
+        """Update a user with a single UPDATE ... RETURNING"""
         update_data = user_data.model_dump(exclude_unset=True)
-        for key, value in update_data.items():
-            setattr(user, key, value)
-
-        session.add(user)
-        session.commit()
-        session.refresh(user)
+        user = session.exec(
+            update(User)
+            .where(User.id == user_id)
+            .values(**update_data)
+            .returning(User)
+        ).scalar()
+        if user and "name" in update_data:
+            # The name can appear on any host's page as host or guest
+            after_commit(session, UserService.invalidate_host_received_reviews)
+            # Guest names are embedded in the recent reviews of any farm's detail
+            after_commit(session, FarmService.invalidate_farm_detail)
         return user
 
     @staticmethod
     def delete_user(session: Session, user_id: int) -> bool:
-        """Delete a user"""
-        user = session.exec(select(User).where(User.id == user_id)).first()
-        if not user:
+        """
+        Delete a user and everything that depends on them in one transaction
+
+        Dependent rows are removed with one DELETE ... WHERE per table instead
+        of loading them into the session. This covers the user's posts, likes,
+        comments, reservations, reviews, stamps and hosted farms (with those
+        farms' reservations, reviews and images). Counters and aggregates on
+        rows owned by other users are corrected as part of the same transaction.
+        """
+        exists = session.exec(select(User.id).where(User.id == user_id)).first()
+        if not exists:
             return False
 
-        session.delete(user)
-        session.commit()
+        farm_ids = select(Farm.id).where(Farm.host_id == user_id)
+        post_ids = select(Post.id).where(Post.user_id == user_id)
+        reservation_ids = select(Reservation.id).where(
+            (Reservation.guest_id == user_id) | Reservation.farm_id.in_(farm_ids)
+        )
+        review_ids = select(Review.id).where(
+            (Review.guest_id == user_id)
+            | Review.farm_id.in_(farm_ids)
+            | Review.reservation_id.in_(reservation_ids)
+        )
+
+        # The user's comments go with every reply beneath them (path prefix)
+        authored = aliased(Comment)
+        removed_comment_ids = (
+            select(Comment.id)
+            .join(
+                authored,
+                (authored.post_id == Comment.post_id)
+                & Comment.path.startswith(authored.path),
+            )
+            .where(authored.user_id == user_id)
+        )
+
+        # Other users' posts: take back this user's likes and comments
+        for model, counter, removed_ids in (
+            (PostLike, Post.like_count, select(PostLike.id).where(PostLike.user_id == user_id)),
+            (Comment, Post.comment_count, removed_comment_ids),
+        ):
+            removed = (
+                select(func.count(model.id))
+                .where(model.post_id == Post.id, model.id.in_(removed_ids))
+                .scalar_subquery()
+            )
+            session.exec(
+                update(Post)
+                .where(
+                    Post.id.in_(select(model.post_id).where(model.user_id == user_id)),
+                    Post.user_id != user_id,
+                )
+                .values({counter.key: counter - removed})
+                .execution_options(synchronize_session=False)
+            )
+            PostService.refresh_trending_scores(
+                session, select(model.post_id).where(model.user_id == user_id)
+            )
+
+        # Comments that stay lose the replies this user wrote to them
+        reply = aliased(Comment)
+        session.exec(
+            update(Comment)
+            .where(
+                Comment.id.in_(select(reply.parent_id).where(reply.user_id == user_id)),
+                Comment.id.not_in(removed_comment_ids),
+            )
+            .values(
+                reply_count=Comment.reply_count
+                - select(func.count(reply.id))
+                .where(reply.parent_id == Comment.id, reply.user_id == user_id)
+                .scalar_subquery()
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        # Free capacity held by the user's reservations on other hosts' farms
+        held = session.exec(
+            select(Reservation).where(
+                Reservation.guest_id == user_id,
+                Reservation.status.in_(OCCUPYING_STATUSES),
+                Reservation.farm_id.not_in(farm_ids),
+            )
+        ).all()
+        for reservation in held:
+            OccupancyService.apply_status_change(
+                session, reservation, reservation.status, None
+            )
+
+        # Stamps: other guests lose visits made at this host's farms
+        affected_stamps = set(
+            session.exec(
+                select(UserStampDetail.guest_id, UserStampDetail.prefecture_code)
+                .where(
+                    UserStampDetail.guest_id != user_id,
+                    UserStampDetail.review_id.in_(review_ids),
+                )
+                .distinct()
+            ).all()
+        )
+        affected_farm_ids = set(
+            session.exec(
+                select(Review.farm_id).where(Review.id.in_(review_ids)).distinct()
+            ).all()
+        )
+
+        _bulk_delete(
+            session,
+            UserStampDetail,
+            (UserStampDetail.guest_id == user_id)
+            | UserStampDetail.farm_id.in_(farm_ids)
+            | UserStampDetail.review_id.in_(review_ids),
+        )
+        _bulk_delete(session, UserStampCollection, UserStampCollection.guest_id == user_id)
+        StampService.recalculate_collections(session, affected_stamps)
+
+        # Community: the user's posts, and their likes/comments on other posts
+        PostService.delete_posts(session, post_ids)
+        _bulk_delete(session, PostLike, PostLike.user_id == user_id)
+        _bulk_delete(session, Comment, Comment.id.in_(removed_comment_ids))
+        session.exec(
+            update(Post)
+            .where(Post.farm_id.in_(farm_ids))
+            .values(farm_id=None)
+            .execution_options(synchronize_session=False)
+        )
+
+        # Reservations and reviews, then the hosted farms. Reviews on other
+        # hosts' farms are taken out of those farms' rating aggregates first
+        RatingService.remove_reviews(
+            session,
+            select(Review.id).where(
+                Review.id.in_(review_ids), Review.farm_id.not_in(farm_ids)
+            ),
+        )
+        _bulk_delete(session, Review, Review.id.in_(review_ids))
+        _bulk_delete(session, Reservation, Reservation.id.in_(reservation_ids))
+        _bulk_delete(session, FarmImage, FarmImage.farm_id.in_(farm_ids))
+        _bulk_delete(session, FarmOccupancy, FarmOccupancy.farm_id.in_(farm_ids))
+        _bulk_delete(session, FarmRating, FarmRating.farm_id.in_(farm_ids))
+        _bulk_delete(session, Farm, Farm.host_id == user_id)
+        _bulk_delete(session, User, User.id == user_id)
+
+        for farm_id in affected_farm_ids:
+            after_commit(session, partial(FarmService.invalidate_farm_detail, farm_id))
+        # The user's reviews and name can appear on any host's page
+        after_commit(session, UserService.invalidate_host_received_reviews)
         return True
 
+    @staticmethod
+    def invalidate_host_received_reviews(host_id: int | None = None) -> None:
+        """Drop cached received-review pages for a host (all hosts if None)"""
+        if host_id is None:
+            host_reviews_cache.clear()
+        else:
+            host_reviews_cache.invalidate_where(lambda key: key[0] == host_id)
+
     @staticmethod
     def get_host_received_reviews(
         session: Session, host_id: int, skip: int = 0, limit: int = 100
     ) -> Optional[dict]:
-        """農家が所有するファームに対して受け取ったレビューを取得"""
-        from models import Review, Farm
+        """
+        農家が所有するファームに対して受け取ったレビューを取得
 
-        # ホスト確認
-        host = session.exec(select(User).where(User.id == host_id)).first()
-        if not host or host.user_type != "host":
-            return None
+        One statement: a CTE with the page of reviews (joined to farms on
+        farms.host_id, so no farm id list is loaded first), a CTE summing
+        the farms' rating aggregates for the totals, and the host row they
+        are joined to, which also tells a missing or non-host user apart from
+        a host without reviews. Results are cached per host and dropped when
+        a review of one of the host's farms is created or deleted, or when a
+        farm or user name shown on the page changes.
+        """
+        cache_key = (host_id, skip, limit)
+        if (cached := host_reviews_cache.get(cache_key)) is not None:
+            return cached
 
-        # ホストが所有するファームのID取得
-        farm_ids = list(session.exec(select(Farm.id).where(Farm.host_id == host_id)).all())
-        if not farm_ids:
-            return {
-                "host_id": host_id,
-                "host_name": host.name,
-                "total_reviews": 0,
-                "average_rating": 0.0,
-                "reviews": [],
-            }
-
-        # レビュー取得（Farm, User と結合）
-        query = (
-            select(Review, Farm, User)
+        page = (
+            select(
+                Review.id,
+                Review.guest_id,
+                User.name.label("guest_name"),
+                Review.rating,
+                Review.comment,
+                Review.experience_date,
+                Review.farm_id,
+                Farm.name.label("farm_name"),
+                Review.created_at,
+            )
             .join(Farm, Review.farm_id == Farm.id)
             .join(User, Review.guest_id == User.id)
-            .where(Review.farm_id.in_(farm_ids))
-            .order_by(Review.created_at.desc())
+            .where(Farm.host_id == host_id)
+            .order_by(Review.created_at.desc(), Review.id.desc())
             .offset(skip)
             .limit(limit)
+            .cte("page")
+        )
+        totals = (
+            select(
+                func.coalesce(func.sum(FarmRating.rating_sum), 0).label("rating_sum"),
+                func.coalesce(func.sum(FarmRating.review_count), 0).label("review_count"),
+            )
+            .join(Farm, FarmRating.farm_id == Farm.id)
+            .where(Farm.host_id == host_id)
+            .cte("totals")
         )
-        results = list(session.exec(query).all())
-
-        # 統計計算
-        avg_rating = session.exec(
-            select(func.avg(Review.rating)).where(Review.farm_id.in_(farm_ids))
-        ).first()
-        total_count = session.exec(
-            select(func.count(Review.id)).where(Review.farm_id.in_(farm_ids))
-        ).first()
-
-        reviews = [
-            {
-                "id": review.id,
-                "guest_id": review.guest_id,
-                "guest_name": guest.name,
-                "rating": review.rating,
-                "comment": review.comment,
-                "experience_date": review.experience_date,
-                "farm_id": review.farm_id,
-                "farm_name": farm.name,
-                "created_at": review.created_at,
-            }
-            for review, farm, guest in results
-        ]
-
-        return {
+        host = aliased(User)
+        rows = session.execute(
+            select(
+                host.name.label("host_name"),
+                totals.c.rating_sum,
+                totals.c.review_count,
+                *page.c,
+            )
+            .select_from(host)
+            .join(totals, true())
+            .outerjoin(page, true())
+            .where(host.id == host_id, host.user_type == "host")
+            .order_by(page.c.created_at.desc(), page.c.id.desc())
+        ).mappings().all()
+        if not rows:
+            return None
+
+        first = rows[0]
+        rating_sum, review_count = int(first["rating_sum"]), int(first["review_count"])
+        result = {
             "host_id": host_id,
-            "host_name": host.name,
-            "total_reviews": total_count or 0,
-            "average_rating": round(float(avg_rating or 0), 1),
-            "reviews": reviews,
+            "host_name": first["host_name"],
+            "total_reviews": review_count,
+            "average_rating": round(rating_sum / review_count, 1) if review_count else 0.0,
+            "reviews": [
+                {name: row[name] for name in page.c.keys()}
+                for row in rows
+                if row["id"] is not None
+            ],
         }
+        host_reviews_cache.set(cache_key, result)
+        return result
@@ -58,6 +58,39 @@ export default function PostDetailPage() {
     }
   }, [postId]);
 
+  // コメント・いいねをリアルタイムで反映（Server-Sent Events）
+  useEffect(() => {
+    if (!postId) return;
+
+    const source = new EventSource(
+      `${process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"}/api/posts/${postId}/stream`
+    );
+    source.addEventListener("comment", (event) => {
+      const comment: Comment = JSON.parse((event as MessageEvent).data);
+      setComments((prev) =>
+        prev.some((c) => c.id === comment.id) ? prev : [comment, ...prev]
+      );
+    });
+    source.addEventListener("comment_deleted", (event) => {
+      // 返信も一緒に削除されるため deleted_ids に含まれるコメントをすべて除く
+      const { deleted_ids }: { deleted_ids: number[] } = JSON.parse(
+        (event as MessageEvent).data
+      );
+      setComments((prev) => prev.filter((c) => !deleted_ids.includes(c.id)));
+    });
+    source.addEventListener("like", (event) => {
+      const { like_count } = JSON.parse((event as MessageEvent).data);
+      setPost((prev) => (prev ? { ...prev, like_count } : prev));
+    });
+    // 取りこぼしが発生した場合は再取得（接続は自動で再開される）
+    source.addEventListener("overflow", () => {
+      fetchPost();
+      fetchComments();
+    });
+
+    return () => source.close();
+  }, [postId]);
+
   // ユーザーID取得
   useEffect(() => {
     const fetchUserId = async () => {
@@ -115,11 +148,13 @@ export default function PostDetailPage() {
   };
 
   const handleLike = async () => {
+    if (!userId) return;
+
     try {
       const response = await fetch(
-        `${process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"}/api/posts/${postId}/like`,
+        `${process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000"}/api/posts/${postId}/likes/${userId}`,
         {
-          method: "POST",
+          method: "PUT",
         }
       );
 
@@ -115,10 +115,12 @@ export default function CommunityPage() {
   };
 
   const handleLike = async (postId: number) => {
+    if (!userId) return;
+
     try {
       const apiUrl = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
-      const response = await fetch(`${apiUrl}/api/posts/${postId}/like`, {
-        method: "POST",
+      const response = await fetch(`${apiUrl}/api/posts/${postId}/likes/${userId}`, {
+        method: "PUT",
       });
 
       if (response.ok) {
@@ -14,6 +14,7 @@ interface Reservation {
   num_guests: number;
   total_amount: number;
   status: string;
+  version: number;
   created_at: string;
 }
 
@@ -83,7 +84,12 @@ export function HostReservations({ hostId }: HostReservationsProps) {
 
     try {
       setSubmitting(true);
-      await approveReservation(selectedReservation.id, hostId, approvalMessage);
+      await approveReservation(
+        selectedReservation.id,
+        hostId,
+        approvalMessage,
+        selectedReservation.version
+      );
       alert("予約を承認しました。ゲストにメール通知が送信されます。");
       setApprovalModalOpen(false);
       setSelectedReservation(null);
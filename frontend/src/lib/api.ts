@@ -5,3 +5,4 @@ export * from "@/lib/api/farms";
 export * from "@/lib/api/posts";
 export * from "@/lib/api/reviews";
 export * from "@/lib/api/comments";
+export * from "@/lib/api/hosts";
@@ -0,0 +1,32 @@
+import { apiCall } from "@/lib/utils/api-client";
+
+export interface HostDashboard {
+  host_id: number;
+  status_counts: Record<string, number>;
+  total_reservations: number;
+  upcoming_check_ins: {
+    id: number;
+    farm_id: number;
+    farm_name: string;
+    guest_id: number;
+    guest_name: string;
+    start_date: string;
+    end_date: string;
+    num_guests: number;
+    status: string;
+  }[];
+  monthly_revenue: { month: string; revenue: number; reservations: number }[];
+  farms: {
+    farm_id: number;
+    farm_name: string;
+    occupancy_rate: number;
+    average_rating: number | null;
+    review_count: number;
+  }[];
+  average_rating: number | null;
+  review_count: number;
+}
+
+export async function getHostDashboard(hostId: number) {
+  return apiCall<HostDashboard>(`/api/hosts/${hostId}/dashboard`);
+}
@@ -73,12 +73,16 @@ export async function getHostReservations(
   hostId: number,
   skip?: number,
   limit?: number,
-  status?: string
+  status?: string,
+  filters?: { farmId?: number; startDateFrom?: string; startDateTo?: string }
 ) {
   const params = new URLSearchParams();
   if (skip !== undefined) params.append("skip", skip.toString());
   if (limit !== undefined) params.append("limit", limit.toString());
   if (status) params.append("status", status);
+  if (filters?.farmId) params.append("farm_id", filters.farmId.toString());
+  if (filters?.startDateFrom) params.append("start_date_from", filters.startDateFrom);
+  if (filters?.startDateTo) params.append("start_date_to", filters.startDateTo);
 
   const queryString = params.toString();
   const endpoint = `/api/reservations/host/${hostId}${queryString ? `?${queryString}` : ""}`;
@@ -89,13 +93,15 @@ export async function getHostReservations(
 export async function approveReservation(
   reservationId: number,
   hostId: number,
-  approvalMessage?: string
+  approvalMessage?: string,
+  version?: number
 ) {
   return apiCall<any>(`/api/reservations/${reservationId}/approve`, {
     method: "POST",
     body: JSON.stringify({
       host_id: hostId,
       approval_message: approvalMessage || null,
+      version: version ?? null,
     }),
   });
 }